@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from dewloosh.core.tools.alphabet import arabicrange, LabelSequence
+
+
+class Labels:
+    params = [[10**3, 10**6], ["latin", "arabic"]]
+    param_names = ["size", "kind"]
+
+    def setup(self, size, kind):
+        self.labels = LabelSequence(kind, N=size)
+
+    def time_list(self, size, kind):
+        list(self.labels)
+
+    def time_toarray(self, size, kind):
+        self.labels.toarray()
+
+    def time_tobuffer(self, size, kind):
+        self.labels.tobuffer()
+
+    def time_label(self, size, kind):
+        self.labels[size // 2]
+
+
+class ArabicRange:
+    params = [10**3, 10**6]
+    param_names = ["size"]
+
+    def time_arabicrange(self, size):
+        arabicrange(size)
+
+    def time_toarray(self, size):
+        LabelSequence("arabic", N=size).toarray()
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from dewloosh.core import colors
+
+
+class ColorLookup:
+    number = 10000
+
+    def setup(self):
+        self.names = list(colors.colors)
+
+    def time_lookup(self):
+        colors.colors["tomato1"]
+
+    def time_hex_format(self):
+        colors.colors["tomato1"].hex_format()
+
+    def time_all_hex(self):
+        [colors.colors[name].hex_format() for name in self.names[:10]]
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from dewloosh.core.cp import classproperty, ClassPropertyMeta
+
+
+class ClassPropertyAccess:
+    number = 10000
+
+    def setup(self):
+        class Plain:
+            bar = 1
+
+        class Lazy:
+            @classproperty(lazy=True)
+            def bar(cls):
+                return 1
+
+        class Installed(metaclass=ClassPropertyMeta):
+            @classproperty(lazy=True)
+            def bar(cls):
+                return 1
+
+        class NotLazy:
+            @classproperty
+            def bar(cls):
+                return 1
+
+        self.plain, self.lazy, self.installed, self.notlazy = (
+            Plain,
+            Lazy,
+            Installed,
+            NotLazy,
+        )
+        self.lazy.bar, self.installed.bar
+
+    def time_plain_attribute(self):
+        self.plain.bar
+
+    def time_lazy(self):
+        self.lazy.bar
+
+    def time_lazy_installed(self):
+        self.installed.bar
+
+    def time_not_lazy(self):
+        self.notlazy.bar
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from dewloosh.core.decorate import squeeze, vectorize, memoize
+
+
+def _kernel(x):
+    return x.reshape(1, -1)
+
+
+def _element_kernel(x):
+    # a small dense solve, heavy enough to release the GIL for a while
+    return np.linalg.solve(x, np.ones(len(x)))
+
+
+class Squeeze:
+    number = 10000
+
+    def setup(self):
+        self.x = np.ones(3)
+        self.out = np.zeros((1, 3))
+        self.plain = _kernel
+        self.squeezed = squeeze()(_kernel)
+        self.fixed = squeeze(fixed=True)(_kernel)
+
+    def time_plain(self):
+        self.plain(self.x)
+
+    def time_squeeze(self):
+        self.squeezed(self.x)
+
+    def time_squeeze_fixed(self):
+        self.fixed(self.x)
+
+    def time_squeeze_out(self):
+        self.squeezed(self.x, out=self.out)
+
+
+class Vectorize:
+    params = [[None, "thread", "process"], [100, 10000]]
+    param_names = ["executor", "size"]
+
+    def setup(self, executor, size):
+        self.x = np.random.rand(size, 8, 8) + 8 * np.eye(8)
+        self.vectorized = vectorize(executor=executor)(_element_kernel)
+        # the pool is created at the first call
+        self.vectorized(self.x[:2])
+
+    def time_loop(self, executor, size):
+        np.array([_element_kernel(x) for x in self.x])
+
+    def time_vectorize(self, executor, size):
+        self.vectorized(self.x)
+
+
+def _shape_functions(x):
+    return np.stack([(1 - x) * (1 - x.T), x * (1 - x.T), x * x.T, (1 - x) * x.T])
+
+
+class Memoize:
+    params = [10, 1000]
+    param_names = ["size"]
+
+    def setup(self, size):
+        self.x = np.linspace(0, 1, size).reshape(-1, 1)
+        self.memoized = memoize()(_shape_functions)
+        self.memoized(self.x)
+
+    def time_call(self, size):
+        _shape_functions(self.x)
+
+    def time_memoized(self, size):
+        self.memoized(self.x)
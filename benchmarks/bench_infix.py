@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from dewloosh.core import Infix
+
+
+class InfixScalar:
+    number = 10000
+
+    def setup(self):
+        self.mul = Infix(lambda x, y: x * y)
+        self.f = self.mul.function
+
+    def time_infix(self):
+        2.0 | self.mul | 4.0
+
+    def time_call(self):
+        self.mul(2.0, 4.0)
+
+    def time_direct(self):
+        self.f(2.0, 4.0)
+
+
+class InfixArray:
+    params = [10**3, 10**6]
+    param_names = ["size"]
+
+    def setup(self, size):
+        self.a = np.random.rand(size)
+        self.b = np.random.rand(size)
+        self.out = np.empty(size)
+        self.mul = Infix(lambda x, y: x * y, ufunc=np.multiply)
+        self.mul_out = self.mul.into(self.out)
+
+    def time_infix(self, size):
+        self.a | self.mul | self.b
+
+    def time_infix_out(self, size):
+        self.a | self.mul_out | self.b
+
+    def time_direct(self, size):
+        np.multiply(self.a, self.b)
+
+    def time_direct_out(self, size):
+        np.multiply(self.a, self.b, out=self.out)
+
+
+class InfixLazy:
+    params = [10**6, 10**7]
+    param_names = ["size"]
+
+    def setup(self, size):
+        self.a, self.b, self.c = (np.random.rand(size) for _ in range(3))
+        self.add = Infix(np.add)
+        self.mul = Infix(np.multiply)
+        self.add_lazy = Infix(np.add, lazy=True)
+        self.mul_lazy = Infix(np.multiply, lazy=True)
+
+    def time_eager(self, size):
+        self.a | self.add | self.b | self.mul | self.c | self.add | self.a
+
+    def time_lazy(self, size):
+        expr = self.a | self.add_lazy | self.b | self.mul_lazy | self.c
+        (expr | self.add_lazy | self.a).evaluate(backend="numpy")
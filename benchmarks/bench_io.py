@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+
+import numpy as np
+
+from dewloosh.core import io
+from dewloosh.core.io import json2dict, dict2json, bin2dict, dict2bin, LazyJSON
+
+from .common import MB, payload_sizes
+
+
+def _payload(nbytes: int) -> dict:
+    """
+    A nested dictionary holding about `nbytes` bytes of float64 data.
+    """
+    n = max(1, nbytes // 8 // 16)
+    return {
+        "results": {str(i): {"values": np.random.rand(n)} for i in range(16)},
+        "meta": {"name": "benchmark", "n": n},
+    }
+
+
+class JSONRoundTrip:
+    params = (payload_sizes(MB, 16 * MB), ["json", "orjson"])
+    param_names = ["nbytes", "backend"]
+
+    def setup(self, nbytes, backend):
+        if backend == "orjson" and not io.__has_orjson__:
+            raise NotImplementedError
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "data.json")
+        self.data = _payload(nbytes)
+        dict2json(self.path, self.data, backend=backend)
+
+    def teardown(self, nbytes, backend):
+        self.tmpdir.cleanup()
+
+    def time_dict2json(self, nbytes, backend):
+        dict2json(self.path, self.data, backend=backend)
+
+    def time_json2dict(self, nbytes, backend):
+        json2dict(self.path, backend=backend)
+
+
+class BinaryRoundTrip:
+    params = (payload_sizes(MB, 64 * MB), [False, True])
+    param_names = ["nbytes", "mmap"]
+
+    def setup(self, nbytes, mmap):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "data.bin")
+        self.data = _payload(nbytes)
+        dict2bin(self.path, self.data)
+
+    def teardown(self, nbytes, mmap):
+        self.tmpdir.cleanup()
+
+    def time_dict2bin(self, nbytes, mmap):
+        dict2bin(self.path, self.data)
+
+    def time_bin2dict(self, nbytes, mmap):
+        bin2dict(self.path, mmap=mmap)
+
+
+class LazyJSONAccess:
+    params = payload_sizes(MB, 16 * MB)
+    param_names = ["nbytes"]
+
+    def setup(self, nbytes):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "data.json")
+        dict2json(self.path, _payload(nbytes))
+
+    def teardown(self, nbytes):
+        self.tmpdir.cleanup()
+
+    def time_get_subtree(self, nbytes):
+        with LazyJSON(self.path) as data:
+            data.get("/results/7/values")
+
+    def time_get_scalar(self, nbytes):
+        with LazyJSON(self.path) as data:
+            data.get("/meta/n")
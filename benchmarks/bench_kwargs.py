@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from dewloosh.core.tools.kwargtools import (
+    getfromkwargs,
+    getallfromkwargs,
+    getasany,
+    Kwarg,
+    KwargSpec,
+)
+
+
+class Kwargs:
+    number = 10000
+
+    def setup(self):
+        self.kwargs = {"E": 210000.0, "NU": 0.3, "young": 1.0, "rho": 7.85e-9}
+        self.keys = ["E", "NU", "rho"]
+        self.spec = KwargSpec("E", "NU", "rho")
+        self.required = KwargSpec(*[Kwarg(key, required=True) for key in self.keys])
+        self.aliased = KwargSpec(Kwarg("E", aliases=["young"], astype=float))
+
+    def time_getfromkwargs(self):
+        getfromkwargs(self.keys, **self.kwargs)
+
+    def time_spec_get(self):
+        self.spec.get(self.kwargs)
+
+    def time_getallfromkwargs(self):
+        getallfromkwargs(self.keys, **self.kwargs)
+
+    def time_spec_required(self):
+        self.required.get(self.kwargs)
+
+    def time_getasany(self):
+        float(getasany(["E", "young"], **self.kwargs))
+
+    def time_spec_aliased(self):
+        self.aliased.get(self.kwargs)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from abc import abstractmethod
+
+from dewloosh.core.abc import ABC_Weak, ABC_Strong, ABC_Safe
+
+
+def _namespace(nmethods: int, prefix: str, abstract: bool = False) -> dict:
+    def method(self):
+        pass
+
+    if abstract:
+        method = abstractmethod(method)
+    return {"{}_{}".format(prefix, i): method for i in range(nmethods)}
+
+
+class ClassCreation:
+    """
+    Creation of a class with `nmethods` methods, on top of a base with
+    as many abstract methods.
+    """
+
+    params = [["weak", "strong", "safe"], [10, 100]]
+    param_names = ["meta", "nmethods"]
+    number = 100
+
+    def setup(self, meta, nmethods):
+        base = {"weak": ABC_Weak, "strong": ABC_Strong, "safe": ABC_Safe}[meta]
+        abstract = meta != "safe"
+        self.base = type(base)(
+            "Base", (base,), _namespace(nmethods, "method", abstract=abstract)
+        )
+        if abstract:
+            # implements the abstract methods of the base
+            self.namespace = _namespace(nmethods, "method")
+        else:
+            self.namespace = _namespace(nmethods, "other")
+
+    def time_class_creation(self, meta, nmethods):
+        type(self.base)("Child", (self.base,), dict(self.namespace))
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import inspect
+import os
+
+import numpy as np
+
+from dewloosh.core import osutils
+
+
+def _definition_file_path(obj):
+    # the implementation without caching, for comparison
+    if inspect.ismethod(obj):
+        obj = obj.__func__
+    return os.path.abspath(inspect.getfile(obj))
+
+
+class ResolvePaths:
+    """
+    Resolves the files of the classes and functions of NumPy, like a plugin
+    loader does at startup.
+    """
+
+    number = 1
+
+    def setup(self):
+        objs = [
+            obj
+            for module in (np, np.linalg, np.fft, np.random, np.polynomial)
+            for obj in vars(module).values()
+            if inspect.isclass(obj) or inspect.isfunction(obj)
+        ]
+        self.objs = []
+        for obj in objs:
+            try:
+                _definition_file_path(obj)
+                self.objs.append(obj)
+            except TypeError:
+                # builtins and extension types
+                pass
+
+    def time_inspect(self):
+        [_definition_file_path(obj) for obj in self.objs]
+
+    def time_cold(self):
+        osutils.clear_cache()
+        osutils.resolve_many(self.objs)
+
+    def time_warm(self):
+        osutils.resolve_many(self.objs)
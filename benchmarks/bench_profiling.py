@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from dewloosh.core import profiling
+
+
+def _kernel():
+    return None
+
+
+class Profiled:
+    """
+    The overhead of the profiling hooks, with recording on and off.
+    """
+
+    number = 10000
+
+    def setup(self):
+        enabled = profiling.ENABLED
+        profiling.ENABLED = True
+        try:
+            self.profiled = profiling.profiled("bench")(_kernel)
+        finally:
+            profiling.ENABLED = enabled
+        self.active = profiling.is_enabled()
+
+    def teardown(self):
+        if self.active:
+            profiling.enable()
+        else:
+            profiling.disable()
+        profiling.PROFILER.reset()
+
+    def time_plain(self):
+        _kernel()
+
+    def time_profiled_off(self):
+        profiling.disable()
+        self.profiled()
+
+    def time_profiled_on(self):
+        profiling.enable()
+        self.profiled()
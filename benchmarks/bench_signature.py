@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from typing import Union
+
+from dewloosh.core.signature import Signature
+
+
+def _foo(a: int, b: float, c: Union[int, float]) -> float:
+    return a + b + c
+
+
+def _bar(a: int, b: float, c: int) -> float:
+    return a + b + c
+
+
+class SignatureCompatibility:
+    number = 1000
+
+    def setup(self):
+        self.foo = Signature.from_function(_foo)
+        self.bar = Signature.from_function(_bar)
+
+    def time_from_function(self):
+        Signature.from_function(_foo)
+
+    def time_compatible_function(self):
+        self.foo.compatible_function(self.bar)
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import math
+
+import numpy as np
+
+from dewloosh.core.tools import float_to_str_sig
+
+
+class FloatToStrSigScalar:
+    number = 10000
+
+    def time_scalar(self):
+        float_to_str_sig(math.pi, sig=4)
+
+
+class FloatToStrSig:
+    params = [1, 10**3, 10**5]
+    param_names = ["size"]
+
+    def setup(self, size):
+        self.values = np.random.rand(size)
+        self.list = self.values.tolist()
+
+    def time_array(self, size):
+        float_to_str_sig(self.values, sig=4)
+
+    def time_list(self, size):
+        float_to_str_sig(self.list, sig=4)
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from dewloosh.core.typing import (
+    issequence,
+    ishashable,
+    issequence_many,
+    ishashable_many,
+)
+
+
+class Typing:
+    number = 100
+
+    def setup(self):
+        self.values = [[1, 2], (1, 2), np.ones(2), "lorem", 1, 1.0, None] * 100
+
+    def time_issequence(self):
+        [issequence(v) for v in self.values]
+
+    def time_issequence_many(self):
+        issequence_many(self.values)
+
+    def time_ishashable(self):
+        [ishashable(v) for v in self.values]
+
+    def time_ishashable_many(self):
+        ishashable_many(self.values)
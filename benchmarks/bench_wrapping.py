@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+import copy
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dewloosh.core.wrapping import Wrapper, wrap
+
+from .common import MB, payload_sizes
+
+
+class _Wrapped:
+    def __init__(self):
+        self.value = 1
+
+    def foo(self):
+        return self.value
+
+
+def _task(obj):
+    return obj.wrapped.shape
+
+
+class _ArrayWrapper(Wrapper):
+    wraptype = np.ndarray
+
+    def __getitem__(self, index):
+        return self._wrapped[index]
+
+    def __setitem__(self, index, value):
+        self._wrapped[index] = value
+
+
+class _Wrapper(Wrapper):
+    wraptype = _Wrapped
+
+    def bar(self):
+        return 2
+
+
+class WrapperDelegation:
+    number = 10000
+
+    def setup(self):
+        self.obj = _Wrapped()
+        self.wrapper = _Wrapper(wrap=self.obj)
+
+    def time_direct_attribute(self):
+        self.obj.value
+
+    def time_delegated_attribute(self):
+        self.wrapper.value
+
+    def time_delegated_method(self):
+        self.wrapper.foo()
+
+    def time_own_method(self):
+        self.wrapper.bar()
+
+
+class WrapperItems:
+    params = [10, 10**4]
+    param_names = ["size"]
+    number = 1000
+
+    def setup(self, size):
+        self.array = np.arange(size)
+        self.wrapper = wrap(self.array)
+
+    def time_direct_getitem(self, size):
+        self.array[size // 2]
+
+    def time_delegated_getitem(self, size):
+        self.wrapper[size // 2]
+
+
+class WrapperDispatch:
+    """
+    The latency of submitting a wrapped array to a worker process,
+    pickled by value and through shared memory.
+    """
+
+    params = payload_sizes(16 * MB, 256 * MB)
+    param_names = ["nbytes"]
+    number = 1
+
+    def setup(self, nbytes):
+        self.pool = ProcessPoolExecutor(1)
+        # start the worker before timing
+        self.pool.submit(int).result()
+        self.pickled = _ArrayWrapper(wrap=np.ones(nbytes // 8))
+        self.shared = _ArrayWrapper(wrap=np.ones(nbytes // 8)).share()
+
+    def teardown(self, nbytes):
+        self.pool.shutdown()
+        del self.pickled, self.shared
+
+    def time_pickled(self, nbytes):
+        self.pool.submit(_task, self.pickled).result()
+
+    def time_shared(self, nbytes):
+        self.pool.submit(_task, self.shared).result()
+
+
+class WrapperSnapshot:
+    """
+    Copy-on-write snapshots against deep copies of wrapped state.
+    """
+
+    params = payload_sizes(MB, 64 * MB)
+    param_names = ["nbytes"]
+
+    def setup(self, nbytes):
+        self.array = _ArrayWrapper(wrap=np.ones(nbytes // 8))
+        self.dict = wrap({i: i for i in range(nbytes // 2**10)})
+
+    def time_deepcopy_array(self, nbytes):
+        copy.deepcopy(self.array.wrapped)
+
+    def time_snapshot_array(self, nbytes):
+        self.array.snapshot()
+
+    def time_snapshot_and_write_array(self, nbytes):
+        s = self.array.snapshot()
+        self.array[0] = 1.0
+        return s
+
+    def time_deepcopy_dict(self, nbytes):
+        copy.deepcopy(self.dict.wrapped)
+
+    def time_snapshot_dict(self, nbytes):
+        self.dict.snapshot()
+
+
+class WrapperTracking:
+    """
+    The cost of item assignments with and without tracking changes.
+    """
+
+    number = 10000
+
+    def setup(self):
+        self.plain = _ArrayWrapper(wrap=np.zeros(10**5))
+        self.tracked = _ArrayWrapper(wrap=np.zeros(10**5)).track_changes()
+        self.index = np.arange(0, 10**5, 7)
+
+    def time_setitem(self):
+        self.plain[5] = 1.0
+
+    def time_setitem_tracked(self):
+        self.tracked[5] = 1.0
+
+    def time_setitem_fancy(self):
+        self.plain[self.index] = 1.0
+
+    def time_setitem_fancy_tracked(self):
+        self.tracked[self.index] = 1.0
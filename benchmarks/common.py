@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers shared by the benchmark modules.
+"""
+import os
+
+# Set `DEWLOOSH_BENCH_LARGE=1` to include the large (1 GB) payloads.
+LARGE = os.environ.get("DEWLOOSH_BENCH_LARGE", "0") not in ("", "0")
+
+MB = 2**20
+GB = 2**30
+
+
+def payload_sizes(*sizes: int) -> list:
+    """
+    Returns the payload sizes in bytes, extended with 1 GB in large mode.
+    """
+    sizes = list(sizes)
+    if LARGE:
+        sizes.append(GB)
+    return sizes
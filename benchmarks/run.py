@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+A minimal runner for the benchmarks in this folder.
+
+The benchmarks follow the conventions of `asv`: a benchmark is a method
+of a class whose name starts with `time_`, the class may define `params`,
+`param_names`, `setup` and `teardown`. The runner collects the modules
+named `bench_*.py` and reports the best and the median of a number of
+repeats.
+
+The results can be saved as JSON with `--output`, and compared to the
+results of an earlier run with `--compare`. Benchmarks whose median got
+slower by more than `--threshold` (a fraction, 0.1 means 10 %) are
+reported as regressions, and the runner exits with status 1.
+
+Usage::
+
+    python -m benchmarks.run [pattern] [--output results.json]
+    python -m benchmarks.run [pattern] --compare baseline.json [--threshold 0.1]
+"""
+import argparse
+import importlib
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _modules():
+    for fname in sorted(os.listdir(HERE)):
+        if fname.startswith("bench_") and fname.endswith(".py"):
+            yield importlib.import_module("benchmarks." + fname[:-3])
+
+
+def _benchmarks(module, pattern: str = None):
+    for cname, cls in sorted(vars(module).items()):
+        if not isinstance(cls, type) or cls.__module__ != module.__name__:
+            continue
+        for mname in sorted(dir(cls)):
+            if not mname.startswith("time_"):
+                continue
+            name = ".".join([module.__name__.split(".")[-1], cname, mname])
+            if pattern is None or pattern in name:
+                yield name, cls, mname
+
+
+def _params(cls) -> list:
+    params = getattr(cls, "params", None)
+    if params is None:
+        return [()]
+    if not isinstance(params[0], (list, tuple)):
+        params = [params]
+    return list(itertools.product(*params))
+
+
+def run_benchmark(cls, method: str, params: tuple, repeat: int = 5) -> list:
+    """
+    Runs a benchmark with a set of parameters and returns the timings.
+    """
+    obj = cls()
+    times = []
+    for _ in range(repeat):
+        if hasattr(obj, "setup"):
+            obj.setup(*params)
+        try:
+            number = getattr(obj, "number", 1)
+            t0 = time.perf_counter()
+            for _ in range(number):
+                getattr(obj, method)(*params)
+            times.append((time.perf_counter() - t0) / number)
+        finally:
+            if hasattr(obj, "teardown"):
+                obj.teardown(*params)
+    return times
+
+
+def _machine() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=HERE,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.1) -> list:
+    """
+    Compares the medians of two sets of results and returns the names of
+    the benchmarks, that got slower by more than `threshold`, as a list of
+    `(name, ratio)` tuples.
+    """
+    regressions = []
+    for name, res in results.items():
+        base = baseline.get(name, None)
+        if base is None or not base["median"]:
+            continue
+        ratio = res["median"] / base["median"]
+        if ratio > 1 + threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("pattern", nargs="?", default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None, help="save the results as JSON")
+    parser.add_argument("--compare", default=None, help="a JSON file of results")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    results = {}
+    for module in _modules():
+        for name, cls, method in _benchmarks(module, args.pattern):
+            for params in _params(cls):
+                label = name + ("" if not params else str(params))
+                try:
+                    times = run_benchmark(cls, method, params, args.repeat)
+                except NotImplementedError:
+                    # the asv way of skipping a parameter combination
+                    print("{:<70} skipped".format(label))
+                    continue
+                res = results[label] = {
+                    "best": min(times),
+                    "median": statistics.median(times),
+                    "times": times,
+                }
+                line = "{:<70} best {:.3e} s  median {:.3e} s".format(
+                    label, res["best"], res["median"]
+                )
+                base = None if baseline is None else baseline.get(label, None)
+                if base is not None and base["median"]:
+                    line += "  {:.2f}x".format(res["median"] / base["median"])
+                print(line)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"machine": _machine(), "results": results}, f, indent=2)
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for name, ratio in regressions:
+            print("REGRESSION {:<59} {:.2f}x slower".format(name, ratio))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(HERE))
+    sys.exit(main())
@@ -1,6 +1,6 @@
 from .wrapping import Wrapper
 from .typing import ishashable, issequence
-from .cp import classproperty
+from .cp import classproperty, ClassPropertyMeta
 from .infix import Infix
 from .attr import attributor
 
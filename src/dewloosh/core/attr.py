@@ -1,6 +1,19 @@
 # -*- coding: utf-8 -*-
 from types import FunctionType
 from abc import abstractmethod
+from typing import Dict
+import weakref
+
+
+__all__ = ["attributor", "marked", "marked_members", "reindex"]
+
+
+# attribute -> the functions decorated with it
+_registry: Dict[str, weakref.WeakSet] = {}
+
+# class -> {attribute: {name: function}}, the marked members of a class
+# including the inherited ones
+_index = weakref.WeakKeyDictionary()
 
 
 def attributor(*attrs: str) -> FunctionType:
@@ -8,6 +21,9 @@ def attributor(*attrs: str) -> FunctionType:
     It renders a decorator a default behaviour. If a decorator
     is called with a None argument, it returns the attribute, otherwise it
     returns the decorated function.
+
+    The decorated functions are registered for every attribute, see
+    :func:`marked` and :func:`marked_members`.
     """
     abstract = "__isabstractmethod__" in attrs
     if abstract:
@@ -21,6 +37,7 @@ def attributor(*attrs: str) -> FunctionType:
         else:
             for attr in attributes:
                 setattr(fnc, attr, True)
+                _registry.setdefault(attr, weakref.WeakSet()).add(fnc)
         if abstract:
             return abstractmethod(fnc)
         return fnc
@@ -28,6 +45,84 @@ def attributor(*attrs: str) -> FunctionType:
     return decorator
 
 
+def marked(attr: str) -> set:
+    """
+    Returns the functions decorated by an attributor with `attr`.
+
+    Examples
+    --------
+    >>> axiom = attributor("__isaxiom__")
+    >>> @axiom
+    ... def foo(a, b):
+    ...     return "an axiom"
+    ...
+    >>> foo in marked("__isaxiom__")
+    True
+    """
+    return set(_registry.get(attr, ()))
+
+
+def _ismarked(value, marks: weakref.WeakSet) -> bool:
+    # staticmethods and classmethods are unwrapped
+    return getattr(value, "__func__", value) in marks
+
+
+def marked_members(cls: type, attr: str) -> Dict[str, FunctionType]:
+    """
+    Returns the members of a class decorated by an attributor with `attr`,
+    including the inherited ones, as a dictionary of names and functions.
+    Members overridden without the decorator in a subclass are not
+    included.
+
+    The result is computed once for every class, without scanning the
+    classes with `dir` and `getattr`. Classes modified after the first
+    query must be reindexed with :func:`reindex`.
+
+    Examples
+    --------
+    >>> axiom = attributor("__isaxiom__")
+    >>> class Foo:
+    ...     @axiom
+    ...     def foo(self):
+    ...         pass
+    ...
+    >>> class Bar(Foo):
+    ...     @axiom
+    ...     def bar(self):
+    ...         pass
+    ...
+    >>> sorted(marked_members(Bar, "__isaxiom__"))
+    ['bar', 'foo']
+    """
+    index = _index.get(cls, None)
+    if index is None:
+        index = _index[cls] = {}
+    members = index.get(attr, None)
+    if members is None:
+        marks = _registry.get(attr, ())
+        members = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in klass.__dict__.items():
+                if _ismarked(value, marks):
+                    members[name] = value
+                else:
+                    members.pop(name, None)
+        index[attr] = members
+    return dict(members)
+
+
+def reindex(cls: type = None):
+    """
+    Clears the index of marked members of a class and its subclasses, or
+    of all classes if `cls` is None.
+    """
+    if cls is None:
+        _index.clear()
+    else:
+        for klass in [k for k in _index if issubclass(k, cls)]:
+            del _index[klass]
+
+
 if __name__ == "__main__":
     axiom = attributor("__isaxiom__")
     abstractaxiom = attributor("__isaxiom__", "__isabstractmethod__")
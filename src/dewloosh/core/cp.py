@@ -4,13 +4,158 @@ Class property borrowed from the astropy package.
 
 import functools
 import threading
+import time
+import weakref
+from collections import namedtuple
+
+from .profiling import profiled
+
+__all__ = ["classproperty", "ClassPropertyMeta", "get_classproperty"]
 
 _NotFound = object()
 
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "currsize"])
+
+# class -> {name: classproperty} for the lazy values installed on classes
+_installed = weakref.WeakKeyDictionary()
+
+# attribute name -> the lazy class properties that depend on it
+_dependents = {}
+
+
+def _resolves_to(cls, name: str):
+    """
+    Returns the class in the MRO of `cls`, whose namespace defines `name`.
+    """
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            return klass
+    return None
+
+
+def _find_classproperty(cls, name: str):
+    """
+    Returns the class property `name` of `cls`, even if its value is
+    installed on the class, or None if `name` is not a class property.
+    """
+    klass = _resolves_to(cls, name)
+    if klass is None:
+        return None
+    prop = klass.__dict__[name]
+    if isinstance(prop, classproperty):
+        return prop
+    return _installed.get(klass, {}).get(name, None)
+
+
+def get_classproperty(cls, name: str) -> "classproperty":
+    """
+    Returns the class property `name` of a class. Unlike the `__dict__` of
+    the class, this also works after the value of a lazy property has been
+    installed on a class of :class:`ClassPropertyMeta`.
+
+    Examples
+    --------
+    >>> class Foo(metaclass=ClassPropertyMeta):
+    ...     @classproperty(lazy=True)
+    ...     def bar(cls):
+    ...         return 1
+    ...
+    >>> Foo.bar
+    1
+    >>> get_classproperty(Foo, "bar").invalidate(Foo)
+    >>> get_classproperty(Foo, "bar").cache_info().currsize
+    0
+    """
+    prop = _find_classproperty(cls, name)
+    if prop is None:
+        raise AttributeError(f"'{cls.__name__}' has no class property '{name}'")
+    return prop
+
+
+def _subclasses(cls):
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from _subclasses(sub)
+
+
+class ClassPropertyMeta(type):
+    """
+    A companion metaclass for classes with class properties.
+
+    For classes of this metaclass
+
+        (a) the value of a lazy `classproperty` is installed on the class
+            as a plain attribute after the first evaluation, so later reads
+            are ordinary class attribute lookups, that bypass the
+            descriptor. Subclasses still get their own values evaluated.
+        (b) class properties can have setters and deleters.
+        (c) setting or deleting a class attribute invalidates the cached
+            values of the lazy class properties that declare a dependency
+            on it, for the class and its subclasses.
+
+    Examples
+    --------
+    >>> class Foo(metaclass=ClassPropertyMeta):
+    ...     _bar_internal = 1
+    ...     @classproperty
+    ...     def bar(cls):
+    ...         return cls._bar_internal
+    ...     @bar.setter
+    ...     def bar(cls, value):
+    ...         cls._bar_internal = value
+    ...     @classproperty(lazy=True, depends_on=["_bar_internal"])
+    ...     def baz(cls):
+    ...         return cls._bar_internal + 1
+    ...
+    >>> Foo.baz
+    2
+    >>> Foo.__dict__["baz"]
+    2
+    >>> Foo.bar = 2
+    >>> Foo.baz
+    3
+    """
+
+    def __init__(cls, name, bases, namespace, *args, **kwargs):
+        super().__init__(name, bases, namespace, *args, **kwargs)
+        # If a base has an installed value, the descriptor is put back on
+        # the new class, so that its own value gets evaluated.
+        for base in cls.__mro__[1:]:
+            for attr, prop in _installed.get(base, {}).items():
+                if _resolves_to(cls, attr) is base:
+                    type.__setattr__(cls, attr, prop)
+        for value in namespace.values():
+            if isinstance(value, classproperty) and value._lazy:
+                for dependency in value._depends_on:
+                    _dependents.setdefault(dependency, weakref.WeakSet()).add(value)
+
+    def __setattr__(cls, name, value):
+        prop = _find_classproperty(cls, name)
+        if prop is None:
+            type.__setattr__(cls, name, value)
+        elif prop._fset is None:
+            raise AttributeError(f"can't set class property '{name}'")
+        else:
+            prop._fset(cls, value)
+            prop.invalidate(cls)
+        cls._invalidate_dependents(name)
+
+    def __delattr__(cls, name):
+        prop = _find_classproperty(cls, name)
+        if prop is None:
+            type.__delattr__(cls, name)
+        elif prop._fdel is None:
+            raise AttributeError(f"can't delete class property '{name}'")
+        else:
+            prop._fdel(cls)
+            prop.invalidate(cls)
+        cls._invalidate_dependents(name)
+
+    def _invalidate_dependents(cls, name: str):
+        for prop in list(_dependents.get(name, ())):
+            prop.invalidate(cls)
+
 
-# TODO: This can still be made to work for setters by implementing an
-# accompanying metaclass that supports it; we just don't need that right
-# this moment
 class classproperty(property):
     """
     Similar to `property`, but allows class-level properties.  That is,
@@ -19,10 +164,9 @@ class classproperty(property):
     must become before this decorator), or the `classmethod` may be omitted
     (it is implicit through use of this decorator).
     .. note::
-        classproperty only works for *read-only* properties.  It does not
-        currently allow writeable/deletable properties, due to subtleties of how
-        Python descriptors work.  In order to implement such properties on a class
-        a metaclass for that class must be implemented.
+        Writeable/deletable class properties require the class to have
+        :class:`ClassPropertyMeta` as its metaclass, due to subtleties of how
+        Python descriptors work.
     Parameters
     ----------
     fget : callable
@@ -38,6 +182,24 @@ class classproperty(property):
         argument can also be used when `classproperty` is used as a decorator
         (see the third example below).  When used in the decorator syntax this
         *must* be passed in as a keyword argument.
+    ttl : float, Optional
+        Only for lazy properties. If provided, cached values expire after
+        this many seconds.
+    depends_on : Iterable[str], Optional
+        Only for lazy properties. Names of class attributes the value
+        depends on. The value is recomputed if any of these attributes
+        is rebound on the class (mutations in place are not detected).
+        For classes of :class:`ClassPropertyMeta`, setting the attributes
+        invalidates the cached values instead.
+    Notes
+    -----
+    The cached values of lazy properties are held in a `WeakKeyDictionary`,
+    so dynamically created classes can be garbage collected. They can be
+    invalidated with the `invalidate` method of the descriptor, which is
+    returned by :func:`get_classproperty`, and `cache_info` reports the
+    number of cache hits and misses. For classes of :class:`ClassPropertyMeta`,
+    the `__dict__` of a class holds the installed value instead of the
+    descriptor, after the first evaluation.
     Examples
     --------
     ::
@@ -55,9 +217,8 @@ class classproperty(property):
         >>> foo_instance._bar_internal = 2
         >>> foo_instance.bar  # Ignores instance attributes
         2
-    As previously noted, a `classproperty` is limited to implementing
-    read-only attributes::
-        >>> class Foo:
+    As previously noted, a `classproperty` with a setter needs a metaclass::
+        >>> class Foo(metaclass=ClassPropertyMeta):
         ...     _bar_internal = 1
         ...     @classproperty
         ...     def bar(cls):
@@ -66,10 +227,9 @@ class classproperty(property):
         ...     def bar(cls, value):
         ...         cls._bar_internal = value
         ...
-        Traceback (most recent call last):
-        ...
-        NotImplementedError: classproperty can only be read-only; use a
-        metaclass to implement modifiable class-level properties
+        >>> Foo.bar = 2
+        >>> Foo.bar
+        2
     When the ``lazy`` option is used, the getter is only called once::
         >>> class Foo:
         ...     @classproperty(lazy=True)
@@ -92,24 +252,54 @@ class classproperty(property):
         1
         >>> FooSub.bar
         1
+    Cached values can be invalidated, for a class and its subclasses, or
+    for all classes at once::
+        >>> get_classproperty(Foo, "bar").invalidate(Foo)
+        >>> Foo.bar
+        Performing complicated calculation
+        1
+    With ``depends_on``, the value is recomputed if any of the listed class
+    attributes changes::
+        >>> class Foo:
+        ...     _bar_internal = 1
+        ...     @classproperty(lazy=True, depends_on=["_bar_internal"])
+        ...     def bar(cls):
+        ...         return cls._bar_internal + 1
+        ...
+        >>> Foo.bar
+        2
+        >>> Foo._bar_internal = 2
+        >>> Foo.bar
+        3
     """
 
-    def __new__(cls, fget=None, doc=None, lazy=False):
+    def __new__(cls, fget=None, doc=None, lazy=False, ttl=None, depends_on=None):
         if fget is None:
             # Being used as a decorator--return a wrapper that implements
             # decorator syntax
             def wrapper(func):
-                return cls(func, lazy=lazy)
+                return cls(func, lazy=lazy, ttl=ttl, depends_on=depends_on)
 
             return wrapper
 
         return super().__new__(cls)
 
-    def __init__(self, fget, doc=None, lazy=False):
+    def __init__(self, fget, doc=None, lazy=False, ttl=None, depends_on=None):
         self._lazy = lazy
+        self._ttl = ttl
+        self._depends_on = tuple(depends_on) if depends_on else ()
+        # cached values are checked for expiration or changed dependencies
+        self._checked = ttl is not None or len(self._depends_on) > 0
+        if self._checked and not lazy:
+            raise ValueError("'ttl' and 'depends_on' require 'lazy=True'.")
+        self._hits = 0
+        self._misses = 0
+        self._name = None
+        self._fset = None
+        self._fdel = None
         if lazy:
             self._lock = threading.RLock()  # Protects _cache
-            self._cache = {}
+            self._cache = weakref.WeakKeyDictionary()
         fget = self._wrap_fget(fget)
 
         super().__init__(fget=fget, doc=doc)
@@ -122,16 +312,28 @@ class classproperty(property):
         if doc is not None:
             self.__doc__ = doc
 
+    @profiled()
     def __get__(self, obj, objtype):
         if self._lazy:
             val = self._cache.get(objtype, _NotFound)
-            if val is _NotFound:
+            if val is _NotFound or (self._checked and not self._isvalid(objtype, val)):
                 with self._lock:
                     # Check if another thread initialised before we locked.
                     val = self._cache.get(objtype, _NotFound)
-                    if val is _NotFound:
-                        val = self.fget.__wrapped__(objtype)
+                    if val is _NotFound or (
+                        self._checked and not self._isvalid(objtype, val)
+                    ):
+                        self._misses += 1
+                        val = self._evaluate(objtype)
                         self._cache[objtype] = val
+                        if self._installable(objtype):
+                            self._install(objtype, val[0] if self._checked else val)
+                    else:
+                        self._hits += 1
+            else:
+                self._hits += 1
+            if self._checked:
+                val = val[0]
         else:
             # The base property.__get__ will just return self here;
             # instead we pass objtype through to the original wrapped
@@ -139,20 +341,123 @@ class classproperty(property):
             val = self.fget.__wrapped__(objtype)
         return val
 
+    def __set_name__(self, owner, name):
+        self._name = name
+        if (self._fset or self._fdel) and not isinstance(owner, ClassPropertyMeta):
+            raise TypeError(
+                "classproperty can only be read-only; use ClassPropertyMeta "
+                "as the metaclass to implement modifiable class-level properties"
+            )
+
+    def _installable(self, objtype) -> bool:
+        # dependencies need no checks here, the metaclass takes care of them
+        return (
+            self._ttl is None
+            and self._name is not None
+            and isinstance(objtype, ClassPropertyMeta)
+            and _resolves_to(objtype, self._name) is not None
+        )
+
+    def _install(self, objtype, val):
+        """
+        Installs a value on a class, shadowing the descriptor. Existing
+        subclasses that inherited the descriptor from `objtype` get the
+        descriptor in their own namespace, new ones get it from the
+        metaclass.
+        """
+        name = self._name
+        owner = _resolves_to(objtype, name)
+        for sub in list(_subclasses(objtype)):
+            if _resolves_to(sub, name) is owner:
+                type.__setattr__(sub, name, self)
+        type.__setattr__(objtype, name, val)
+        _installed.setdefault(objtype, {})[name] = self
+
+    def _uninstall(self, objtype):
+        installed = _installed.get(objtype, {})
+        if installed.get(self._name, None) is self:
+            del installed[self._name]
+            type.__setattr__(objtype, self._name, self)
+
+    def _evaluate(self, objtype):
+        val = self.fget.__wrapped__(objtype)
+        if not self._checked:
+            return val
+        expires = None if self._ttl is None else time.monotonic() + self._ttl
+        return val, expires, self._dependencies(objtype)
+
+    def _dependencies(self, objtype) -> tuple:
+        return tuple(getattr(objtype, name, _NotFound) for name in self._depends_on)
+
+    def _isvalid(self, objtype, entry) -> bool:
+        _, expires, dependencies = entry
+        if expires is not None and time.monotonic() > expires:
+            return False
+        current = self._dependencies(objtype)
+        return all(a is b for a, b in zip(current, dependencies))
+
+    def invalidate(self, cls=None):
+        """
+        Invalidates the cached values of a lazy property for a class and
+        its subclasses, or for all classes if `cls` is None.
+        """
+        if not self._lazy:
+            return
+        with self._lock:
+            if cls is None:
+                keys = list(self._cache)
+            else:
+                keys = [k for k in self._cache if issubclass(k, cls)]
+            for key in keys:
+                del self._cache[key]
+                self._uninstall(key)
+
+    def cache_info(self) -> CacheInfo:
+        """
+        Returns the number of cache hits, cache misses and the number of
+        cached values of a lazy property. The counters are not synchronized
+        between threads, they are meant for profiling.
+        """
+        currsize = len(self._cache) if self._lazy else 0
+        return CacheInfo(self._hits, self._misses, currsize)
+
     def getter(self, fget):
-        return super().getter(self._wrap_fget(fget))
+        """
+        Returns a copy of the property with another getter.
+        """
+        return self._copy(fget=fget)
 
     def setter(self, fset):
-        raise NotImplementedError(
-            "classproperty can only be read-only; use a metaclass to "
-            "implement modifiable class-level properties"
-        )
+        """
+        Returns a copy of the property with a setter, that is called with
+        the class and the value. Requires :class:`ClassPropertyMeta`.
+        """
+        return self._copy(fset=fset)
 
     def deleter(self, fdel):
-        raise NotImplementedError(
-            "classproperty can only be read-only; use a metaclass to "
-            "implement modifiable class-level properties"
+        """
+        Returns a copy of the property with a deleter, that is called with
+        the class. Requires :class:`ClassPropertyMeta`.
+        """
+        return self._copy(fdel=fdel)
+
+    def _copy(self, fget=_NotFound, fset=_NotFound, fdel=_NotFound):
+        if fget is _NotFound:
+            fget = self.fget.__wrapped__
+        prop = type(self)(
+            fget,
+            doc=self.__doc__,
+            lazy=self._lazy,
+            ttl=self._ttl,
+            depends_on=self._depends_on,
         )
+        if isinstance(fset, classmethod):
+            fset = fset.__func__
+        if isinstance(fdel, classmethod):
+            fdel = fdel.__func__
+        prop._fset = self._fset if fset is _NotFound else fset
+        prop._fdel = self._fdel if fdel is _NotFound else fdel
+        return prop
 
     @staticmethod
     def _wrap_fget(orig_fget):
@@ -1,31 +1,629 @@
 # -*- coding: utf-8 -*-
-from typing import Callable
+from typing import Callable, Union, Hashable, Iterable
+from collections import OrderedDict, namedtuple
+import functools
+import hashlib
+import threading
+from inspect import signature, Parameter
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+import os
+import pickle
+import types
+
 import numpy as np
 from numpy import ndarray
 
+try:
+    from multiprocessing import shared_memory
+
+    __has_shared_memory__ = True
+except ImportError:
+    __has_shared_memory__ = False
+
 
-__all__ = ["squeeze"]
+__all__ = ["squeeze", "vectorize", "memoize"]
 
 
 def squeeze_if_array(arr):
-    return np.squeeze(arr) if isinstance(arr, ndarray) else arr
+    return arr.squeeze() if isinstance(arr, ndarray) else arr
+
+
+def _squeeze_result(res):
+    if isinstance(res, ndarray):
+        return res.squeeze()
+    elif isinstance(res, tuple):
+        return tuple(map(squeeze_if_array, res))
+    elif isinstance(res, dict):
+        return {k: squeeze_if_array(v) for k, v in res.items()}
+    return res
+
+
+def _copy_into(res, out):
+    """
+    Copies the results of a function into preallocated buffers, and
+    returns the buffers.
+    """
+    if isinstance(out, tuple):
+        for r, o in zip(res, out):
+            o[...] = r
+    elif isinstance(out, dict):
+        for k, o in out.items():
+            o[...] = res[k]
+    else:
+        out[...] = res
+    return out
+
+
+def _with_keywords(sig, *names: str):
+    """
+    Returns a signature with some keyword-only arguments added.
+    """
+    params = list(sig.parameters.values())
+    pos = len(params)
+    if params and params[-1].kind is Parameter.VAR_KEYWORD:
+        pos -= 1
+    for name, default in names:
+        if name not in sig.parameters:
+            params.insert(pos, Parameter(name, Parameter.KEYWORD_ONLY, default=default))
+            pos += 1
+    return sig.replace(parameters=params)
+
 
+def squeeze(default: bool = True, fixed: bool = False) -> Callable:
+    """
+    Returns a decorator, that squeezes the NumPy arrays returned by a
+    function. Arrays in tuples and dictionaries are squeezed as well.
+
+    Squeezing can be turned on or off with the keyword argument `squeeze`
+    of the decorated function. The results can be written into preallocated
+    buffers provided with the keyword argument `out`. If the decorated
+    function has an argument `out`, the buffers are passed to it, otherwise
+    the results are copied into them. Either way, the squeezed results are
+    views of the buffers.
+
+    Parameters
+    ----------
+    default : bool, Optional
+        The default value of the `squeeze` argument. Default is True.
+    fixed : bool, Optional
+        If True, the decorated function has no `squeeze` argument, the
+        behaviour is decided once here. With `default=False`, the function
+        is returned as it is. Default is False.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> @squeeze()
+    ... def foo(n):
+    ...     return np.ones((1, n))
+    ...
+    >>> foo(3).shape
+    (3,)
+    >>> foo(3, squeeze=False).shape
+    (1, 3)
+    >>> buffer = np.zeros((1, 3))
+    >>> foo(3, out=buffer).base is buffer
+    True
+    """
 
-def squeeze(default=True):
     def decorator(fnc: Callable):
-        def inner(*args, squeeze: bool = default, **kwargs):
-            if squeeze:
+        if fixed and not default:
+            return fnc
+        try:
+            sig = signature(fnc)
+        except (TypeError, ValueError):
+            sig = None
+        has_out = sig is not None and "out" in sig.parameters
+
+        def call(args, kwargs):
+            # only called if `out` is provided
+            if has_out:
                 res = fnc(*args, **kwargs)
-                if isinstance(res, tuple):
-                    return list(map(squeeze_if_array, res))
-                elif isinstance(res, dict):
-                    return {k: squeeze_if_array(v) for k, v in res.items()}
-                else:
-                    return squeeze_if_array(res)
+                return kwargs["out"] if res is None else res
+            out = kwargs.pop("out")
+            if out is None:
+                return fnc(*args, **kwargs)
+            return _copy_into(fnc(*args, **kwargs), out)
+
+        if fixed:
+
+            @functools.wraps(fnc)
+            def inner(*args, **kwargs):
+                if "out" in kwargs:
+                    return _squeeze_result(call(args, kwargs))
+                return _squeeze_result(fnc(*args, **kwargs))
+
+        else:
+
+            @functools.wraps(fnc)
+            def inner(*args, **kwargs):
+                if kwargs.pop("squeeze", default):
+                    if "out" in kwargs:
+                        return _squeeze_result(call(args, kwargs))
+                    return _squeeze_result(fnc(*args, **kwargs))
+                elif "out" in kwargs:
+                    return call(args, kwargs)
+                return fnc(*args, **kwargs)
+
+        if sig is not None:
+            keywords = [("out", None)]
+            if not fixed:
+                keywords.append(("squeeze", default))
+            inner.__signature__ = _with_keywords(sig, *keywords)
+        return inner
+
+    return decorator
+
+
+def _attach(spec: tuple, handles: list) -> ndarray:
+    name, dtype, shape = spec
+    shm = shared_memory.SharedMemory(name=name)
+    handles.append(shm)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _run_chunk(kernel, arrays, shared, out, start, stop, kwargs):
+    for i in range(start, stop):
+        args = [v if a is None else a[i] for a, v in zip(arrays, shared)]
+        out[i] = kernel(*args, **kwargs)
+
+
+def _run_chunk_shared(target, specs, shared, out_spec, start, stop, kwargs):
+    """
+    Runs a chunk in a worker process, on inputs and output in shared memory.
+    """
+    kernel = getattr(target, "__vectorized_kernel__", target)
+    handles = []
+    try:
+        arrays = [None if spec is None else _attach(spec, handles) for spec in specs]
+        out = _attach(out_spec, handles)
+        _run_chunk(kernel, arrays, shared, out, start, stop, kwargs)
+    finally:
+        # the views must be released before the shared memory is closed
+        arrays = out = None
+        for shm in handles:
+            shm.close()
+
+
+def _picklable(fnc: Callable) -> bool:
+    try:
+        pickle.dumps(fnc)
+        return True
+    except Exception:
+        return False
+
+
+def _to_shared(arr: ndarray, handles: list) -> tuple:
+    shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+    handles.append(shm)
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return shm.name, arr.dtype.str, arr.shape
+
+
+def vectorize(
+    batch_axis: int = None,
+    chunksize: int = None,
+    executor: Union[str, Executor] = None,
+    workers: int = None,
+) -> Callable:
+    """
+    Returns a decorator, that turns a kernel written for a single element
+    into a function that evaluates it for a stack of elements.
+
+    The positional NumPy array arguments of the decorated function are
+    the stacked inputs, the elements being along the first axis. All
+    other arguments are passed to every call of the kernel unchanged.
+    The results are written into one preallocated output array, which
+    can also be provided with the keyword argument `out`.
+
+    Parameters
+    ----------
+    batch_axis : int, Optional
+        If provided, the kernel is assumed to handle stacked inputs
+        natively, with the elements along this axis, both for the inputs
+        and the output. Then the kernel is called with chunks of the
+        inputs, or once if `chunksize` is None. Default is None.
+    chunksize : int, Optional
+        The number of elements in a chunk. If not provided, the elements
+        are split evenly between the workers. Default is None.
+    executor : str or concurrent.futures.Executor, Optional
+        'thread' or 'process' to evaluate the chunks in a pool of threads
+        or processes, or an executor to use. A pool is created at the first
+        call of the decorated function and reused by the later calls. With
+        processes, the inputs and the output are placed in shared memory,
+        and the kernel, or the decorated function, must be picklable.
+        Default is None, which means serial evaluation.
+    workers : int, Optional
+        The number of workers, if a pool is created. Default is None.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> @vectorize()
+    ... def norm(x, p=2):
+    ...     return np.sum(np.abs(x) ** p) ** (1 / p)
+    ...
+    >>> norm(np.ones((4, 3)), p=1)
+    array([3., 3., 3., 3.])
+    """
+    if executor not in (None, "thread", "process") and not isinstance(
+        executor, Executor
+    ):
+        raise ValueError(f"Invalid executor '{executor}'.")
+    if executor == "process" and not __has_shared_memory__:
+        raise ImportError("You need Python 3.8 or newer for process executors.")
+
+    def decorator(fnc: Callable):
+        # the pool of the decorated function, created at the first call
+        pool = [executor if isinstance(executor, Executor) else None]
+        lock = threading.Lock()
+
+        def get_pool() -> Executor:
+            with lock:
+                if pool[0] is None:
+                    nworkers = workers or os.cpu_count() or 1
+                    if executor == "thread":
+                        pool[0] = ThreadPoolExecutor(nworkers)
+                    else:
+                        pool[0] = ProcessPoolExecutor(nworkers)
+                return pool[0]
+
+        @functools.wraps(fnc)
+        def inner(*args, out: ndarray = None, **kwargs):
+            if batch_axis is not None:
+                return _evaluate_batched(fnc, args, kwargs, out)
+            if executor is None:
+                return _evaluate(None, fnc, fnc, args, kwargs, out)
+            return _evaluate(get_pool(), target, fnc, args, kwargs, out)
+
+        # Processes receive the kernel if it can be pickled, otherwise the
+        # decorated function, that can be pickled if it is defined at module
+        # level. The name of a decorated module level function is not bound
+        # yet, so its kernel can not be pickled.
+        target = fnc
+        if executor == "process" or isinstance(executor, ProcessPoolExecutor):
+            target = fnc if _picklable(fnc) else inner
+        inner.__vectorized_kernel__ = fnc
+        return inner
+
+    def _evaluate_batched(fnc, args, kwargs, out):
+        arrays = [a for a in args if isinstance(a, ndarray)]
+        if chunksize is None or not arrays:
+            res = fnc(*args, **kwargs)
+            if out is None:
+                return res
+            out[...] = res
+            return out
+        n = arrays[0].shape[batch_axis]
+        for start in range(0, n, chunksize):
+            index = (slice(None),) * batch_axis + (slice(start, start + chunksize),)
+            chunk = [a[index] if isinstance(a, ndarray) else a for a in args]
+            res = fnc(*chunk, **kwargs)
+            if out is None:
+                shape = list(np.shape(res))
+                shape[batch_axis] = n
+                out = np.empty(shape, dtype=np.result_type(res))
+            out[index] = res
+        return out
+
+    def _evaluate(pool, target, fnc, args, kwargs, out):
+        arrays = [a if isinstance(a, ndarray) else None for a in args]
+        shared = [None if isinstance(a, ndarray) else a for a in args]
+        sizes = {len(a) for a in arrays if a is not None}
+        if len(sizes) != 1:
+            raise ValueError("The stacked inputs must have the same length.")
+        n = sizes.pop()
+        start = 0
+        if out is None:
+            # the first element tells the shape and the type of the output
+            first = np.asarray(
+                fnc(
+                    *[v if a is None else a[0] for a, v in zip(arrays, shared)],
+                    **kwargs,
+                )
+            )
+            out = np.empty((n,) + first.shape, dtype=first.dtype)
+            if n > 0:
+                out[0] = first
+                start = 1
+        if start >= n:
+            return out
+        if pool is None:
+            _run_chunk(fnc, arrays, shared, out, start, n, kwargs)
+            return out
+
+        nworkers = getattr(pool, "_max_workers", None) or os.cpu_count() or 1
+        step = chunksize or -(-(n - start) // (4 * nworkers))
+        chunks = [(i, min(i + step, n)) for i in range(start, n, step)]
+        handles = []
+        try:
+            if isinstance(pool, ProcessPoolExecutor):
+                if not __has_shared_memory__:
+                    raise ImportError(
+                        "You need Python 3.8 or newer for process executors."
+                    )
+                specs = [None if a is None else _to_shared(a, handles) for a in arrays]
+                out_spec = _to_shared(out, handles)
+                futures = [
+                    pool.submit(
+                        _run_chunk_shared, target, specs, shared, out_spec, i, j, kwargs
+                    )
+                    for i, j in chunks
+                ]
+                for future in futures:
+                    future.result()
+                name, dtype, shape = out_spec
+                res = np.ndarray(shape, dtype=dtype, buffer=handles[-1].buf)
+                out[start:] = res[start:]
+                del res
             else:
+                futures = [
+                    pool.submit(_run_chunk, fnc, arrays, shared, out, i, j, kwargs)
+                    for i, j in chunks
+                ]
+                for future in futures:
+                    future.result()
+        finally:
+            for shm in handles:
+                shm.close()
+                shm.unlink()
+        return out
+
+    return decorator
+
+
+CacheInfo = namedtuple(
+    "CacheInfo", ["hits", "misses", "maxsize", "currsize", "maxbytes", "currbytes"]
+)
+
+
+def _array_key(arr: ndarray) -> Union[tuple, None]:
+    # the key of an array is its content, not its identity
+    if arr.dtype.hasobject or arr.dtype.fields is not None:
+        # the bytes of objects are pointers, and structured arrays may
+        # have padding bytes of any value
+        return None
+    data = np.ascontiguousarray(arr).reshape(-1).view(np.uint8)
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    return (ndarray, arr.dtype.str, arr.shape, digest)
+
+
+def _make_key(args: tuple, kwargs: dict) -> Union[tuple, None]:
+    """
+    Returns a hashable key for the arguments of a call, or None if some of
+    the arguments are neither arrays, nor hashable.
+    """
+    # the types are part of the key, since 1, 1.0 and True are equal
+    key = []
+    for value in args:
+        if isinstance(value, ndarray):
+            akey = _array_key(value)
+            if akey is None:
+                return None
+            key.append(akey)
+        elif isinstance(value, Hashable):
+            key.append((type(value), value))
+        else:
+            return None
+    for name in sorted(kwargs):
+        value = kwargs[name]
+        if isinstance(value, ndarray):
+            akey = _array_key(value)
+            if akey is None:
+                return None
+            key.append((name, akey))
+        elif isinstance(value, Hashable):
+            key.append((name, type(value), value))
+        else:
+            return None
+    key = tuple(key)
+    try:
+        hash(key)
+    except TypeError:
+        # hashable containers of unhashable objects, like tuples of lists
+        return None
+    return key
+
+
+def _freeze(res, arrays: Iterable[ndarray] = ()) -> tuple:
+    """
+    Returns a copy of a result with read-only views of its arrays, and the
+    size of the arrays in bytes. The arrays themselves are not changed, but
+    arrays sharing memory with any of `arrays`, the arguments of the call,
+    are copied, so that the caller can't change the cached result.
+    """
+    if isinstance(res, ndarray):
+        if any(np.shares_memory(res, a) for a in arrays):
+            res = res.copy()
+        view = res.view()
+        view.flags.writeable = False
+        return view, res.nbytes
+    elif isinstance(res, tuple):
+        items = [_freeze(r, arrays) for r in res]
+        values = [r for r, _ in items]
+        frozen = res._make(values) if hasattr(res, "_make") else tuple(values)
+        return frozen, sum(n for _, n in items)
+    elif isinstance(res, dict):
+        items = {k: _freeze(v, arrays) for k, v in res.items()}
+        frozen = {k: v for k, (v, _) in items.items()}
+        return frozen, sum(n for _, n in items.values())
+    return res, 0
+
+
+def _fingerprint(code: types.CodeType, h):
+    """
+    Updates a hash with the bytecode, the constants and the names of a
+    code object, which change if the function is changed.
+    """
+    h.update(code.co_code)
+    h.update(" ".join(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _fingerprint(const, h)
+        elif isinstance(const, frozenset):
+            h.update(repr(sorted(map(repr, const))).encode())
+        else:
+            h.update(repr(const).encode())
+
+
+def memoize(
+    maxbytes: int = 2**27, maxsize: int = 1024, disk: bool = False, path: str = None
+) -> Callable:
+    """
+    Returns a decorator, that caches the results of a pure function with
+    NumPy array arguments.
+
+    Arrays are identified by their type, shape and the hash of their
+    content, all other arguments must be hashable. Calls with other
+    arguments, or arrays of objects or structured arrays, are not cached.
+    The cache is bound by the total size of the cached arrays and by the
+    number of the cached results, and the least recently used results are
+    dropped first. The cached arrays are read-only, since they are shared
+    by all callers. Results sharing memory with the arguments are copied.
+
+    The decorated function has the methods `cache_info` and `cache_clear`,
+    like the functions decorated with :func:`functools.lru_cache`.
+
+    Parameters
+    ----------
+    maxbytes : int, Optional
+        The maximum size of the cached arrays in memory, in bytes.
+        Default is 128 MB.
+    maxsize : int, Optional
+        The maximum number of cached results, which also bounds the cache
+        if the results have no arrays. Default is 1024.
+    disk : bool, Optional
+        If True, the results are also stored on disk and survive the
+        session. Default is False.
+    path : str, Optional
+        The folder of the disk cache. Default is a folder named after the
+        function in the `cache` folder of the user data path.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> @memoize()
+    ... def gauss_points(x, n):
+    ...     return np.polynomial.legendre.leggauss(n)[0] * x
+    ...
+    >>> x = np.ones(3)
+    >>> gauss_points(x[0], 2) is gauss_points(x[0], 2)
+    True
+    >>> gauss_points.cache_info()
+    CacheInfo(hits=1, misses=1, maxsize=1024, currsize=1, maxbytes=134217728, currbytes=16)
+    """
+
+    def decorator(fnc: Callable):
+        cache = OrderedDict()
+        lock = threading.RLock()
+        stats = {"hits": 0, "misses": 0, "bytes": 0}
+        folder = [path]
+        # results stored on disk by other versions of the function are not used
+        version = hashlib.blake2b(digest_size=20)
+        code = getattr(fnc, "__code__", None)
+        if code is not None:
+            _fingerprint(code, version)
+
+        def disk_path(key) -> Union[str, None]:
+            if folder[0] is None:
+                # imported here to avoid a circular import
+                from dewloosh.core import USER_DATA_PATH
+
+                if not USER_DATA_PATH:
+                    return None
+                name = fnc.__module__ + "." + fnc.__qualname__
+                folder[0] = os.path.join(USER_DATA_PATH, "cache", name)
+            try:
+                h = version.copy()
+                h.update(pickle.dumps(key))
+            except Exception:
+                return None
+            return os.path.join(folder[0], h.hexdigest() + ".pkl")
+
+        def load(key):
+            filepath = disk_path(key)
+            if filepath is None or not os.path.isfile(filepath):
+                return None
+            try:
+                with open(filepath, "rb") as f:
+                    return pickle.load(f)
+            except Exception:
+                # a corrupt or incompatible entry is recomputed
+                return None
+
+        def store(key, res):
+            from dewloosh.core.io import _open_for_writing
+
+            filepath = disk_path(key)
+            if filepath is None:
+                return
+            try:
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                with _open_for_writing(filepath, "wb", atomic=True) as f:
+                    pickle.dump(res, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                pass
+
+        def insert(key, res, nbytes):
+            if nbytes > maxbytes:
+                return
+            with lock:
+                if key in cache:
+                    return
+                cache[key] = (res, nbytes)
+                stats["bytes"] += nbytes
+                while stats["bytes"] > maxbytes or len(cache) > maxsize:
+                    _, (_, size) = cache.popitem(last=False)
+                    stats["bytes"] -= size
+
+        @functools.wraps(fnc)
+        def inner(*args, **kwargs):
+            key = _make_key(args, kwargs)
+            if key is None:
                 return fnc(*args, **kwargs)
+            with lock:
+                entry = cache.get(key, None)
+                if entry is not None:
+                    cache.move_to_end(key)
+                    stats["hits"] += 1
+                    return entry[0]
+                stats["misses"] += 1
+            res = load(key) if disk else None
+            if res is None:
+                res = fnc(*args, **kwargs)
+                if disk:
+                    store(key, res)
+            arrays = [a for a in args if isinstance(a, ndarray)]
+            arrays += [a for a in kwargs.values() if isinstance(a, ndarray)]
+            res, nbytes = _freeze(res, arrays)
+            insert(key, res, nbytes)
+            return res
+
+        def cache_info() -> CacheInfo:
+            with lock:
+                return CacheInfo(
+                    stats["hits"],
+                    stats["misses"],
+                    maxsize,
+                    len(cache),
+                    maxbytes,
+                    stats["bytes"],
+                )
+
+        def cache_clear(disk: bool = False):
+            """
+            Clears the cache in memory, and also on disk if `disk` is True.
+            """
+            with lock:
+                cache.clear()
+                stats.update(hits=0, misses=0, bytes=0)
+            if disk and folder[0] is not None and os.path.isdir(folder[0]):
+                for name in os.listdir(folder[0]):
+                    if name.endswith(".pkl"):
+                        os.remove(os.path.join(folder[0], name))
 
-        inner.__doc__ = fnc.__doc__
+        inner.cache_info = cache_info
+        inner.cache_clear = cache_clear
         return inner
 
     return decorator
@@ -25,6 +25,7 @@ except ImportError:
     __haspv__ = False
 
 from . import EXAMPLES_PATH, DEWLOOSH_DATA_PATH as DATA_PATH
+from .profiling import profiled
 
 
 def _check_examples_path():
@@ -79,6 +80,7 @@ def _repo_file_request(repo_path, filename):
     return os.path.join(repo_path, "Data", filename), None
 
 
+@profiled()
 def _retrieve_file(retriever, filename):
     """
     Retrieve file and cache it in dewloosh.core.EXAMPLES_PATH.
@@ -1,5 +1,30 @@
 # -*- coding: utf-8 -*-
-from typing import Callable
+from typing import Callable, Union
+
+import numpy as np
+from numpy import ndarray
+
+try:
+    import numexpr
+
+    __has_numexpr__ = True
+except ImportError:
+    __has_numexpr__ = False
+
+
+__all__ = ["Infix", "Expression"]
+
+
+# number of elements evaluated at once by lazy expressions
+CHUNKSIZE = 2**14
+
+_NUMEXPR_OPS = {
+    np.add: "+",
+    np.subtract: "-",
+    np.multiply: "*",
+    np.true_divide: "/",
+    np.power: "**",
+}
 
 
 class Infix:
@@ -7,6 +32,29 @@ class Infix:
     Implements a custom Infix operator using  the
     operators '<<', '>>' and '|'.
 
+    Parameters
+    ----------
+    function : Callable
+        A function of two arguments.
+    ufunc : Callable, Optional
+        An implementation of the operation, that is used if any of the
+        operands is a NumPy array. It must accept the keyword argument `out`,
+        like NumPy's ufuncs do. If not provided and `function` is a ufunc,
+        `function` is used for arrays as well. Default is None.
+    out : numpy.ndarray, Optional
+        A buffer for the results. Default is None.
+    lazy : bool, Optional
+        If True, expressions are not evaluated, but an :class:`Expression`
+        is returned, that can be evaluated later in one go. If `out` is
+        provided, the expressions are evaluated into it, unless another
+        buffer is passed to :func:`Expression.evaluate`. Default is False.
+    elementwise : bool, Optional
+        Whether the operation is elementwise, so that lazy expressions can be
+        evaluated in chunks. Expressions with operators, that are not
+        elementwise, like ones computing means or sums over an axis, are
+        evaluated on the whole arrays at once. Default is None, which means
+        True if `function` or `ufunc` is a NumPy ufunc, False otherwise.
+
     Examples
     --------
     >>> mul = Infix(lambda x, y: x * y)
@@ -16,22 +64,302 @@ class Infix:
     >>> add = Infix(lambda x, y: x + y)
     >>> print(2 << add >> 4)
     6
+
+    With arrays, the result can be written into a preallocated buffer:
+
+    >>> import numpy as np
+    >>> add = Infix(lambda x, y: x + y, ufunc=np.add)
+    >>> a, b, out = np.ones(3), np.ones(3), np.zeros(3)
+    >>> add_into_out = add.into(out)
+    >>> a | add_into_out | b
+    array([2., 2., 2.])
+
+    Lazy operators build an expression, that is evaluated in chunks,
+    without allocating full-size temporaries for the intermediate results:
+
+    >>> add = Infix(np.add, lazy=True)
+    >>> mul = Infix(np.multiply, lazy=True)
+    >>> expr = a | add | b | mul | b
+    >>> expr.evaluate()
+    array([2., 2., 2.])
+
+    Functions, that are not ufuncs, need to be declared elementwise to
+    be evaluated in chunks:
+
+    >>> sub = Infix(lambda x, y: x - y, lazy=True, elementwise=True)
+    >>> (a | sub | b).evaluate()
+    array([0., 0., 0.])
     """
 
-    def __init__(self, function: Callable):
+    # makes NumPy defer to the reflected operators of this class, so
+    # that `a | op` with an array `a` is not broadcasted over the array
+    __array_ufunc__ = None
+
+    def __init__(
+        self,
+        function: Callable,
+        ufunc: Callable = None,
+        out: ndarray = None,
+        lazy: bool = False,
+        elementwise: bool = None,
+    ):
         self.function = function
+        if ufunc is None and isinstance(function, np.ufunc):
+            ufunc = function
+        self.ufunc = ufunc
+        self.out = out
+        self.lazy = lazy
+        if elementwise is None:
+            elementwise = isinstance(ufunc, np.ufunc)
+        self.elementwise = elementwise
+        # the implementation is selected once here, not for every expression
+        if lazy:
+            self._apply = self._expression
+        elif ufunc is None and out is None:
+            self._apply = function
+        else:
+            self._apply = self._dispatch
+
+    def _dispatch(self, value1, value2):
+        if self.ufunc is not None and (
+            isinstance(value1, ndarray) or isinstance(value2, ndarray)
+        ):
+            if self.out is None:
+                return self.ufunc(value1, value2)
+            return self.ufunc(value1, value2, out=self.out)
+        res = self.function(value1, value2)
+        if self.out is not None:
+            self.out[...] = res
+            return self.out
+        return res
+
+    def _expression(self, value1, value2) -> "Expression":
+        return Expression(self, value1, value2)
+
+    def into(self, out: ndarray) -> "Infix":
+        """
+        Returns a version of the operator, that writes its results into
+        `out`. Create it once and reuse it, to avoid allocating the
+        result in every evaluation.
+        """
+        return Infix(
+            self.function,
+            ufunc=self.ufunc,
+            out=out,
+            lazy=self.lazy,
+            elementwise=self.elementwise,
+        )
 
     def __ror__(self, other):
-        return Infix(lambda x, self=self, other=other: self.function(other, x))
+        return _BoundInfix(self, other)
 
     def __or__(self, other):
         return self.function(other)
 
     def __rlshift__(self, other):
-        return Infix(lambda x, self=self, other=other: self.function(other, x))
+        return _BoundInfix(self, other)
 
     def __rshift__(self, other):
         return self.function(other)
 
-    def __call__(self, value1, value2):
-        return self.function(value1, value2)
+    def __call__(self, value1, value2, out: ndarray = None):
+        if out is not None:
+            return self.into(out)._apply(value1, value2)
+        return self._apply(value1, value2)
+
+
+class _BoundInfix:
+    """
+    An infix operator with its left operand bound, like `a | op`.
+    """
+
+    __slots__ = ("infix", "left")
+
+    def __init__(self, infix: Infix, left):
+        self.infix = infix
+        self.left = left
+
+    def __or__(self, other):
+        return self.infix._apply(self.left, other)
+
+    def __rshift__(self, other):
+        return self.infix._apply(self.left, other)
+
+
+class Expression:
+    """
+    A binary expression tree built by lazy infix operators. The leaves
+    of the tree are arrays or scalars, the nodes are :class:`Infix`
+    operators.
+
+    The expression is evaluated blockwise along the first axis of the
+    result, in chunks of roughly :data:`CHUNKSIZE` elements. Every node
+    of the tree gets a chunk-sized buffer, that is reused for all the
+    chunks, so the peak memory is the output array plus the chunk buffers.
+    This requires every operator of the tree to be elementwise, otherwise
+    the expression is evaluated on the whole arrays at once.
+    If `numexpr` is installed and every operator of the tree is an
+    arithmetic ufunc, the evaluation can be delegated to `numexpr`.
+    """
+
+    __slots__ = ("infix", "left", "right")
+
+    def __init__(self, infix: Infix, left, right):
+        self.infix = infix
+        self.left = left
+        self.right = right
+
+    def __array__(self, dtype=None, copy=None):
+        res = self.evaluate()
+        return res if dtype is None else res.astype(dtype, copy=False)
+
+    def _leaves(self) -> list:
+        leaves = []
+        for operand in (self.left, self.right):
+            if isinstance(operand, Expression):
+                leaves.extend(operand._leaves())
+            else:
+                leaves.append(operand)
+        return leaves
+
+    def _elementwise(self) -> bool:
+        if not self.infix.elementwise:
+            return False
+        for operand in (self.left, self.right):
+            if isinstance(operand, Expression) and not operand._elementwise():
+                return False
+        return True
+
+    def _to_numexpr(self, names: dict) -> Union[str, None]:
+        op = _NUMEXPR_OPS.get(self.infix.ufunc, None)
+        if op is None:
+            return None
+        terms = []
+        for operand in (self.left, self.right):
+            if isinstance(operand, Expression):
+                term = operand._to_numexpr(names)
+                if term is None:
+                    return None
+            else:
+                term = names.setdefault(
+                    id(operand), ("v{}".format(len(names)), operand)
+                )[0]
+            terms.append(term)
+        return "({} {} {})".format(terms[0], op, terms[1])
+
+    def _evaluate_chunk(
+        self, start: int, stop: int, buffers: dict, out=None, record: bool = False
+    ):
+        """
+        Evaluates the rows `start:stop` of the expression. The intermediate
+        results are written to the chunk buffers in `buffers`, or recorded
+        there if `record` is True.
+        """
+        operands = []
+        for operand in (self.left, self.right):
+            if isinstance(operand, Expression):
+                operand = operand._evaluate_chunk(start, stop, buffers, record=record)
+            elif isinstance(operand, ndarray) and operand.ndim > 0:
+                operand = operand[start:stop]
+            operands.append(operand)
+        if out is None and not record:
+            out = buffers.get(id(self), None)
+            if out is not None:
+                out = out[: stop - start]
+        ufunc = self.infix.ufunc
+        if out is None:
+            res = (ufunc or self.infix.function)(*operands)
+            if record:
+                buffers[id(self)] = res
+            return res
+        elif ufunc is not None:
+            return ufunc(*operands, out=out)
+        out[...] = self.infix.function(*operands)
+        return out
+
+    def _broadcast(self, shape: tuple) -> "Expression":
+        """
+        Returns a copy of the expression, with the array operands broadcasted
+        to `shape`, so that all of them can be sliced along the first axis.
+        """
+        operands = []
+        for operand in (self.left, self.right):
+            if isinstance(operand, Expression):
+                operand = operand._broadcast(shape)
+            elif np.ndim(operand) > 0:
+                operand = np.broadcast_to(np.asarray(operand), shape)
+            operands.append(operand)
+        return Expression(self.infix, *operands)
+
+    def evaluate(
+        self, out: ndarray = None, chunksize: int = None, backend: str = None
+    ) -> ndarray:
+        """
+        Evaluates the expression and returns the result.
+
+        Parameters
+        ----------
+        out : numpy.ndarray, Optional
+            A buffer for the result. Default is None, which means the
+            buffer of the operator of the root of the expression, if it
+            has one.
+        chunksize : int, Optional
+            The number of elements to evaluate at once. Default is None,
+            which means :data:`CHUNKSIZE`. It is ignored if any of the
+            operators is not elementwise.
+        backend : str, Optional
+            'numpy' or 'numexpr'. If not specified, `numexpr` is used if
+            it is installed and the expression only contains arithmetic
+            ufuncs. Default is None.
+        """
+        if backend not in (None, "numpy", "numexpr"):
+            raise ValueError(f"Unknown backend '{backend}'.")
+        if out is None:
+            out = self.infix.out
+        if backend == "numexpr" and not __has_numexpr__:
+            raise ImportError("You need numexpr for this.")
+        if backend != "numpy" and __has_numexpr__:
+            names = {}
+            expr = self._to_numexpr(names)
+            if expr is not None:
+                local_dict = {name: value for name, value in names.values()}
+                return numexpr.evaluate(expr, local_dict=local_dict, out=out)
+            elif backend == "numexpr":
+                raise TypeError("The expression is not supported by numexpr.")
+
+        shape = np.broadcast_shapes(*[np.shape(x) for x in self._leaves()])
+        if len(shape) == 0:
+            res = self._evaluate_chunk(0, 0, {})
+            if out is None:
+                return res
+            out[...] = res
+            return out
+
+        tree = self._broadcast(shape)
+        chunksize = CHUNKSIZE if chunksize is None else chunksize
+        nrows = shape[0]
+        if tree._elementwise():
+            step = max(1, chunksize // max(1, int(np.prod(shape[1:]))))
+        else:
+            step = nrows
+        # The first chunk is evaluated with the intermediate results
+        # recorded, to learn their shapes and types. From then on, every
+        # node writes into a buffer of its own, allocated only once.
+        buffers = {}
+        stop = min(step, nrows)
+        first = tree._evaluate_chunk(0, stop, buffers, record=True)
+        if out is None:
+            out = np.empty(shape, dtype=np.result_type(first))
+        out[:stop] = first
+        buffers.pop(id(tree), None)
+        for key, res in list(buffers.items()):
+            if isinstance(res, ndarray) and res.ndim > 0:
+                buffers[key] = np.empty_like(res)
+            else:
+                del buffers[key]
+        start = stop
+        while start < nrows:
+            stop = min(start + step, nrows)
+            tree._evaluate_chunk(start, stop, buffers, out=out[start:stop])
+            start = stop
+        return out
@@ -1,12 +1,751 @@
 # -*- coding: utf-8 -*-
+"""
+Reading and writing nested dictionaries.
+
+Two formats are supported:
+
+    (a) JSON, using the standard library, or `orjson` on request.
+        Large documents can be loaded lazily, see :class:`LazyJSON`.
+    (b) a binary container, that stores NumPy arrays in their native
+        binary representation, next to a JSON header describing the
+        layout of the dictionary. Arrays can be memory-mapped on load.
+
+Writers can replace files atomically, flush them to disk and hold an
+advisory lock while writing. For frequent checkpointing, records can be
+appended to JSON-lines files, see :func:`dict2jsonl`.
+"""
 import json
+import mmap as _mmap
+import os
+import re
+import struct
+import weakref
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Tuple, Union
+
+import numpy as np
+from numpy import ndarray
+
+from .profiling import profiled
+
+try:
+    import orjson
+
+    __has_orjson__ = True
+except ImportError:
+    __has_orjson__ = False
+
+try:
+    import fcntl
+
+    __has_fcntl__ = True
+except ImportError:
+    import msvcrt
+
+    __has_fcntl__ = False
+
+
+__all__ = [
+    "json2dict",
+    "dict2json",
+    "bin2dict",
+    "dict2bin",
+    "jsonl2dicts",
+    "dict2jsonl",
+    "JSONEncoder",
+    "LazyJSON",
+]
+
+
+_BIN_MAGIC = b"\x93DWLSH\x01\x00"
+_BIN_ALIGN = 64
+_ARRAY_KEY = "__ndarray__"
+# user keys like '__ndarray__', '~__ndarray__', ... get one more '~' in files
+_ESCAPE = "~"
+
+
+def _default(obj: Any) -> Any:
+    """
+    Converts NumPy objects into something the JSON encoders understand.
+    """
+    if isinstance(obj, ndarray):
+        return obj.tolist()
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JSONEncoder(json.JSONEncoder):
+    """
+    A JSON encoder that also handles NumPy arrays and scalars.
+    """
+
+    def default(self, obj: Any) -> Any:
+        try:
+            return _default(obj)
+        except TypeError:
+            return super().default(obj)
+
+
+def _get_backend(backend: str = None) -> str:
+    # `orjson` writes NaN as null, rejects big integers and only indents
+    # with 2 spaces, so it is never selected implicitly
+    if backend is None:
+        return "json"
+    if backend not in ("json", "orjson"):
+        raise ValueError(f"Unknown JSON backend '{backend}'.")
+    if backend == "orjson" and not __has_orjson__:
+        raise ImportError("You need orjson for this.")
+    return backend
+
+
+@profiled()
+def json2dict(
+    jsonpath: str, *, backend: str = None, lazy: bool = False, deep: bool = False
+) -> Union[dict, "LazyJSON"]:
+    """
+    Reads a JSON file and returns its content as a dictionary.
+
+    The reader is not streaming: unless `lazy` is True, the whole file is
+    read and parsed at once. For large documents use `lazy=True`, which
+    maps the file into memory and only parses the parts that are accessed.
+
+    Parameters
+    ----------
+    jsonpath : str
+        Path to the file.
+    backend : str, Optional
+        'json' for the standard library or 'orjson'. If not provided,
+        the standard library is used. Default is None.
+    lazy : bool, Optional
+        If True, a :class:`LazyJSON` is returned, that only parses the
+        parts of the document that are accessed. Default is False.
+    deep : bool, Optional
+        Only used if `lazy` is True, see :class:`LazyJSON`. Default is False.
+    """
+    if lazy:
+        return LazyJSON(jsonpath, backend=backend, deep=deep)
+    backend = _get_backend(backend)
+    with open(jsonpath, "rb") as jsonfile:
+        if backend == "orjson":
+            return orjson.loads(jsonfile.read())
+        return json.load(jsonfile)
+
+
+def _lock_file(f):
+    if __has_fcntl__:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(f):
+    if __has_fcntl__:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def _locked(path: str):
+    """
+    Holds an exclusive advisory lock on '<path>.lock'. A separate lock
+    file is used, since the locked file itself might get replaced. The lock
+    file is left in place, removing it would let a writer waiting on the
+    removed file and a new one hold a lock at the same time.
+    """
+    with open(path + ".lock", "a+b") as f:
+        _lock_file(f)
+        try:
+            yield
+        finally:
+            _unlock_file(f)
+
+
+@contextmanager
+def _open_for_writing(
+    path: str,
+    mode: str,
+    *,
+    atomic: bool = False,
+    fsync: bool = False,
+    lock: bool = False,
+):
+    """
+    Opens a file for writing.
+
+    If `atomic` is True, the content is written to a temporary file in the
+    same folder, which then replaces the target with `os.replace`. Readers
+    thus either see the old or the new content, never a truncated file.
+    If `fsync` is True, the file is flushed to disk before it is closed.
+    If `lock` is True, an advisory lock is held during writing.
+    """
+    if lock:
+        with _locked(path):
+            with _open_for_writing(path, mode, atomic=atomic, fsync=fsync) as f:
+                yield f
+        return
+    target = path
+    if atomic:
+        path = "{}.{}.{}.tmp".format(path, os.getpid(), os.urandom(4).hex())
+    try:
+        with open(path, mode) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if atomic:
+            os.replace(path, target)
+    except BaseException:
+        if atomic and os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+@profiled()
+def dict2json(
+    jsonpath: str,
+    d: dict,
+    *,
+    backend: str = None,
+    indent: int = None,
+    atomic: bool = False,
+    fsync: bool = False,
+    lock: bool = False,
+):
+    """
+    Writes a dictionary to a JSON file. NumPy arrays and scalars are
+    written as lists and numbers.
+
+    Parameters
+    ----------
+    jsonpath : str
+        Path to the file.
+    d : dict
+        The dictionary to write.
+    backend : str, Optional
+        'json' for the standard library or 'orjson'. If not provided,
+        the standard library is used. The `orjson` backend is faster, but
+        writes NaN and infinity as null and does not support integers
+        beyond 64 bits. Default is None.
+    indent : int, Optional
+        Indentation. The `orjson` backend only supports an indentation
+        of 2 spaces. Default is None.
+    atomic : bool, Optional
+        If True, the data is written to a temporary file first, which then
+        replaces the target. A crash during writing leaves the original file
+        untouched. Default is False.
+    fsync : bool, Optional
+        If True, the file is flushed to disk before returning. Default is False.
+    lock : bool, Optional
+        If True, an exclusive advisory lock is held on '<jsonpath>.lock'
+        while writing, to serialize concurrent writers. The empty lock file
+        is created next to the target and is not removed afterwards, so
+        that every writer locks the same file. Default is False.
+    """
+    backend = _get_backend(backend)
+    kw = dict(atomic=atomic, fsync=fsync, lock=lock)
+    if backend == "orjson":
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            if indent != 2:
+                raise ValueError("The 'orjson' backend only supports indent=2.")
+            option |= orjson.OPT_INDENT_2
+        data = orjson.dumps(d, default=_default, option=option)
+        with _open_for_writing(jsonpath, "wb", **kw) as outfile:
+            outfile.write(data)
+    else:
+        # `json.dump` writes the chunks of `iterencode`, the whole
+        # document is never held in memory as a single string
+        with _open_for_writing(jsonpath, "w", **kw) as outfile:
+            json.dump(d, outfile, cls=JSONEncoder, indent=indent)
+
+
+@profiled()
+def dict2jsonl(
+    path: str,
+    *records: dict,
+    backend: str = None,
+    fsync: bool = False,
+    lock: bool = True,
+):
+    """
+    Appends records to a JSON-lines file, one JSON document per line.
+
+    The records are written with a single call to `os.write` on a file
+    opened in append mode, while holding an advisory lock on the file,
+    so that records of concurrent writers never interleave.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file. It is created if it does not exist.
+    *records : dict
+        The records to append.
+    backend : str, Optional
+        The JSON backend, see :func:`dict2json`. Default is None.
+    fsync : bool, Optional
+        If True, the file is flushed to disk before returning. Default is False.
+    lock : bool, Optional
+        If True, an exclusive advisory lock is held on the file itself while
+        writing. Unlike :func:`dict2json`, no separate lock file is created.
+        Default is True.
+
+    See also
+    --------
+    :func:`jsonl2dicts`
+    """
+    if _get_backend(backend) == "orjson":
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        option |= orjson.OPT_APPEND_NEWLINE
+        data = b"".join(
+            orjson.dumps(r, default=_default, option=option) for r in records
+        )
+    else:
+        encoder = JSONEncoder(separators=(",", ":"))
+        data = "".join(encoder.encode(r) + "\n" for r in records).encode("utf-8")
+    with open(path, "ab") as f:
+        if lock:
+            _lock_file(f)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(f.fileno(), view) :]
+            if fsync:
+                os.fsync(f.fileno())
+        finally:
+            if lock:
+                _unlock_file(f)
+
+
+def jsonl2dicts(path: str, *, backend: str = None) -> Iterable[dict]:
+    """
+    Returns a generator over the records of a JSON-lines file. A truncated
+    last line, left behind by an interrupted writer, is skipped.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    backend : str, Optional
+        The JSON backend, see :func:`json2dict`. Default is None.
+
+    See also
+    --------
+    :func:`dict2jsonl`
+    """
+    loads = orjson.loads if _get_backend(backend) == "orjson" else json.loads
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield loads(line)
+            except ValueError:
+                if line.endswith(b"\n"):
+                    raise
+                # incomplete record at the end of the file
+
+
+_WS = re.compile(rb"[ \t\n\r]*")
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+# everything up to the next bracket, strings included
+_SKIP = re.compile(rb'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+_SCALAR_END = re.compile(rb"[,\]}\s]")
+_OPENING = tuple(b"{[")
+_CLOSING = tuple(b"}]")
+_QUOTE, _COLON, _COMMA = b'":,'
+
+
+def _skip_ws(buf, pos: int) -> int:
+    return _WS.match(buf, pos).end()
+
+
+def _value_end(buf, pos: int, end: int) -> int:
+    """
+    Returns the position after the JSON value starting at `pos`.
+    """
+    c = buf[pos]
+    if c == _QUOTE:
+        m = _STRING.match(buf, pos, end)
+        if m is None:
+            raise ValueError(f"Unterminated string at position {pos}.")
+        return m.end()
+    elif c in _OPENING:
+        depth = 0
+        while pos < end:
+            c = buf[pos]
+            if c in _OPENING:
+                depth += 1
+            elif c in _CLOSING:
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+            else:
+                break
+            pos = _SKIP.match(buf, pos + 1, end).end()
+        raise ValueError(f"Invalid JSON value near position {pos}.")
+    m = _SCALAR_END.search(buf, pos, end)
+    return end if m is None else m.start()
+
+
+def _index_span(buf, pos: int, end: int) -> Union[dict, list]:
+    """
+    Returns the spans of the items of the object or array starting at
+    `pos` as a dictionary or a list, without parsing the items.
+    """
+    pos = _skip_ws(buf, pos)
+    isobject = buf[pos] == _OPENING[0]
+    closing = _CLOSING[0] if isobject else _CLOSING[1]
+    index = {} if isobject else []
+    pos = _skip_ws(buf, pos + 1)
+    if buf[pos] == closing:
+        return index
+    while True:
+        if isobject:
+            m = _STRING.match(buf, pos, end)
+            if m is None:
+                raise ValueError(f"Expected a key at position {pos}.")
+            key = json.loads(buf[pos : m.end()])
+            pos = _skip_ws(buf, m.end())
+            if buf[pos] != _COLON:
+                raise ValueError(f"Expected ':' at position {pos}.")
+            pos = _skip_ws(buf, pos + 1)
+        vend = _value_end(buf, pos, end)
+        if isobject:
+            index[key] = (pos, vend)
+        else:
+            index.append((pos, vend))
+        pos = _skip_ws(buf, vend)
+        if buf[pos] == _COMMA:
+            pos = _skip_ws(buf, pos + 1)
+        elif buf[pos] == closing:
+            return index
+        else:
+            raise ValueError(f"Expected ',' at position {pos}.")
+
+
+def _unescape_pointer(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _release_buffer(buf, file, refs: list):
+    # closes the memory map and the file, when the last user is released
+    refs[0] -= 1
+    if refs[0] == 0:
+        if isinstance(buf, _mmap.mmap):
+            buf.close()
+        file.close()
+
+
+class LazyJSON(Mapping):
+    """
+    A read-only mapping over a JSON object stored in a file, that parses
+    its items on first access.
+
+    The file is memory-mapped and the positions of the items of the
+    top-level object are indexed in one scan, without parsing them.
+    Accessing an item only parses that item, and the result is cached.
+    The memory needed to access a subtree is thus proportional to the
+    size of that subtree.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    backend : str, Optional
+        The JSON backend to use to parse items, see :func:`json2dict`.
+        Default is None.
+    deep : bool, Optional
+        If True, items that are JSON objects are returned as lazy mappings
+        themselves, instead of being parsed as a whole. Default is False.
+
+    Examples
+    --------
+    >>> from dewloosh.core.io import dict2json, LazyJSON
+    >>> dict2json('data.json', {'a': {'b': [1, 2]}, 'c': 3})
+    >>> data = LazyJSON('data.json')
+    >>> data['c']
+    3
+
+    Subtrees can be accessed with JSON pointers, without loading the
+    siblings on the way:
+
+    >>> data.get('/a/b/1')
+    2
+    """
+
+    def __init__(self, path: str = None, *, backend: str = None, deep: bool = False):
+        self._backend = _get_backend(backend)
+        self._deep = deep
+        self._cache = {}
+        self._release = None
+        if path is not None:
+            file = open(path, "rb")
+            try:
+                self._buf = _mmap.mmap(file.fileno(), 0, access=_mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                self._buf = b""
+            # the number of mappings using the buffer, children included
+            self._refs = [1]
+            self._file = file
+            self._release = weakref.finalize(
+                self, _release_buffer, self._buf, file, self._refs
+            )
+            start = _skip_ws(self._buf, 0)
+            if start == len(self._buf) or self._buf[start] != _OPENING[0]:
+                self.close()
+                raise ValueError(f"'{path}' does not contain a JSON object.")
+            self._index = _index_span(self._buf, start, len(self._buf))
+
+    @classmethod
+    def _child(cls, parent: "LazyJSON", span: Tuple[int, int]) -> "LazyJSON":
+        obj = cls.__new__(cls)
+        obj._backend = parent._backend
+        obj._deep = parent._deep
+        obj._cache = {}
+        obj._buf = parent._buf
+        obj._index = _index_span(parent._buf, *span)
+        # children keep the buffer open, until they are closed themselves
+        obj._refs = parent._refs
+        obj._file = parent._file
+        obj._refs[0] += 1
+        obj._release = weakref.finalize(
+            obj, _release_buffer, obj._buf, obj._file, obj._refs
+        )
+        return obj
+
+    def _parse(self, span: Tuple[int, int]) -> Any:
+        data = self._buf[span[0] : span[1]]
+        if self._backend == "orjson":
+            return orjson.loads(data)
+        return json.loads(data)
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._cache[key]
+        except KeyError:
+            span = self._index[key]
+        if self._deep and self._buf[span[0]] == _OPENING[0]:
+            value = self._child(self, span)
+        else:
+            value = self._parse(span)
+        self._cache[key] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Returns the item for a key, or a nested item if `key` is a JSON
+        pointer, ie. a string starting with '/', like '/a/b/0'. Only the
+        returned value gets parsed. Returns `default` if the item does
+        not exist.
+        """
+        if not (isinstance(key, str) and key.startswith("/")):
+            return super().get(key, default)
+        tokens = [_unescape_pointer(t) for t in key[1:].split("/")]
+        return self._get_path(tokens, default)
+
+    def _get_path(self, tokens: list, default: Any) -> Any:
+        head = tokens[0]
+        if head in self._cache:
+            value = self._cache[head]
+            for i, token in enumerate(tokens[1:]):
+                if isinstance(value, LazyJSON):
+                    return value._get_path(tokens[i + 1 :], default)
+                try:
+                    value = value[int(token) if isinstance(value, list) else token]
+                except (KeyError, IndexError, ValueError, TypeError):
+                    return default
+            return value
+        index, span = self._index, None
+        for i, token in enumerate(tokens):
+            if index is None:
+                # the path runs through a scalar
+                return default
+            try:
+                span = index[int(token) if isinstance(index, list) else token]
+            except (KeyError, IndexError, ValueError):
+                return default
+            if i < len(tokens) - 1:
+                index = None
+                if self._buf[span[0]] in _OPENING:
+                    index = _index_span(self._buf, *span)
+        return self._parse(span)
+
+    def todict(self) -> dict:
+        """
+        Returns the whole document as a dictionary.
+        """
+        return {k: self._parse(self._index[k]) for k in self._index}
+
+    def close(self):
+        """
+        Closes the underlying file. Values that have already been accessed
+        remain available. With `deep=True`, these include the nested lazy
+        mappings, that keep the file open until they are closed or garbage
+        collected themselves.
+        """
+        if self._release is not None:
+            self._release()
+
+    def __enter__(self) -> "LazyJSON":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _is_reserved(key: Any) -> bool:
+    return (
+        isinstance(key, str)
+        and key.endswith(_ARRAY_KEY)
+        and not key[: -len(_ARRAY_KEY)].strip(_ESCAPE)
+    )
+
+
+def _encode_tree(obj: Any, arrays: list) -> Any:
+    """
+    Replaces the arrays in a nested structure with references to `arrays`.
+    Keys of dictionaries colliding with the references are escaped.
+    """
+    if isinstance(obj, dict):
+        return {
+            (_ESCAPE + k if _is_reserved(k) else k): _encode_tree(v, arrays)
+            for k, v in obj.items()
+        }
+    elif isinstance(obj, ndarray):
+        if obj.dtype.hasobject or obj.dtype.fields is not None:
+            raise TypeError(f"Arrays of type {obj.dtype} are not supported.")
+        arrays.append(obj)
+        return {_ARRAY_KEY: len(arrays) - 1}
+    elif isinstance(obj, (list, tuple)):
+        return [_encode_tree(v, arrays) for v in obj]
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def _decode_tree(obj: Any, arrays: list) -> Any:
+    if isinstance(obj, dict):
+        if len(obj) == 1 and _ARRAY_KEY in obj:
+            return arrays[obj[_ARRAY_KEY]]
+        return {
+            (k[1:] if _is_reserved(k) else k): _decode_tree(v, arrays)
+            for k, v in obj.items()
+        }
+    elif isinstance(obj, list):
+        return [_decode_tree(v, arrays) for v in obj]
+    return obj
+
+
+def _aligned(n: int) -> int:
+    return -(-n // _BIN_ALIGN) * _BIN_ALIGN
+
+
+@profiled()
+def dict2bin(
+    path: str, d: dict, *, atomic: bool = False, fsync: bool = False, lock: bool = False
+):
+    """
+    Writes a dictionary to a binary file. The arrays in the dictionary
+    are stored without conversion to text, everything else must be
+    JSON serializable.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    d : dict
+        The dictionary to write.
+    atomic, fsync, lock : bool, Optional
+        See :func:`dict2json`. Default is False. With `lock`, the file
+        '<path>.lock' is created next to the target and is left in place.
+
+    See also
+    --------
+    :func:`bin2dict`
+    """
+    arrays = []
+    tree = _encode_tree(d, arrays)
+    layout, offset, blocks = [], 0, []
+    for arr in arrays:
+        # Fortran ordered arrays are written as their C ordered transpose,
+        # everything else that is not C contiguous gets copied
+        if arr.flags.f_contiguous and not arr.flags.c_contiguous:
+            order, block = "F", arr.T
+        else:
+            order, block = "C", np.ascontiguousarray(arr)
+        layout.append(
+            {
+                "dtype": arr.dtype.str,
+                "shape": list(arr.shape),
+                "order": order,
+                "offset": offset,
+            }
+        )
+        blocks.append(block)
+        offset = _aligned(offset + block.nbytes)
+    header = json.dumps({"tree": tree, "arrays": layout}).encode("utf-8")
+    start = _aligned(len(_BIN_MAGIC) + 8 + len(header))
+    kw = dict(atomic=atomic, fsync=fsync, lock=lock)
+    with _open_for_writing(path, "wb", **kw) as f:
+        f.write(_BIN_MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for spec, block in zip(layout, blocks):
+            f.seek(start + spec["offset"])
+            block.tofile(f)
+        f.truncate(start + offset)
 
 
-def json2dict(jsonpath: str):
-    with open(jsonpath, "r") as jsonfile:
-        return json.loads(jsonfile.read())
+@profiled()
+def bin2dict(path: str, *, mmap: bool = False) -> dict:
+    """
+    Reads a dictionary from a binary file written by :func:`dict2bin`.
 
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    mmap : bool, Optional
+        If True, the arrays are memory-mapped in read-only mode instead of
+        being read into memory. Default is False.
 
-def dict2json(jsonpath: str, d: dict):
-    with open(jsonpath, "w") as outfile:
-        json.dump(d, outfile)
+    See also
+    --------
+    :func:`dict2bin`
+    """
+    with open(path, "rb") as f:
+        if f.read(len(_BIN_MAGIC)) != _BIN_MAGIC:
+            raise ValueError(f"'{path}' is not a valid binary dictionary file.")
+        (nheader,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(nheader).decode("utf-8"))
+        start = _aligned(len(_BIN_MAGIC) + 8 + nheader)
+        arrays = []
+        for spec in header["arrays"]:
+            dtype = np.dtype(spec["dtype"])
+            shape = tuple(spec["shape"])
+            if spec["order"] == "F":
+                shape = shape[::-1]
+            count = int(np.prod(shape))
+            if mmap and count > 0:
+                arr = np.memmap(
+                    path, dtype, mode="r", offset=start + spec["offset"], shape=shape
+                )
+            else:
+                f.seek(start + spec["offset"])
+                arr = np.fromfile(f, dtype, count).reshape(shape)
+            arrays.append(arr.T if spec["order"] == "F" else arr)
+    return _decode_tree(header["tree"], arrays)
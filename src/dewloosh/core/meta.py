@@ -1,10 +1,22 @@
 # -*- coding: utf-8 -*-
 from abc import ABCMeta
 
+from .warning import budget
+from .profiling import profiled
+
 
 __all__ = ["ABCMeta_Weak", "ABCMeta_Strong", "ABCMeta_Safe"]
 
 
+# the time a class may take to be validated by a metaclass, in seconds
+VALIDATION_BUDGET = 0.01
+
+_VALIDATION_MESSAGE = (
+    "Validating the class {name} took {{seconds:.3g}} s. Consider flattening "
+    "the hierarchy or using a less strict metaclass."
+)
+
+
 def _is_callable(n, v):
     return callable(v) and ("__" not in n)
 
@@ -168,23 +180,26 @@ class ABCMeta_Strong(ABCMeta_Weak):
     def __init__(self, name, bases, namespace, *args, **kwargs):
         super().__init__(name, bases, namespace, *args, **kwargs)
 
+    @profiled()
     def __new__(metaclass, name, bases, namespace, *args, **kwargs):
         cls = super().__new__(metaclass, name, bases, namespace, *args, **kwargs)
-        cls_methods = metaclass._get_cls_methods(namespace)
-        for base in bases:
-            base_abstracts = set()
-            for method_name in getattr(base, "__abstractmethods__", set()):
-                value = getattr(cls, method_name, None)
-                if getattr(value, "__isabstractmethod__", False):
-                    base_abstracts.add(method_name)
-            for abstract in base_abstracts:
-                if abstract not in cls_methods:
-                    err_str = (
-                        f"Can't create abstract class {name}!"
-                        f" {name} must implement abstract method {abstract} of"
-                        f" class {base.__name__}."
-                    )
-                    raise TypeError(err_str)
+        message = _VALIDATION_MESSAGE.format(name=name)
+        with budget("meta.validation", seconds=VALIDATION_BUDGET, message=message):
+            cls_methods = metaclass._get_cls_methods(namespace)
+            for base in bases:
+                base_abstracts = set()
+                for method_name in getattr(base, "__abstractmethods__", set()):
+                    value = getattr(cls, method_name, None)
+                    if getattr(value, "__isabstractmethod__", False):
+                        base_abstracts.add(method_name)
+                for abstract in base_abstracts:
+                    if abstract not in cls_methods:
+                        err_str = (
+                            f"Can't create abstract class {name}!"
+                            f" {name} must implement abstract method {abstract} of"
+                            f" class {base.__name__}."
+                        )
+                        raise TypeError(err_str)
         return cls
 
 
@@ -221,16 +236,19 @@ class ABCMeta_Safe(ABCMeta_Weak):
     def __init__(self, name, bases, namespace, *args, **kwargs):
         super().__init__(name, bases, namespace, *args, **kwargs)
 
+    @profiled()
     def __new__(metaclass, name, bases, namespace, *args, **kwargs):
         cls = super().__new__(metaclass, name, bases, namespace, *args, **kwargs)
-        cls_methods = metaclass._get_cls_methods(namespace, nomagic=True)
-        for base in bases:
-            for method in cls_methods:
-                if hasattr(base, method):
-                    err_str = (
-                        f"Can't create abstract class {name}!"
-                        f" Method {method} is already implemented in class"
-                        f" {base.__name__}."
-                    )
-                    raise TypeError(err_str)
+        message = _VALIDATION_MESSAGE.format(name=name)
+        with budget("meta.validation", seconds=VALIDATION_BUDGET, message=message):
+            cls_methods = metaclass._get_cls_methods(namespace, nomagic=True)
+            for base in bases:
+                for method in cls_methods:
+                    if hasattr(base, method):
+                        err_str = (
+                            f"Can't create abstract class {name}!"
+                            f" Method {method} is already implemented in class"
+                            f" {base.__name__}."
+                        )
+                        raise TypeError(err_str)
         return cls
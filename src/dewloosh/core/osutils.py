@@ -1,14 +1,30 @@
 import os
+import sys
 import inspect
+from functools import lru_cache
+from typing import Iterable, List
+
+
+# module name -> the absolute path of the file of the module
+_module_paths = {}
+# file name of a code object -> the absolute path of the file
+_code_paths = {}
 
 
 def find_source_folder(current_file: str = None, maxlevel: int = 10) -> str:
     """
     Returns the source folder.
+
+    The results are cached for every file, the folders are only walked
+    up once.
     """
     if current_file is None:
         current_file = __file__
+    return _find_source_folder(current_file, maxlevel)
 
+
+@lru_cache(maxsize=1024)
+def _find_source_folder(current_file: str, maxlevel: int) -> str:
     parent_is_src = False
     for _ in range(maxlevel):
         parent_is_src = os.path.dirname(current_file).endswith("src")
@@ -23,15 +39,78 @@ def find_source_folder(current_file: str = None, maxlevel: int = 10) -> str:
         raise RuntimeError
 
 
-def get_definition_file_path(obj):
+def _module_path(module: str) -> str:
+    try:
+        return _module_paths[module]
+    except KeyError:
+        pass
+    file_path = getattr(sys.modules.get(module, None), "__file__", None)
+    if file_path is None:
+        return None
+    res = _module_paths[module] = os.path.abspath(file_path)
+    return res
+
+
+def _code_path(file_path: str) -> str:
+    try:
+        return _code_paths[file_path]
+    except KeyError:
+        pass
+    res = _code_paths[file_path] = os.path.abspath(file_path)
+    return res
+
+
+def get_definition_file_path(obj) -> str:
     """
     Returns the path of the file a class or a function is implemented in.
+
+    The path of a function is the file of its code, the path of a class is
+    looked up from its module, which is cached, and only classes without a
+    module file are inspected.
     """
-    if inspect.isfunction(obj) or inspect.ismethod(obj):
-        file_path = inspect.getfile(obj)
-    elif inspect.isclass(obj):
-        file_path = inspect.getfile(obj.__class__)
-    else:
+    if inspect.ismethod(obj):
+        obj = obj.__func__
+    if inspect.isfunction(obj):
+        # the module of a function may be the package re-exporting it
+        return _code_path(obj.__code__.co_filename)
+    elif not inspect.isclass(obj):
         raise ValueError("Input must be a function or class.")
+    file_path = _module_path(obj.__module__)
+    if file_path is None:
+        file_path = os.path.abspath(inspect.getfile(obj))
+    return file_path
 
-    return os.path.abspath(file_path)
+
+def resolve_many(objs: Iterable) -> List[str]:
+    """
+    Returns the paths of the files a list of classes and functions are
+    implemented in.
+
+    See also
+    --------
+    :func:`get_definition_file_path`
+    """
+    paths = _module_paths
+    res = []
+    for obj in objs:
+        code = getattr(getattr(obj, "__func__", obj), "__code__", None)
+        if code is not None:
+            path = _code_paths.get(code.co_filename, None)
+        elif inspect.isclass(obj):
+            path = paths.get(obj.__module__, None)
+        else:
+            path = None
+        if path is None:
+            path = get_definition_file_path(obj)
+        res.append(path)
+    return res
+
+
+def clear_cache():
+    """
+    Clears the cached paths, eg. after modules have been reloaded from
+    other locations.
+    """
+    _module_paths.clear()
+    _code_paths.clear()
+    _find_source_folder.cache_clear()
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Low-overhead profiling hooks.
+
+The hot paths of the library are decorated with :func:`profiled`. Unless
+the environment variable `DEWLOOSH_PROFILE` is set when the library is
+imported, the decorator returns the functions unchanged, and the hooks
+cost nothing. Otherwise, the calls are timed with `perf_counter_ns` and
+collected by :data:`PROFILER`, from where they can be dumped as JSON or
+as collapsed stacks for flame graphs.
+
+Examples
+--------
+>>> from dewloosh.core.profiling import section, PROFILER
+>>> with section("my.section"):
+...     pass
+"""
+import os
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+__all__ = [
+    "profiled",
+    "section",
+    "enable",
+    "disable",
+    "is_enabled",
+    "Profiler",
+    "PROFILER",
+]
+
+
+# If False, the decorator :func:`profiled` returns the functions unchanged.
+# It is read at decoration time, which is import time for the library.
+ENABLED = os.environ.get("DEWLOOSH_PROFILE", "").lower() not in ("", "0", "false")
+
+_NBUCKETS = 64
+
+
+class Profiler:
+    """
+    A thread-safe aggregator of timings. For every name, it collects the
+    number of calls, the total, minimum and maximum time and a histogram
+    of the times with buckets of powers of two nanoseconds. For every
+    stack of nested names, it collects the time spent in the innermost
+    one, excluding its children.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {}
+        self._stacks = {}
+
+    def _stack(self) -> list:
+        try:
+            return self._local.stack
+        except AttributeError:
+            stack = self._local.stack = []
+            return stack
+
+    def enter(self, name: str) -> list:
+        """
+        Marks the start of a timed call and returns a token for :func:`exit`.
+        """
+        stack = self._stack()
+        # name, the time spent in children and the start time
+        frame = [name, 0, time.perf_counter_ns()]
+        stack.append(frame)
+        return frame
+
+    def exit(self, frame: list):
+        """
+        Marks the end of a timed call started with :func:`enter`.
+        """
+        elapsed = time.perf_counter_ns() - frame[2]
+        stack = self._stack()
+        path = tuple(f[0] for f in stack)
+        stack.pop()
+        if stack:
+            stack[-1][1] += elapsed
+        self.record(frame[0], elapsed, path, elapsed - frame[1])
+
+    def record(self, name: str, elapsed: int, path: tuple = None, own: int = None):
+        """
+        Records a call of `name`, that took `elapsed` nanoseconds.
+        """
+        bucket = min(elapsed.bit_length(), _NBUCKETS - 1)
+        with self._lock:
+            stats = self._stats.get(name, None)
+            if stats is None:
+                stats = self._stats[name] = [0, 0, elapsed, elapsed, [0] * _NBUCKETS]
+            stats[0] += 1
+            stats[1] += elapsed
+            if elapsed < stats[2]:
+                stats[2] = elapsed
+            if elapsed > stats[3]:
+                stats[3] = elapsed
+            stats[4][bucket] += 1
+            path = (name,) if path is None else path
+            own = elapsed if own is None else own
+            self._stacks[path] = self._stacks.get(path, 0) + own
+
+    def reset(self):
+        """
+        Clears the collected data.
+        """
+        with self._lock:
+            self._stats.clear()
+            self._stacks.clear()
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Returns the collected data as a dictionary. The histograms map
+        the upper bounds of the buckets in nanoseconds to counts.
+        """
+        with self._lock:
+            return {
+                name: {
+                    "count": s[0],
+                    "total_ns": s[1],
+                    "min_ns": s[2],
+                    "max_ns": s[3],
+                    "mean_ns": s[1] / s[0],
+                    "histogram": {2**i: n for i, n in enumerate(s[4]) if n},
+                }
+                for name, s in self._stats.items()
+            }
+
+    def dump_json(self, path: str = None) -> str:
+        """
+        Returns the collected data as JSON, and writes it to a file
+        if `path` is provided.
+        """
+        res = json.dumps(self.stats(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(res)
+        return res
+
+    def dump_collapsed(self, path: str = None) -> str:
+        """
+        Returns the collected stacks in the collapsed format of flame graph
+        tools, with the times in nanoseconds, and writes them to a file if
+        `path` is provided.
+        """
+        with self._lock:
+            lines = [
+                "{} {}".format(";".join(stack), ns)
+                for stack, ns in sorted(self._stacks.items())
+            ]
+        res = "\n".join(lines) + "\n" if lines else ""
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(res)
+        return res
+
+
+# the profiler of the library
+PROFILER = Profiler()
+
+_active = [ENABLED]
+
+
+def enable():
+    """
+    Turns recording on. Only functions decorated while :data:`ENABLED`
+    was True, and sections, are recorded.
+    """
+    _active[0] = True
+
+
+def disable():
+    """
+    Turns recording off.
+    """
+    _active[0] = False
+
+
+def is_enabled() -> bool:
+    """
+    Returns True if recording is on.
+    """
+    return _active[0]
+
+
+def profiled(name: str = None) -> Callable:
+    """
+    Returns a decorator, that times the calls of a function if profiling
+    is enabled, and returns the function unchanged otherwise.
+
+    Parameters
+    ----------
+    name : str, Optional
+        The name of the function in the profile. Default is the module and
+        the qualified name of the function.
+    """
+
+    def decorator(fnc: Callable) -> Callable:
+        if not ENABLED:
+            return fnc
+        key = name or "{}.{}".format(fnc.__module__, fnc.__qualname__)
+        profiler = PROFILER
+        active = _active
+
+        @functools.wraps(fnc)
+        def inner(*args, **kwargs):
+            if not active[0]:
+                return fnc(*args, **kwargs)
+            frame = profiler.enter(key)
+            try:
+                return fnc(*args, **kwargs)
+            finally:
+                profiler.exit(frame)
+
+        return inner
+
+    return decorator
+
+
+@contextmanager
+def section(name: str):
+    """
+    A context manager, that times a block of code if recording is on.
+    Unlike decorated functions, sections only need recording to be turned
+    on with :func:`enable`, :data:`ENABLED` is not required.
+    """
+    if not _active[0]:
+        yield
+        return
+    frame = PROFILER.enter(name)
+    try:
+        yield
+    finally:
+        PROFILER.exit(frame)
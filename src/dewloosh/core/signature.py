@@ -3,6 +3,8 @@ from inspect import signature, Parameter
 from typing import Any
 from typing import Generic as _GenericAlias
 
+from .profiling import profiled
+
 
 __all__ = ["Signature"]
 
@@ -21,6 +23,7 @@ class Signature(dict):
         setattr(self, "isabstract", "abstract" in args)
 
     @classmethod
+    @profiled()
     def from_function(cls, funcobj, *attrs, **kwargs):
         if getattr(funcobj, cls.__abckey__, False):
             sig = Signature("abstract", **kwargs)
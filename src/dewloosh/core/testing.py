@@ -1,8 +1,57 @@
 import unittest
-from typing import Callable
+import os
+import gc
+import math
+import time
+import tracemalloc
+from typing import Callable, Iterable
+
+import numpy as np
+from numpy import ndarray
+
+from .warning import _start_peak, _peak_since
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _arrays(obj) -> list:
+    """
+    Returns the arrays in a result, that may be a container of arrays.
+    """
+    if isinstance(obj, ndarray):
+        return [obj]
+    elif isinstance(obj, (tuple, list)):
+        return [a for x in obj for a in _arrays(x)]
+    elif isinstance(obj, dict):
+        return [a for x in obj.values() for a in _arrays(x)]
+    return []
 
 
 class TestCase(unittest.TestCase):
+    """
+    A test case with assertions on performance.
+
+    Timings are the medians of several repeats, which makes them robust
+    against the occasional slow run. Time budgets are multiplied by
+    :attr:`perf_tolerance`, which is read from the environment variable
+    `DEWLOOSH_PERF_TOLERANCE`, so the budgets can be relaxed on slow CI
+    machines without changing the tests.
+    """
+
+    # the multiplier of the time budgets
+    perf_tolerance: float = _env_float("DEWLOOSH_PERF_TOLERANCE", 1.0)
+    # the number of timed runs
+    perf_repeats: int = 7
+    # the minimum duration of a timed run, in seconds
+    perf_min_time: float = 1e-3
+    # the allowed excess of the exponent in scaling tests
+    perf_slope_tolerance: float = 0.3
+
     def assertFailsProperly(self, exc: Exception, fnc: Callable, *args, **kwargs):
         failed_properly = False
         try:
@@ -11,3 +60,142 @@ class TestCase(unittest.TestCase):
             failed_properly = True
         finally:
             self.assertTrue(failed_properly)
+
+    def _time(self, fnc: Callable, args, kwargs, repeats: int = None) -> float:
+        """
+        Returns the median time of a call in seconds. The calls are repeated
+        in every run, until the run lasts at least :attr:`perf_min_time`.
+        """
+        repeats = self.perf_repeats if repeats is None else repeats
+        # the first call is a warm-up and tells how many calls make a run
+        t0 = time.perf_counter()
+        fnc(*args, **kwargs)
+        elapsed = time.perf_counter() - t0
+        number = 1
+        if elapsed < self.perf_min_time:
+            number = min(math.ceil(self.perf_min_time / max(elapsed, 1e-9)), 10**6)
+        gcold = gc.isenabled()
+        gc.disable()
+        try:
+            times = []
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                for _ in range(number):
+                    fnc(*args, **kwargs)
+                times.append((time.perf_counter() - t0) / number)
+        finally:
+            if gcold:
+                gc.enable()
+        return float(np.median(times))
+
+    def assertFasterThan(
+        self, fnc: Callable, budget_s: float, *args, repeats: int = None, **kwargs
+    ) -> float:
+        """
+        Asserts that a call of `fnc` with the given arguments takes at most
+        `budget_s` seconds, multiplied by :attr:`perf_tolerance`, and returns
+        the median time.
+        """
+        median = self._time(fnc, args, kwargs, repeats)
+        limit = budget_s * self.perf_tolerance
+        if median > limit:
+            self.fail(
+                "{} took {:.3g} s, the budget is {:.3g} s.".format(
+                    getattr(fnc, "__name__", fnc), median, limit
+                )
+            )
+        return median
+
+    def assertAllocatesLessThan(
+        self, fnc: Callable, nbytes: int, *args, **kwargs
+    ) -> int:
+        """
+        Asserts that the peak of the memory allocated by a call of `fnc`
+        with the given arguments is less than `nbytes`, and returns the
+        peak. The memory is measured with :mod:`tracemalloc`.
+        """
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            gc.collect()
+            start = _start_peak()
+            fnc(*args, **kwargs)
+            peak = _peak_since(start)
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+        if peak >= nbytes:
+            self.fail(
+                "{} allocated {} bytes, the budget is {} bytes.".format(
+                    getattr(fnc, "__name__", fnc), peak, nbytes
+                )
+            )
+        return peak
+
+    def assertNoCopies(self, fnc: Callable, array: ndarray, *args, **kwargs):
+        """
+        Asserts that the arrays returned by `fnc(array, *args, **kwargs)`
+        share memory with `array`. The result may be an array, or a tuple,
+        list or dictionary of arrays. Returns the result.
+        """
+        res = fnc(array, *args, **kwargs)
+        arrays = _arrays(res)
+        if not arrays:
+            self.fail("{} returned no arrays.".format(getattr(fnc, "__name__", fnc)))
+        for i, arr in enumerate(arrays):
+            if not np.shares_memory(arr, array):
+                self.fail(
+                    "Output {} of {} is a copy of the input.".format(
+                        i, getattr(fnc, "__name__", fnc)
+                    )
+                )
+        return res
+
+    def assertScalesLinearly(
+        self,
+        fnc: Callable,
+        sizes: Iterable[int],
+        setup: Callable = None,
+        repeats: int = None,
+        tolerance: float = None,
+    ) -> float:
+        """
+        Asserts that the time of `fnc` grows at most linearly with the size
+        of its input, and returns the measured exponent.
+
+        The exponent is the slope of a line fitted to the medians of the
+        times against the sizes on a log-log scale. It may exceed 1 by
+        `tolerance`, which defaults to :attr:`perf_slope_tolerance`.
+
+        Parameters
+        ----------
+        fnc : Callable
+            The function to measure.
+        sizes : Iterable[int]
+            The sizes of the inputs, at least two of them.
+        setup : Callable, Optional
+            A function that returns the input of `fnc` for a size. If not
+            provided, `fnc` is called with the size. Default is None.
+        repeats : int, Optional
+            The number of timed runs for every size. Default is None,
+            which means :attr:`perf_repeats`.
+        tolerance : float, Optional
+            The allowed excess of the exponent. Default is None.
+        """
+        sizes = list(sizes)
+        if len(sizes) < 2:
+            raise ValueError("At least two sizes are required.")
+        tolerance = self.perf_slope_tolerance if tolerance is None else tolerance
+        times = []
+        for n in sizes:
+            arg = n if setup is None else setup(n)
+            times.append(self._time(fnc, (arg,), {}, repeats))
+        slope = float(np.polyfit(np.log(sizes), np.log(times), 1)[0])
+        if slope > 1 + tolerance:
+            self.fail(
+                "The time of {} grows with the power {:.2f} of the size.".format(
+                    getattr(fnc, "__name__", fnc), slope
+                )
+            )
+        return slope
@@ -1,19 +1,42 @@
 # -*- coding: utf-8 -*-
 try:
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Sequence
 except ImportError:
-    from collections import Iterable
+    from collections import Iterable, Sequence
+from itertools import count
+from typing import Tuple, Union
+
+import numpy as np
+from numpy import ndarray
+
+
+LATIN = "abcdefghijklmnopqrstuvwxyz"
+# the code points from alpha to omega, with the final sigma
+GREEK = "".join(chr(c) for c in range(ord("\u03b1"), ord("\u03c9") + 1))
 
 
 def alphabet(abctype: str = "latin", **kwargs) -> Iterable:
-    if abctype in ("ord", "o"):
+    """
+    An infinite generator of labels. Latin and greek labels continue with
+    multiple letters after the last letter, like the columns of a
+    spreadsheet: 'x', 'y', 'z', 'aa', 'ab', ... See :class:`LabelSequence`
+    for labels with random access. If `start` is not a label of the
+    alphabet, the generator yields the characters of the consecutive code
+    points from `start`.
+    """
+    if abctype in ("latin", "l", "greek", "g"):
+        kind = "latin" if abctype in ("latin", "l") else "greek"
+        digits = _DIGITS[kind]
+        start = kwargs.pop("start", None)
+        if start is None or all(c in digits for c in start):
+            start = 0 if start is None else label_index(start, kind)
+            for i in count(start):
+                yield _label(i, digits, True)
+        start = ord(start)
+    elif abctype in ("ord", "o"):
         start = kwargs.pop("start", 0)
-    elif abctype in ("latin", "l"):
-        start = ord(kwargs.pop("start", "a"))
     elif abctype == "u":
         start = ord(kwargs.pop("start", "\u0000"))
-    elif abctype in ("greek", "g"):
-        start = ord(kwargs.pop("start", "\u03b1"))
     while True:
         yield chr(start)
         start += 1
@@ -53,3 +76,248 @@ def arabicrange(N: int = 1, **kwargs) -> Iterable:
     if stop is None or stop == start:
         stop = start + N
     return [str(c) for c in range(start, stop)]
+
+
+_DIGITS = {"latin": LATIN, "greek": GREEK, "arabic": "0123456789"}
+
+
+def _label(i: int, digits: str, bijective: bool) -> str:
+    n = len(digits)
+    res = []
+    if bijective:
+        # bijective numeration: a, ..., z, aa, ..., az, ba, ...
+        i += 1
+        while i > 0:
+            i, r = divmod(i - 1, n)
+            res.append(digits[r])
+    else:
+        while True:
+            i, r = divmod(i, n)
+            res.append(digits[r])
+            if i == 0:
+                break
+    return "".join(reversed(res))
+
+
+def label_index(label: str, kind: str = "latin") -> int:
+    """
+    Returns the position of a label in a sequence of labels. This is the
+    inverse of :func:`label`.
+
+    Examples
+    --------
+    >>> label_index("aa")
+    26
+    """
+    if kind in ("ord", "u"):
+        return ord(label)
+    elif kind == "arabic":
+        return int(label)
+    digits = _DIGITS[kind]
+    n = len(digits)
+    res = 0
+    for c in label:
+        res = res * n + digits.index(c) + 1
+    return res - 1
+
+
+def label(i: int, kind: str = "latin") -> str:
+    """
+    Returns the label at position `i` of a sequence of labels, without
+    generating the labels before it.
+
+    Parameters
+    ----------
+    i : int
+        The position of the label.
+    kind : str, Optional
+        'latin', 'greek', 'arabic', or 'ord' for single characters of
+        consecutive code points. Default is 'latin'.
+
+    Examples
+    --------
+    >>> label(0), label(25), label(26), label(701), label(702)
+    ('a', 'z', 'aa', 'zz', 'aaa')
+    >>> label(12, 'arabic')
+    '12'
+    """
+    if i < 0:
+        raise IndexError("Labels are only defined for non-negative positions.")
+    if kind in ("ord", "u"):
+        return chr(i)
+    return _label(i, _DIGITS[kind], kind != "arabic")
+
+
+def _codes(indices: ndarray, digits: str, bijective: bool) -> ndarray:
+    """
+    Returns the code points of the labels at `indices`, as a 2d array of
+    unsigned integers, padded with zeros at the end of the rows.
+    """
+    n = len(digits)
+    indices = np.asarray(indices, dtype=np.int64)
+    # the smallest index of every length of labels
+    if bijective:
+        offsets, width, size = [0], 0, 1
+        while offsets[-1] <= indices.max(initial=0):
+            size *= n
+            offsets.append(offsets[-1] + size)
+            width += 1
+        offsets = np.array(offsets, dtype=np.int64)
+        lengths = np.searchsorted(offsets, indices, side="right")
+        values = indices - offsets[lengths - 1]
+    else:
+        lengths = np.ones(indices.shape, dtype=np.int64)
+        limit = n
+        while limit <= indices.max(initial=0):
+            lengths += indices >= limit
+            limit *= n
+        width = int(lengths.max(initial=1))
+        values = indices
+    table = np.array([ord(c) for c in digits], dtype=np.uint32)
+    # The digits are first aligned to the right, followed by a block
+    # of zeros, then every row is shifted to the left by its padding.
+    padded = np.zeros((len(indices), 2 * width), dtype=np.uint32, order="F")
+    for k in range(width):
+        values, digit = np.divmod(values, n)
+        padded[:, width - 1 - k] = table[digit]
+    shift = np.arange(width) + (width - lengths)[:, None]
+    return np.take_along_axis(padded, shift, axis=1)
+
+
+class LabelSequence(Sequence):
+    """
+    A lazy sequence of labels. The labels are computed from their
+    positions when accessed, nothing is stored, and slices are label
+    sequences as well. Large amounts of labels can be generated at once
+    as NumPy string arrays with :func:`toarray`, or as a buffer of UTF-8
+    bytes and offsets with :func:`tobuffer`.
+
+    Parameters
+    ----------
+    kind : str, Optional
+        'latin' or 'greek' for spreadsheet-style labels continuing with
+        multiple letters after the last letter, 'arabic' for numbers and
+        'ord' for single characters of consecutive code points.
+        Default is 'latin'.
+    start : int or str, Optional
+        The position or the label of the first label. Default is 0.
+    stop : int or str, Optional
+        The position or the label after the last label. Default is None.
+    N : int, Optional
+        The number of labels, if `stop` is not provided. Default is 1.
+
+    Examples
+    --------
+    >>> labels = LabelSequence("latin", start="y", N=4)
+    >>> list(labels)
+    ['y', 'z', 'aa', 'ab']
+    >>> labels[-1], list(labels[::2])
+    ('ab', ['y', 'aa'])
+    >>> labels.toarray()
+    array(['y', 'z', 'aa', 'ab'], dtype='<U2')
+    """
+
+    __slots__ = ("kind", "_range")
+
+    def __init__(
+        self,
+        kind: str = "latin",
+        start: Union[int, str] = 0,
+        stop: Union[int, str] = None,
+        N: int = 1,
+    ):
+        if kind == "u":
+            kind = "ord"
+        if kind not in ("latin", "greek", "arabic", "ord"):
+            raise ValueError(f"Unknown kind of labels '{kind}'.")
+        self.kind = kind
+        if isinstance(start, str):
+            start = label_index(start, kind)
+        if isinstance(stop, str):
+            stop = label_index(stop, kind)
+        if stop is None:
+            stop = start + N
+        self._range = range(start, stop)
+
+    @classmethod
+    def _from_range(cls, kind: str, positions: range) -> "LabelSequence":
+        obj = cls.__new__(cls)
+        obj.kind = kind
+        obj._range = positions
+        return obj
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __getitem__(self, index) -> Union[str, "LabelSequence"]:
+        if isinstance(index, slice):
+            return self._from_range(self.kind, self._range[index])
+        return label(self._range[index], self.kind)
+
+    def __iter__(self):
+        kind = self.kind
+        if kind == "ord":
+            return map(chr, self._range)
+        digits, bijective = _DIGITS[kind], kind != "arabic"
+        return (_label(i, digits, bijective) for i in self._range)
+
+    def __contains__(self, value) -> bool:
+        try:
+            return label_index(value, self.kind) in self._range
+        except (ValueError, TypeError):
+            return False
+
+    def __repr__(self) -> str:
+        r = self._range
+        step = "" if r.step == 1 else f", step={r.step}"
+        return f"LabelSequence('{self.kind}', start={r.start}, stop={r.stop}{step})"
+
+    def _codes(self) -> ndarray:
+        indices = np.arange(self._range.start, self._range.stop, self._range.step)
+        if self.kind == "ord":
+            return indices.astype(np.uint32).reshape(-1, 1)
+        return _codes(indices, _DIGITS[self.kind], self.kind != "arabic")
+
+    def toarray(self) -> ndarray:
+        """
+        Returns the labels as a NumPy array of strings.
+        """
+        codes = self._codes()
+        width = max(codes.shape[1], 1)
+        return np.ascontiguousarray(codes).view(f"<U{width}").reshape(-1)
+
+    def tobuffer(self) -> Tuple[ndarray, ndarray]:
+        """
+        Returns the labels UTF-8 encoded and concatenated into one array of
+        bytes, and an array of offsets, such that the label `i` is
+        `data[offsets[i]:offsets[i+1]]`.
+        """
+        codes = self._codes()
+        # the number of bytes of every code point in UTF-8
+        nbytes = (
+            (codes > 0).astype(np.int64)
+            + (codes >= 0x80)
+            + (codes >= 0x800)
+            + (codes >= 0x10000)
+        )
+        offsets = np.zeros(len(codes) + 1, dtype=np.int64)
+        np.cumsum(nbytes.sum(axis=1), out=offsets[1:])
+        chars = codes[codes > 0]
+        if len(chars) == 0 or chars.max() < 0x80:
+            data = chars.astype(np.uint8)
+        else:
+            text = chars.astype("<u4").tobytes().decode("utf-32-le")
+            data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+        return data, offsets
+
+
+def labels(N: int = 1, kind: str = "latin", start: Union[int, str] = 0) -> ndarray:
+    """
+    Returns `N` labels as a NumPy array of strings.
+
+    Examples
+    --------
+    >>> labels(3, start="z")
+    array(['z', 'aa', 'ab'], dtype='<U2')
+    """
+    return LabelSequence(kind, start=start, N=N).toarray()
@@ -3,7 +3,7 @@ try:
     from collections.abc import Iterable
 except ImportError:
     from collections import Iterable
-from typing import Callable
+from typing import Callable, Iterable as IterableType, Any
 
 
 def isinkwargs(keys, **kwargs):
@@ -48,29 +48,221 @@ def getallfromkwargs(keys, default=None, **kwargs):
     if None not in params:
         return params
     else:
-        missing = list(filter(lambda p: p == default, params))
+        missing = [key for key, p in zip(keys, params) if p is None]
         if len(missing) == 1:
-            key = keys[missing[0]]
             raise RuntimeError(
-                "Parameter {} is missing from the definition!".format(key)
+                "Parameter {} is missing from the definition!".format(missing[0])
             )
         else:
-            missing_keys = [keys[i] for i in missing]
             raise RuntimeError(
-                "Parameters {} is missing from the definition!".format(missing_keys)
+                "Parameters {} is missing from the definition!".format(missing)
             )
 
 
 def getasany(keys, default=None, **kwargs):
-    try:
-        condition = [key in kwargs for key in keys]
-        if not any(condition) == True:
-            return default
-        return kwargs[keys[condition.index(True)]]
-    except Exception:
-        return None
+    for key in keys:
+        if key in kwargs:
+            return kwargs[key]
+    return default
 
 
 def countkwargs(fnc: Callable, **kwargs):
     assert callable(fnc)
     return sum(list(map(fnc, kwargs.keys())))
+
+
+_MISSING = object()
+
+
+class Kwarg:
+    """
+    The declaration of a keyword argument for a :class:`KwargSpec`.
+
+    Parameters
+    ----------
+    name : str
+        The name of the argument.
+    aliases : Iterable[str], Optional
+        Alternative names of the argument. If several names are provided,
+        the first one in the order `name, *aliases` is used. Default is None.
+    default : Any, Optional
+        The value to use, if the argument is not provided. Defaults are
+        not casted. Default is None.
+    astype : Callable, Optional
+        A function to cast the value of the argument with. Default is None.
+    required : bool, Optional
+        If True, the argument must be provided. Default is False.
+    """
+
+    __slots__ = ("name", "aliases", "default", "astype", "required")
+
+    def __init__(
+        self,
+        name: str,
+        aliases: IterableType[str] = None,
+        default: Any = None,
+        astype: Callable = None,
+        required: bool = False,
+    ):
+        self.name = name
+        self.aliases = tuple(aliases) if aliases is not None else ()
+        self.default = default
+        self.astype = astype
+        self.required = required
+
+    @property
+    def keys(self) -> tuple:
+        return (self.name,) + self.aliases
+
+
+class KwargSpec:
+    """
+    A set of keyword arguments, declared once and compiled into a
+    specialized function that extracts them from a dictionary.
+
+    The compiled function looks up every name directly, without building
+    intermediate lists or scanning the dictionary, so a spec is cheap
+    enough to be used in constructors of short-lived objects.
+
+    Parameters
+    ----------
+    *kwargs : Kwarg or str
+        The declarations of the arguments. Strings are turned into
+        optional arguments without aliases, casts and defaults.
+
+    Examples
+    --------
+    >>> spec = KwargSpec(
+    ...     Kwarg("E", aliases=("young",), astype=float, required=True),
+    ...     Kwarg("nu", default=0.3),
+    ... )
+    >>> spec.get({"young": 210})
+    (210.0, 0.3)
+    >>> spec.todict({"E": 210, "nu": 0.2})
+    {'E': 210.0, 'nu': 0.2}
+    >>> kwargs = {"E": 210, "rho": 7.85}
+    >>> spec.pop(kwargs)
+    (210.0, 0.3)
+    >>> kwargs
+    {'rho': 7.85}
+    """
+
+    def __init__(self, *kwargs):
+        self.kwargs = tuple(k if isinstance(k, Kwarg) else Kwarg(k) for k in kwargs)
+        names = [k.name for k in self.kwargs]
+        if len(set(names)) != len(names):
+            raise ValueError("The names of the arguments must be unique.")
+        self._get = self._compile(pop=False)
+        self._pop = self._compile(pop=True)
+
+    @property
+    def names(self) -> tuple:
+        return tuple(k.name for k in self.kwargs)
+
+    def _compile(self, pop: bool) -> Callable:
+        namespace = {
+            "_MISSING": _MISSING,
+            "_missing": self._missing,
+            "_invalid": self._invalid,
+        }
+        lines = ["def extract(kwargs):"]
+        if pop:
+            lines.append("    _pop = kwargs.pop")
+        required = []
+        for i, kwarg in enumerate(self.kwargs):
+            var = "v{}".format(i)
+            fallback = "_MISSING" if kwarg.required else "_d{}".format(i)
+            namespace["_d{}".format(i)] = kwarg.default
+            # optional values are cast where they are found, the defaults
+            # are never cast
+            cast = kwarg.astype is not None and not kwarg.required
+            if cast:
+                namespace["_t{}".format(i)] = kwarg.astype
+            if len(kwarg.keys) == 1 and not cast:
+                method = "_pop" if pop else "kwargs.get"
+                lines.append(
+                    "    {} = {}({!r}, {})".format(var, method, kwarg.name, fallback)
+                )
+            else:
+                single = pop and len(kwarg.keys) == 1
+                for j, key in enumerate(kwarg.keys):
+                    keyword = "if" if j == 0 else "elif"
+                    lines.append("    {} {!r} in kwargs:".format(keyword, key))
+                    source = "_pop({!r})" if single else "kwargs[{!r}]"
+                    lines.append("        {} = {}".format(var, source.format(key)))
+                    if cast:
+                        lines.extend(self._cast(i, "        "))
+                lines.append("    else:")
+                lines.append("        {} = {}".format(var, fallback))
+                if pop and not single:
+                    # all the names are removed, not only the one used
+                    for key in kwarg.keys:
+                        lines.append("    _pop({!r}, None)".format(key))
+            if kwarg.required:
+                required.append(var)
+        if required:
+            condition = " or ".join("{} is _MISSING".format(v) for v in required)
+            lines.append("    if {}:".format(condition))
+            lines.append("        raise _missing({})".format(", ".join(required)))
+        for i, kwarg in enumerate(self.kwargs):
+            if kwarg.astype is not None and kwarg.required:
+                namespace["_t{}".format(i)] = kwarg.astype
+                lines.extend(self._cast(i, "    "))
+        variables = ["v{}".format(i) for i in range(len(self.kwargs))]
+        lines.append("    return ({},)".format(", ".join(variables)))
+        exec("\n".join(lines), namespace)
+        return namespace["extract"]
+
+    @staticmethod
+    def _cast(i: int, indent: str) -> list:
+        # the lines of the source casting the value of the i-th argument
+        var = "v{}".format(i)
+        return [
+            indent + "try:",
+            indent + "    {0} = _t{1}({0})".format(var, i),
+            indent + "except Exception as e:",
+            indent + "    raise _invalid({}, {}, e) from e".format(i, var),
+        ]
+
+    def _missing(self, *values) -> RuntimeError:
+        required = [k for k in self.kwargs if k.required]
+        missing = [
+            " or ".join(k.keys) for k, v in zip(required, values) if v is _MISSING
+        ]
+        if len(missing) == 1:
+            return RuntimeError(
+                "Parameter {} is missing from the definition!".format(missing[0])
+            )
+        return RuntimeError(
+            "Parameters {} are missing from the definition!".format(", ".join(missing))
+        )
+
+    def _invalid(self, index: int, value, error: Exception) -> ValueError:
+        kwarg = self.kwargs[index]
+        return ValueError(
+            "Invalid value {!r} for parameter {}: {}".format(value, kwarg.name, error)
+        )
+
+    def get(self, kwargs: dict) -> tuple:
+        """
+        Returns the values of the arguments from a dictionary, as a tuple
+        in the order of declaration.
+        """
+        return self._get(kwargs)
+
+    def pop(self, kwargs: dict) -> tuple:
+        """
+        Like :func:`get`, but also removes the arguments from the dictionary,
+        with all their aliases.
+        """
+        return self._pop(kwargs)
+
+    def todict(self, kwargs: dict) -> dict:
+        """
+        Returns the values of the arguments from a dictionary, as a dictionary
+        with the names of the arguments as keys.
+        """
+        return dict(zip(self.names, self._get(kwargs)))
+
+    def __call__(self, **kwargs) -> tuple:
+        return self._get(kwargs)
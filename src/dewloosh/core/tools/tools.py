@@ -3,11 +3,16 @@ import time
 import sys
 from typing import Callable
 from ..typing import issequence
+from ..warning import warn_performance
 
 
 __all__ = ["float_to_str_sig", "floatformatter", "issequence", "suppress"]
 
 
+# the size of inputs above which formatting is reported to be slow
+_LARGE_INPUT = 10**5
+
+
 def floatformatter(*args, sig: int = 6, **kwargs) -> str:
     """
     Returns a formatter, which essantially a string temapate
@@ -77,10 +82,16 @@ def float_to_str_sig(value, *args, sig: int = 6, atol: float = 1e-7, **kwargs) -
             import numpy as np
         except ImportError:
             raise ImportError("You need numpy for this.")
-        value = np.array(value)
+        value = np.asarray(value)
+        if value.size > _LARGE_INPUT:
+            warn_performance(
+                "tools.float_to_str_sig",
+                "float_to_str_sig formats the values one by one, which is slow "
+                "with more than {} values.".format(_LARGE_INPUT),
+            )
         if atol is not None:
-            inds = np.where(np.abs(value) < atol)[0]
-            value[inds] = 0.0
+            # a new array, the input is not modified
+            value = np.where(np.abs(value) < atol, 0.0, value)
         formatter = floatformatter(sig=sig)
 
         def f(v):
@@ -1,14 +1,68 @@
 # -*- coding: utf-8 -*-
-from typing import Hashable
+from typing import Hashable, Iterable as IterableType, List
 
 try:
     from collections.abc import Iterable
 except ImportError:
     from collections import Iterable
-import six
 
+from numpy import ndarray
 
-__all__ = ["issequence", "ishashable"]
+
+__all__ = ["issequence", "ishashable", "issequence_many", "ishashable_many"]
+
+
+# The answers only depend on the type of an object, so they are cached
+# by type. The caches are bounded to stay small with dynamically created
+# types, beyond the limit the answers are computed on every call.
+_MAX_CACHE_SIZE = 1024
+
+_sequence_cache = {
+    ndarray: True,
+    list: True,
+    tuple: True,
+    dict: True,
+    set: True,
+    frozenset: True,
+    range: True,
+    bytes: True,
+    str: False,
+    int: False,
+    float: False,
+    complex: False,
+    bool: False,
+    type(None): False,
+}
+
+_hashable_cache = {
+    ndarray: False,
+    list: False,
+    dict: False,
+    set: False,
+    tuple: True,
+    frozenset: True,
+    str: True,
+    bytes: True,
+    int: True,
+    float: True,
+    complex: True,
+    bool: True,
+    type(None): True,
+}
+
+
+def _issequence_type(cls: type) -> bool:
+    res = issubclass(cls, Iterable) and not issubclass(cls, str)
+    if len(_sequence_cache) < _MAX_CACHE_SIZE:
+        _sequence_cache[cls] = res
+    return res
+
+
+def _ishashable_type(cls: type) -> bool:
+    res = issubclass(cls, Hashable)
+    if len(_hashable_cache) < _MAX_CACHE_SIZE:
+        _hashable_cache[cls] = res
+    return res
 
 
 def issequence(arg) -> bool:
@@ -29,11 +83,57 @@ def issequence(arg) -> bool:
     >>> issequence('lorem ipsum')
     False
     """
-    return isinstance(arg, Iterable) and not isinstance(arg, six.string_types)
+    cls = type(arg)
+    try:
+        return _sequence_cache[cls]
+    except KeyError:
+        return _issequence_type(cls)
 
 
 def ishashable(obj) -> bool:
     """
     Returns `True` if `obj` is hashable.
     """
-    return isinstance(obj, Hashable)
+    cls = type(obj)
+    try:
+        return _hashable_cache[cls]
+    except KeyError:
+        return _ishashable_type(cls)
+
+
+def issequence_many(args: IterableType) -> List[bool]:
+    """
+    Returns the result of :func:`issequence` for every item of `args`.
+
+    Examples
+    --------
+    >>> issequence_many([[1, 2], 'lorem ipsum', 1.0])
+    [True, False, False]
+    """
+    cache = _sequence_cache
+    res = []
+    append = res.append
+    for arg in args:
+        cls = type(arg)
+        value = cache.get(cls, None)
+        append(_issequence_type(cls) if value is None else value)
+    return res
+
+
+def ishashable_many(args: IterableType) -> List[bool]:
+    """
+    Returns the result of :func:`ishashable` for every item of `args`.
+
+    Examples
+    --------
+    >>> ishashable_many([[1, 2], 'lorem ipsum', 1.0])
+    [False, True, True]
+    """
+    cache = _hashable_cache
+    res = []
+    append = res.append
+    for arg in args:
+        cls = type(arg)
+        value = cache.get(cls, None)
+        append(_ishashable_type(cls) if value is None else value)
+    return res
@@ -1,9 +1,229 @@
 """
 Warnings used in DewLoosh projects.
 """
+import time
+import threading
+import tracemalloc
+import warnings
+import functools
+from collections import namedtuple
+from typing import Dict
+
+__all__ = [
+    "PerformanceWarning",
+    "warn_performance",
+    "budget",
+    "performance_counters",
+    "reset_performance_counters",
+]
+
+
+# the minimum time between two warnings with the same key, in seconds
+INTERVAL = 60.0
+
+PerformanceCounter = namedtuple("PerformanceCounter", ["count", "emitted"])
+
+_lock = threading.Lock()
+
+# key -> [number of reports, number of warnings emitted, time of the last one]
+_counters: Dict[str, list] = {}
+
+# key -> the messages already emitted for the key
+_messages: Dict[str, set] = {}
 
 
 class PerformanceWarning(Warning):
     def __init__(self, message: str):
         pre = "DewLoosh Performance Warning: "
         self.message = pre + message
+        super().__init__(self.message)
+
+
+def warn_performance(
+    key: str, message: str, *, interval: float = None, stacklevel: int = 2
+) -> bool:
+    """
+    Reports a performance problem and emits a :class:`PerformanceWarning`
+    about it, unless the same message has been emitted for the key before,
+    or any message has been emitted for the key within `interval` seconds.
+    All reports are counted, see :func:`performance_counters`.
+
+    Parameters
+    ----------
+    key : str
+        Identifies the source of the problem, eg. 'wrapping.getitem'.
+    message : str
+        The message of the warning.
+    interval : float, Optional
+        The minimum time between two warnings with the same key, in seconds.
+        Default is None, which means :data:`INTERVAL`.
+    stacklevel : int, Optional
+        Passed to :func:`warnings.warn`. Default is 2, which points to
+        the caller.
+
+    Returns
+    -------
+    bool
+        True if the warning was emitted.
+    """
+    interval = INTERVAL if interval is None else interval
+    now = time.monotonic()
+    with _lock:
+        counter = _counters.get(key, None)
+        if counter is None:
+            counter = _counters[key] = [0, 0, None]
+        counter[0] += 1
+        seen = _messages.setdefault(key, set())
+        if message in seen:
+            return False
+        if counter[2] is not None and now - counter[2] < interval:
+            return False
+        seen.add(message)
+        counter[1] += 1
+        counter[2] = now
+    warnings.warn(PerformanceWarning(message), stacklevel=stacklevel + 1)
+    return True
+
+
+def performance_counters() -> Dict[str, PerformanceCounter]:
+    """
+    Returns the number of reports and emitted warnings for every key
+    reported with :func:`warn_performance`.
+
+    Examples
+    --------
+    >>> import warnings
+    >>> reset_performance_counters()
+    >>> with warnings.catch_warnings():
+    ...     warnings.simplefilter("ignore")
+    ...     for _ in range(3):
+    ...         _ = warn_performance("example", "Something is slow.")
+    >>> performance_counters()
+    {'example': PerformanceCounter(count=3, emitted=1)}
+    """
+    with _lock:
+        return {k: PerformanceCounter(c[0], c[1]) for k, c in _counters.items()}
+
+
+def reset_performance_counters(key: str = None):
+    """
+    Resets the counters and the memory of emitted messages, for one key
+    or for all of them.
+    """
+    with _lock:
+        if key is None:
+            _counters.clear()
+            _messages.clear()
+        else:
+            _counters.pop(key, None)
+            _messages.pop(key, None)
+
+
+def _start_peak() -> tuple:
+    """
+    Starts measuring the peak of the traced memory, and returns the state
+    to pass to :func:`_peak_since`. Tracing must be on.
+    """
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()
+
+
+def _peak_since(start: tuple) -> int:
+    """
+    Returns the peak of the memory allocated since :func:`_start_peak`.
+    """
+    base, previous = start
+    current, peak = tracemalloc.get_traced_memory()
+    if peak > previous or previous == base:
+        return peak - base
+    # Before Python 3.9 the peak can not be reset without clearing the
+    # traces of the session, that may belong to someone else. If the
+    # previous peak was not exceeded, only the memory still allocated
+    # is known.
+    return max(current - base, 0)
+
+
+class budget:
+    """
+    A context manager and decorator, that reports a performance problem
+    with :func:`warn_performance` if the wrapped operation takes longer
+    than `seconds`, or allocates more than `nbytes` bytes at its peak.
+
+    Memory is measured with :mod:`tracemalloc`, which is started for the
+    duration of the operation if it is not running. The peak is reset
+    when the operation starts, so budgets on memory should not be nested.
+    Before Python 3.9, the peak of a session started by someone else can
+    not be reset, and only peaks above the previous one are measured.
+
+    Parameters
+    ----------
+    key : str
+        Identifies the operation.
+    seconds : float, Optional
+        The time budget. Default is None.
+    nbytes : int, Optional
+        The memory budget. Default is None.
+    message : str, Optional
+        The message of the warning. It is formatted with the fields `key`,
+        `seconds` and `nbytes`, the latter two being the measured values.
+        Default is None.
+
+    Examples
+    --------
+    >>> with budget("assembly", seconds=0.5):
+    ...     pass
+    """
+
+    __slots__ = ("key", "seconds", "nbytes", "message", "_start", "_tracing", "_base")
+
+    def __init__(
+        self, key: str, seconds: float = None, nbytes: int = None, message: str = None
+    ):
+        self.key = key
+        self.seconds = seconds
+        self.nbytes = nbytes
+        self.message = message
+
+    def __enter__(self) -> "budget":
+        if self.nbytes is not None:
+            self._tracing = tracemalloc.is_tracing()
+            if not self._tracing:
+                tracemalloc.start()
+            # the memory allocated before the operation is not counted
+            self._base = _start_peak()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self._start
+        peak = None
+        if self.nbytes is not None:
+            peak = _peak_since(self._base)
+            if not self._tracing:
+                tracemalloc.stop()
+        over_time = self.seconds is not None and elapsed > self.seconds
+        over_memory = peak is not None and peak > self.nbytes
+        if over_time or over_memory:
+            if self.message is not None:
+                message = self.message.format(
+                    key=self.key, seconds=elapsed, nbytes=peak
+                )
+            elif over_time:
+                message = "'{}' took {:.3g} s, the budget is {:.3g} s.".format(
+                    self.key, elapsed, self.seconds
+                )
+            else:
+                message = "'{}' allocated {} bytes, the budget is {} bytes.".format(
+                    self.key, peak, self.nbytes
+                )
+            warn_performance(self.key, message, stacklevel=3)
+        return False
+
+    def __call__(self, fnc):
+        @functools.wraps(fnc)
+        def inner(*args, **kwargs):
+            with budget(self.key, self.seconds, self.nbytes, self.message):
+                return fnc(*args, **kwargs)
+
+        return inner
@@ -1,10 +1,483 @@
 # -*- coding: utf-8 -*-
-from typing import Any, Callable
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+from bisect import bisect_left, bisect_right
+import operator
+import functools
+import copyreg
+import atexit
+import threading
+import weakref
 
-__all__ = ["Wrapper", "wrapper", "customwrapper", "wrap"]
+import numpy as np
+from numpy import ndarray
+
+try:
+    from multiprocessing import shared_memory
+
+    __has_shared_memory__ = True
+except ImportError:
+    __has_shared_memory__ = False
+
+from .warning import warn_performance
+from .profiling import profiled
+
+__all__ = ["Wrapper", "Snapshot", "DirtySet", "wrapper", "customwrapper", "wrap"]
 
 NoneType = type(None)
 
+# the approximate size of the chunks of rows copied for snapshots, in bytes
+CHUNK_NBYTES = 2**16
+
+
+# name -> [shared memory, number of wrappers using it, created by this process]
+_segments: Dict[str, list] = {}
+_segments_lock = threading.Lock()
+
+# segments released while arrays on them were still alive
+_pending = []
+
+
+def _create_segment(nbytes: int):
+    if not __has_shared_memory__:
+        raise ImportError("You need Python 3.8 or newer for shared memory.")
+    shm = shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+    with _segments_lock:
+        _segments[shm.name] = [shm, 1, True]
+    return shm
+
+
+def _attach_segment(name: str):
+    with _segments_lock:
+        entry = _segments.get(name, None)
+        if entry is None:
+            try:
+                # the segment is not unlinked when this process exits
+                shm = shared_memory.SharedMemory(name=name, track=False)
+            except TypeError:
+                # Before Python 3.13 attaching registers the segment with the
+                # resource tracker, which is shared with the parent in worker
+                # processes, so the registration has no effect there.
+                shm = shared_memory.SharedMemory(name=name)
+            entry = _segments[name] = [shm, 0, False]
+        entry[1] += 1
+        return entry[0]
+
+
+def _close_segment(shm) -> bool:
+    try:
+        shm.close()
+        return True
+    except BufferError:
+        return False
+
+
+def _release_segment(name: str):
+    with _segments_lock:
+        entry = _segments.get(name, None)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del _segments[name]
+        pending = _pending[:]
+        del _pending[:]
+    shm, _, owned = entry
+    if owned:
+        # the name is removed, the memory is freed once it is unmapped
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+    for shm in [shm] + pending:
+        if not _close_segment(shm):
+            # some arrays still use the memory, it is closed later
+            with _segments_lock:
+                _pending.append(shm)
+
+
+@atexit.register
+def _release_all_segments():
+    with _segments_lock:
+        entries = list(_segments.values())
+        _segments.clear()
+        pending = [e[0] for e in entries] + _pending[:]
+        del _pending[:]
+    for shm, _, owned in entries:
+        if owned:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+    for shm in pending:
+        if not _close_segment(shm):
+            # the memory is unmapped when the process exits anyway
+            shm.close = lambda: None
+
+
+def _rebuild_shared(cls: type, spec: tuple, state: dict) -> "Wrapper":
+    """
+    Recreates a wrapper, whose wrapped array is in shared memory.
+    """
+    name, dtype, shape = spec
+    shm = _attach_segment(name)
+    obj = cls.__new__(cls)
+    obj.__dict__.update(state)
+    obj._wrapped = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    obj._shared = name
+    weakref.finalize(obj, _release_segment, name)
+    return obj
+
+
+# marks the keys of dictionaries, that were missing when a snapshot was taken
+_MISSING = object()
+
+
+def _first_axis(index) -> tuple:
+    """
+    Splits an index into the index of the first axis and the rest.
+    """
+    if isinstance(index, tuple):
+        return (index[0], index[1:]) if index else (Ellipsis, ())
+    return index, ()
+
+
+def _rows_of_index(index, nrows: int) -> Union[range, ndarray]:
+    """
+    Returns the rows along the first axis of an array of `nrows` rows,
+    that an index selects. The result is a range, or an array of row
+    indices for advanced indices. Indices that are not understood select
+    all rows.
+    """
+    first, _ = _first_axis(index)
+    if isinstance(first, slice):
+        return range(*first.indices(nrows))
+    if isinstance(first, (int, np.integer)):
+        i = operator.index(first)
+        i = i + nrows if i < 0 else i
+        return range(i, i + 1)
+    if first is Ellipsis or first is None:
+        return range(nrows)
+    arr = np.asarray(first)
+    if arr.ndim == 0:
+        return range(nrows)
+    if arr.dtype == bool:
+        return np.flatnonzero(arr.reshape(len(arr), -1).any(axis=1))
+    if np.issubdtype(arr.dtype, np.integer):
+        arr = arr.ravel()
+        return np.where(arr < 0, arr + nrows, arr)
+    return range(nrows)
+
+
+def _chunks_of_rows(rows: Union[range, ndarray], size: int) -> Iterable[int]:
+    """
+    Returns the indices of the chunks of `size` rows, that contain some rows.
+    """
+    if isinstance(rows, range):
+        if not rows:
+            return range(0)
+        lo, hi = min(rows[0], rows[-1]), max(rows[0], rows[-1])
+        if abs(rows.step) <= size:
+            return range(lo // size, hi // size + 1)
+        rows = np.asarray(rows)
+    return np.unique(rows // size).tolist()
+
+
+def _shift_index(index, nrows: int, lo: int, hi: int):
+    """
+    Returns an index, that selects the same items from the rows `lo:hi`
+    of an array, as `index` does from the whole array.
+    """
+    if lo == 0 and hi == nrows:
+        return index
+    first, rest = _first_axis(index)
+    if isinstance(first, slice):
+        r = range(*first.indices(nrows))
+        stop = r.stop - lo
+        first = slice(r.start - lo, stop if stop >= 0 else None, r.step)
+    elif isinstance(first, (int, np.integer)):
+        i = operator.index(first)
+        first = (i + nrows if i < 0 else i) - lo
+    else:
+        arr = np.asarray(first)
+        if arr.dtype == bool:
+            first = arr[lo:hi]
+        else:
+            first = np.where(arr < 0, arr + nrows, arr) - lo
+    return (first,) + rest if isinstance(index, tuple) else first
+
+
+class Snapshot:
+    """
+    An immutable view of the state of a wrapped dictionary or NumPy array
+    at the time :func:`Wrapper.snapshot` was called.
+
+    The snapshot shares the storage of the live object. Before the first
+    change of a key of a dictionary, or of a chunk of rows of an array,
+    through the item assignment of the wrapper, the old value is copied
+    into the snapshot. Taking a snapshot costs O(1), and its memory grows
+    with the changed data only.
+
+    Notes
+    -----
+    Changes made directly on the wrapped object, not through the wrapper,
+    are not seen by the snapshot. Values of dictionaries are not copied,
+    changing them in place changes the snapshot too.
+    """
+
+    __slots__ = ("_source", "_saved", "_chunk", "__weakref__")
+
+    def __init__(self, source: Union[dict, ndarray]):
+        if isinstance(source, dict):
+            self._chunk = None
+        elif isinstance(source, ndarray) and source.ndim > 0:
+            rownbytes = source.nbytes // len(source) if len(source) else 1
+            self._chunk = max(1, CHUNK_NBYTES // max(1, rownbytes))
+        else:
+            raise TypeError(
+                "Only dictionaries and NumPy arrays of at least one "
+                "dimension support snapshots."
+            )
+        self._source = source
+        # changed keys or chunk indices -> the values when the snapshot was taken
+        self._saved = {}
+
+    def _preserve(self, index):
+        """
+        Copies the data an item assignment with `index` is about to change.
+        """
+        src, saved, size = self._source, self._saved, self._chunk
+        if size is None:
+            if index not in saved:
+                saved[index] = src.get(index, _MISSING)
+            return
+        nrows = len(src)
+        for k in _chunks_of_rows(_rows_of_index(index, nrows), size):
+            if k not in saved and 0 <= k * size < nrows:
+                saved[k] = src[k * size : (k + 1) * size].copy()
+
+    def _rows(self, lo: int, hi: int) -> ndarray:
+        """
+        Returns a copy of the rows `lo:hi` as they were in the snapshot.
+        """
+        size = self._chunk
+        res = self._source[lo:hi].copy()
+        for k in range(lo // size, (hi - 1) // size + 1):
+            chunk = self._saved.get(k, None)
+            if chunk is not None:
+                a, b = max(lo, k * size), min(hi, k * size + len(chunk))
+                res[a - lo : b - lo] = chunk[a - k * size : b - k * size]
+        return res
+
+    def __getitem__(self, index):
+        src, saved, size = self._source, self._saved, self._chunk
+        if size is None:
+            try:
+                value = saved[index]
+            except KeyError:
+                return src[index]
+            if value is _MISSING:
+                raise KeyError(index)
+            return value
+        nrows = len(src)
+        rows = _rows_of_index(index, nrows)
+        if saved and any(k in saved for k in _chunks_of_rows(rows, size)):
+            lo, hi = int(np.min(rows)), int(np.max(rows)) + 1
+            if lo >= 0 and hi <= nrows:
+                block = self._rows(lo, hi)
+                return block[_shift_index(index, nrows, lo, hi)]
+        res = src[index]
+        return res.copy() if isinstance(res, ndarray) else res
+
+    def __len__(self) -> int:
+        src = self._source
+        res = len(src)
+        if self._chunk is None:
+            for key, value in self._saved.items():
+                res += (value is not _MISSING) - (key in src)
+        return res
+
+    def __contains__(self, key) -> bool:
+        if self._chunk is not None:
+            return key in self.copy()
+        try:
+            return self._saved[key] is not _MISSING
+        except KeyError:
+            return key in self._source
+
+    def __iter__(self):
+        if self._chunk is not None:
+            for i in range(len(self._source)):
+                yield self[i]
+            return
+        saved = self._saved
+        for key in self._source:
+            if saved.get(key, None) is not _MISSING:
+                yield key
+        for key, value in saved.items():
+            if value is not _MISSING and key not in self._source:
+                yield key
+
+    def copy(self) -> Union[dict, ndarray]:
+        """
+        Returns a copy of the state in the snapshot, as a new dictionary
+        or array.
+        """
+        if self._chunk is not None:
+            return self._rows(0, len(self._source))
+        res = dict(self._source)
+        for key, value in self._saved.items():
+            if value is _MISSING:
+                res.pop(key, None)
+            else:
+                res[key] = value
+        return res
+
+
+def _runs_of_rows(rows: Union[range, ndarray]) -> Tuple[ndarray, ndarray]:
+    """
+    Returns the starts and the stops of the runs of consecutive rows.
+    """
+    if isinstance(rows, range):
+        if not rows:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        if abs(rows.step) == 1:
+            lo = min(rows[0], rows[-1])
+            return np.array([lo]), np.array([lo + len(rows)])
+        rows = np.asarray(rows)
+    if len(rows) == 0:
+        return rows, rows
+    if not (np.diff(rows) > 0).all():
+        rows = np.unique(rows)
+    breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+    starts = rows[np.concatenate([[0], breaks])]
+    stops = rows[np.concatenate([breaks - 1, [len(rows) - 1]])] + 1
+    return starts, stops
+
+
+class DirtySet:
+    """
+    The changes made through a wrapper, that tracks changes, see
+    :func:`Wrapper.track_changes`. It records
+
+        (a) the keys of item assignments, for wrapped objects other
+            than arrays, in :attr:`keys`
+        (b) the changed rows of wrapped arrays along the first axis, as
+            sorted and disjoint intervals, see :attr:`rows`
+        (c) the names of the public attributes set on the wrapper, in
+            :attr:`attrs`
+
+    If the wrapped object is replaced, or an index can not be recorded,
+    :attr:`all` is set to True, and everything should be considered
+    changed.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> w = wrap(np.zeros(10)).track_changes()
+    >>> w[2:4] = 1
+    >>> w[[4, 8]] = 2
+    >>> w.dirty().rows
+    [(2, 5), (8, 9)]
+    """
+
+    __slots__ = ("keys", "attrs", "all", "_starts", "_stops")
+
+    def __init__(self):
+        self.keys = set()
+        self.attrs = set()
+        self.all = False
+        self._starts = []
+        self._stops = []
+
+    @property
+    def rows(self) -> List[Tuple[int, int]]:
+        """
+        Returns the changed rows as a list of `(start, stop)` intervals.
+        """
+        return list(zip(self._starts, self._stops))
+
+    def row_mask(self, nrows: int) -> ndarray:
+        """
+        Returns a boolean mask of the changed rows of an array of `nrows` rows.
+        """
+        res = np.zeros(nrows, dtype=bool)
+        if self.all:
+            res[:] = True
+        for start, stop in zip(self._starts, self._stops):
+            res[start:stop] = True
+        return res
+
+    def add_rows(self, start: int, stop: int):
+        """
+        Marks the rows `start:stop` as changed.
+        """
+        if stop <= start:
+            return
+        starts, stops = self._starts, self._stops
+        # the intervals that overlap or touch the new one are merged
+        i = bisect_left(stops, start)
+        j = bisect_right(starts, stop)
+        if i < j:
+            start = min(start, starts[i])
+            stop = max(stop, stops[j - 1])
+        starts[i:j] = [start]
+        stops[i:j] = [stop]
+
+    def _add_runs(self, starts: ndarray, stops: ndarray):
+        if len(starts) == 1:
+            self.add_rows(int(starts[0]), int(stops[0]))
+            return
+        if not self._starts:
+            # the runs are sorted and disjoint
+            self._starts = starts.tolist()
+            self._stops = stops.tolist()
+            return
+        starts = np.concatenate([self._starts, starts]).astype(int)
+        stops = np.concatenate([self._stops, stops]).astype(int)
+        order = np.argsort(starts, kind="stable")
+        starts, stops = starts[order], np.maximum.accumulate(stops[order])
+        first = np.flatnonzero(np.concatenate([[True], starts[1:] > stops[:-1]]))
+        last = np.concatenate([first[1:] - 1, [len(starts) - 1]])
+        self._starts = starts[first].tolist()
+        self._stops = stops[last].tolist()
+
+    def add(self, obj, index):
+        """
+        Records an item assignment with `index` on `obj`.
+        """
+        if isinstance(obj, ndarray) and obj.ndim > 0:
+            rows = _rows_of_index(index, len(obj))
+            if isinstance(rows, range) and rows.step == 1:
+                self.add_rows(rows.start, rows.stop)
+                return
+            starts, stops = _runs_of_rows(rows)
+            if len(starts):
+                self._add_runs(starts, stops)
+            return
+        try:
+            self.keys.add(index)
+        except TypeError:
+            self.all = True
+
+    def clear(self):
+        """
+        Forgets all changes.
+        """
+        self.keys.clear()
+        self.attrs.clear()
+        self.all = False
+        self._starts = []
+        self._stops = []
+
+    def __bool__(self) -> bool:
+        return bool(self.all or self.keys or self.attrs or self._starts)
+
+    def __repr__(self) -> str:
+        return "DirtySet(keys={}, rows={}, attrs={}, all={})".format(
+            self.keys, self.rows, self.attrs, self.all
+        )
+
 
 class Wrapper:
     """
@@ -19,6 +492,24 @@ class Wrapper:
 
     wrapkey = "wrap"
     wraptype = NoneType
+    # if True, wrapped arrays are moved to shared memory when pickled
+    shared_transport = False
+    _shared = None
+    # the live snapshots of the wrapped object
+    _snapshots = None
+    # the recorded changes, if changes are tracked
+    _dirty = None
+    # the class of the instance when changes are not tracked
+    _untracked = None
+    # classes delegating items through the fallback by design, not reported
+    _silent_fallback = True
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # overridden item assignments must preserve the data of snapshots
+        setitem = cls.__setitem__
+        if not getattr(setitem, "_preserves_snapshots", False):
+            cls.__setitem__ = _preserving_snapshots(setitem)
 
     def __init__(self, *args, **kwargs):
         super().__init__()
@@ -52,6 +543,11 @@ class Wrapper:
         return self._wrapped
 
     def wrap(self, obj=None):
+        if self._shared is not None:
+            # the shared memory is released by the finalizer
+            self._shared = None
+        # snapshots keep the object they were taken of
+        self._snapshots = None
         if self.wraptype is not NoneType:
             if isinstance(obj, self.wraptype):
                 self._wrapped = obj
@@ -64,9 +560,162 @@ class Wrapper:
     def wrapped_obj(self):
         return self._wrapped
 
+    def share(self) -> "Wrapper":
+        """
+        Moves the wrapped NumPy array to shared memory, and returns the
+        wrapper. Pickled copies of the wrapper then carry only the name of
+        the shared memory block, and unpickling them in other processes
+        maps the same memory, without copying the data. Changes made by any
+        process are seen by all of them.
+
+        The memory is released when the wrapper and all of its copies are
+        garbage collected, or when the process exits. The wrapper must
+        be kept alive until the other processes have unpickled it.
+
+        Examples
+        --------
+        >>> import pickle
+        >>> import numpy as np
+        >>> w = wrap(np.zeros(1000)).share()
+        >>> len(pickle.dumps(w)) < 1000
+        True
+        """
+        if self._shared is not None:
+            return self
+        arr = self._wrapped
+        if not isinstance(arr, ndarray):
+            raise TypeError("Only wrapped NumPy arrays can be shared.")
+        shm = _create_segment(arr.nbytes)
+        shared = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+        shared[...] = arr
+        self._wrapped = shared
+        self._shared = shm.name
+        self._snapshots = None
+        weakref.finalize(self, _release_segment, shm.name)
+        return self
+
+    def snapshot(self) -> Snapshot:
+        """
+        Returns an immutable, copy-on-write snapshot of the wrapped
+        dictionary or NumPy array. The snapshot shares the storage of the
+        wrapped object, and copies only the keys or chunks of rows that are
+        changed later through the item assignment of the wrapper.
+
+        Examples
+        --------
+        >>> w = wrap(dict(a=1, b=2))
+        >>> s = w.snapshot()
+        >>> w["a"] = 10
+        >>> s["a"], w["a"]
+        (1, 10)
+        >>> w.restore(s)
+        >>> w["a"]
+        1
+        """
+        snap = Snapshot(self._wrapped)
+        if self._snapshots is None:
+            self._snapshots = weakref.WeakSet()
+        self._snapshots.add(snap)
+        return snap
+
+    def restore(self, snapshot: Snapshot):
+        """
+        Reverts the wrapped object to the state in a snapshot taken of it,
+        by writing back the changed keys or chunks of rows only.
+        """
+        src = self._wrapped
+        if snapshot._source is not src:
+            raise ValueError("The snapshot was not taken of the wrapped object.")
+        saved = snapshot._saved
+        snapshot._saved = {}
+        if snapshot._chunk is None:
+            changes = []
+            for key, value in saved.items():
+                if value is _MISSING:
+                    if key in src:
+                        self._before_write(key)
+                        del src[key]
+                        changes.append(key)
+                else:
+                    self._before_write(key)
+                    src[key] = value
+                    changes.append(key)
+        else:
+            size = snapshot._chunk
+            changes = [slice(k * size, k * size + len(c)) for k, c in saved.items()]
+            for index, chunk in zip(changes, saved.values()):
+                self._before_write(index)
+                src[index] = chunk
+        if self._dirty is not None:
+            for index in changes:
+                self._dirty.add(src, index)
+
+    def track_changes(self, enable: bool = True) -> "Wrapper":
+        """
+        Turns the tracking of changes on or off, and returns the wrapper.
+
+        While tracking, item assignments through the wrapper and the
+        public attributes set on it are recorded in a :class:`DirtySet`,
+        that is returned by :func:`dirty`. The tracking is implemented by
+        changing the class of the instance to a subclass, so wrappers that
+        do not track changes have no overhead at all.
+        """
+        if enable and self._dirty is None:
+            self._untracked = self.__class__
+            self.__class__ = _tracking_class(self.__class__)
+            self._dirty = DirtySet()
+        elif not enable and self._dirty is not None:
+            self.__class__ = self._untracked
+            del self._untracked
+            self._dirty = None
+        return self
+
+    def dirty(self) -> DirtySet:
+        """
+        Returns the changes recorded since tracking was turned on, or since
+        the last call of :func:`clear_dirty`.
+        """
+        if self._dirty is None:
+            raise RuntimeError("Changes are not tracked, call 'track_changes' first.")
+        return self._dirty
+
+    def clear_dirty(self) -> DirtySet:
+        """
+        Returns the recorded changes and starts recording anew.
+        """
+        res = self.dirty()
+        self._dirty = DirtySet()
+        return res
+
+    def _before_write(self, index):
+        for snap in tuple(self._snapshots or ()):
+            snap._preserve(index)
+
+    def __getstate__(self):
+        # snapshots are local to the process
+        state = self.__dict__.copy()
+        state.pop("_snapshots", None)
+        # copies do not track changes
+        state.pop("_dirty", None)
+        state.pop("_untracked", None)
+        return state
+
+    def __reduce_ex__(self, protocol):
+        if self._shared is None and self.shared_transport:
+            if isinstance(self._wrapped, ndarray):
+                self.share()
+        if self._shared is None:
+            return super().__reduce_ex__(protocol)
+        arr = self._wrapped
+        state = self.__getstate__()
+        del state["_wrapped"]
+        spec = (self._shared, arr.dtype.str, arr.shape)
+        return _rebuild_shared, (self.__class__, spec, state)
+
     def __hasattr__(self, attr):
         return any([attr in self.__dict__, attr in self._wrapped.__dict__])
 
+    @profiled()
     def __getattr__(self, attr):
         if attr in self.__dict__:
             return getattr(self, attr)
@@ -84,6 +733,7 @@ class Wrapper:
         try:
             return super().__getitem__(index)
         except Exception:
+            _report_fallback(self, "__getitem__")
             try:
                 return self._wrapped.__getitem__(index)
             except Exception:
@@ -93,9 +743,12 @@ class Wrapper:
                 )
 
     def __setitem__(self, index, value):
+        if self._snapshots:
+            self._before_write(index)
         try:
             return super().__setitem__(index, value)
         except Exception:
+            _report_fallback(self, "__setitem__")
             try:
                 return self._wrapped.__setitem__(index, value)
             except Exception:
@@ -105,6 +758,101 @@ class Wrapper:
                 )
 
 
+Wrapper.__setitem__._preserves_snapshots = True
+
+
+def _preserving_snapshots(setitem: Callable) -> Callable:
+    """
+    Returns an item assignment, that preserves the data of the snapshots
+    of the wrapper before calling `setitem`.
+    """
+
+    @functools.wraps(setitem)
+    def __setitem__(self, index, value):
+        if self._snapshots:
+            self._before_write(index)
+        return setitem(self, index, value)
+
+    __setitem__._preserves_snapshots = True
+    return __setitem__
+
+
+class _Tracking:
+    """
+    Records the changes of a wrapper, see :func:`Wrapper.track_changes`.
+    """
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._dirty.add(self._wrapped, index)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name == "_wrapped":
+            self._dirty.all = True
+        elif not name.startswith("_"):
+            self._dirty.attrs.add(name)
+
+    # the item assignment of the tracked class preserves the snapshots
+    __setitem__._preserves_snapshots = True
+
+    def __reduce_ex__(self, protocol):
+        # The tracking class is created at runtime, the wrapper is pickled
+        # with its original class, and the copies do not track changes.
+        fnc, args, *rest = super().__reduce_ex__(protocol)
+        if fnc is copyreg.__newobj__:
+            # pickle requires the class of the object for copyreg.__newobj__
+            fnc = _newobj
+        return (fnc, (self._untracked,) + args[1:], *rest)
+
+
+def _newobj(cls: type, *args):
+    return cls.__new__(cls, *args)
+
+
+# class -> its subclass, that tracks changes
+_tracking_classes: Dict[type, type] = {}
+
+
+def _tracking_class(cls: type) -> type:
+    try:
+        return _tracking_classes[cls]
+    except KeyError:
+        pass
+    res = type(
+        cls.__name__,
+        (_Tracking, cls),
+        {"__module__": cls.__module__, "__qualname__": cls.__qualname__},
+    )
+    _tracking_classes[cls] = res
+    return res
+
+
+# the classes and methods, whose fallback has been reported
+_fallbacks = set()
+
+
+def _report_fallback(obj: Wrapper, method: str):
+    # The fallback raises and catches an exception in every call. It is
+    # reported once for every class, except for the base class and the
+    # classes created by the decorators of this module, that delegate
+    # through the fallback by design.
+    key = (obj.__class__, method)
+    if key in _fallbacks:
+        return
+    _fallbacks.add(key)
+    cls = obj._untracked or obj.__class__
+    if cls.__dict__.get("_silent_fallback", False):
+        return
+    name = cls.__name__
+    warn_performance(
+        "wrapping.fallback",
+        "'{0}.{1}' falls back to the wrapped object through an exception. "
+        "Implement '{1}' in '{0}' to delegate directly.".format(name, method),
+        stacklevel=3,
+    )
+
+
 def customwrapper(
     *args, wrapkey: str = "wrap", wraptype: Any = NoneType, **kwargs
 ) -> Callable:
@@ -126,6 +874,7 @@ def customwrapper(
     def wrapper(BaseType):
         class WrapperType(BaseWrapperType, BaseType):
             basetype = BaseType
+            _silent_fallback = True
 
         return WrapperType
 
@@ -140,6 +889,7 @@ def wrapper(BaseType: type):
 
     class WrapperType(Wrapper, BaseType):
         basetype = BaseType
+        _silent_fallback = True
 
     return WrapperType
 
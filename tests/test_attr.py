@@ -2,6 +2,7 @@
 import unittest
 
 from dewloosh.core import attributor
+from dewloosh.core.attr import marked, marked_members, reindex
 
 
 class TestAttributor(unittest.TestCase):
@@ -22,6 +23,55 @@ class TestAttributor(unittest.TestCase):
         self.assertTrue(foo.__isaxiom__)
         self.assertTrue(foo.__isabstractmethod__)
 
+    def test_marked_members(self):
+        axiom = attributor("__isaxiom__")
+        lemma = attributor("__islemma__")
+
+        class Foo:
+            @axiom
+            def foo(self):
+                pass
+
+            @axiom
+            def baz(self):
+                pass
+
+            @lemma
+            def lem(self):
+                pass
+
+            @staticmethod
+            @axiom
+            def static():
+                pass
+
+            items = [1, 2]
+
+        class Bar(Foo):
+            @axiom
+            def bar(self):
+                pass
+
+            def baz(self):
+                # overridden without the marker
+                pass
+
+        self.assertIn(Foo.__dict__["foo"], marked("__isaxiom__"))
+        self.assertNotIn(Foo.__dict__["lem"], marked("__isaxiom__"))
+        self.assertEqual(
+            sorted(marked_members(Foo, "__isaxiom__")), ["baz", "foo", "static"]
+        )
+        self.assertEqual(
+            sorted(marked_members(Bar, "__isaxiom__")), ["bar", "foo", "static"]
+        )
+        self.assertEqual(list(marked_members(Bar, "__islemma__")), ["lem"])
+        self.assertEqual(marked_members(Bar, "__isnothing__"), {})
+
+        Bar.qux = axiom(lambda self: None)
+        self.assertNotIn("qux", marked_members(Bar, "__isaxiom__"))
+        reindex(Foo)
+        self.assertIn("qux", marked_members(Bar, "__isaxiom__"))
+
 
 if __name__ == "__main__":
     unittest.main()
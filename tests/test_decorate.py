@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+import unittest
+import threading
+import tempfile
+import os
+from inspect import signature
+
+import numpy as np
+
+from dewloosh.core.decorate import squeeze, vectorize, memoize
+
+
+def _kernel(x, y, p=1.0):
+    return np.sum(x * y) * p
+
+
+@vectorize(executor="process", workers=2, chunksize=3)
+def _vectorized_kernel(x, y, p=1.0):
+    return x * y * p
+
+
+class TestDecorate(unittest.TestCase):
+    def test_squeeze(self):
+        @squeeze()
+        def foo(n: int, **kwargs):
+            """foo"""
+            return np.ones((1, n))
+
+        @squeeze(default=False)
+        def bar(n: int):
+            return np.ones((1, n)), {"a": np.ones((n, 1))}, 1
+
+        self.assertEqual(foo.__doc__, "foo")
+        self.assertEqual(foo.__name__, "foo")
+        self.assertEqual(
+            list(signature(foo).parameters), ["n", "out", "squeeze", "kwargs"]
+        )
+        self.assertEqual(foo(3).shape, (3,))
+        self.assertEqual(foo(3, squeeze=False).shape, (1, 3))
+        res = bar(2)
+        self.assertIsInstance(res, tuple)
+        self.assertEqual(res[0].shape, (1, 2))
+        res = bar(2, squeeze=True)
+        self.assertIsInstance(res, tuple)
+        self.assertEqual(res[0].shape, (2,))
+        # only the top level of the results is squeezed
+        self.assertEqual(res[1]["a"].shape, (2, 1))
+        self.assertEqual(res[2], 1)
+
+    def test_squeeze_fixed(self):
+        def foo(n: int):
+            return np.ones((1, n))
+
+        self.assertIs(squeeze(False, fixed=True)(foo), foo)
+        sfoo = squeeze(fixed=True)(foo)
+        self.assertEqual(list(signature(sfoo).parameters), ["n", "out"])
+        self.assertEqual(sfoo(3).shape, (3,))
+        self.assertRaises(TypeError, sfoo, 3, squeeze=False)
+
+    def test_squeeze_out(self):
+        @squeeze()
+        def foo(n: int):
+            return np.full((1, n), 2.0)
+
+        @squeeze()
+        def bar(n: int, out=None):
+            out[...] = 3.0
+
+        @squeeze()
+        def baz(n: int):
+            return np.ones((1, n)), np.zeros((n, 1))
+
+        buffer = np.zeros((1, 3))
+        res = foo(3, out=buffer)
+        self.assertEqual(res.shape, (3,))
+        self.assertTrue(np.shares_memory(res, buffer))
+        self.assertTrue(np.all(buffer == 2.0))
+        res = bar(3, out=buffer)
+        self.assertTrue(np.shares_memory(res, buffer))
+        self.assertTrue(np.all(res == 3.0))
+        self.assertIs(foo(3, out=buffer, squeeze=False), buffer)
+        buffers = np.zeros((1, 2)), np.ones((2, 1))
+        res = baz(2, out=buffers)
+        self.assertTrue(np.shares_memory(res[1], buffers[1]))
+        self.assertTrue(np.all(buffers[1] == 0.0))
+
+    def test_vectorize(self):
+        x, y = np.random.rand(10, 3), np.random.rand(10, 3)
+        expected = np.sum(x * y, axis=1) * 2
+        for executor in (None, "thread", "process"):
+            f = vectorize(executor=executor, workers=2)(_kernel)
+            self.assertTrue(np.allclose(f(x, y, p=2), expected))
+        out = np.zeros(10)
+        f = vectorize(executor="thread", chunksize=4)(_kernel)
+        self.assertIs(f(x, y, 2, out=out), out)
+        self.assertTrue(np.allclose(out, expected))
+        # the second argument is shared between the elements
+        self.assertTrue(np.allclose(f(x, 2.0), np.sum(x, axis=1) * 2))
+        res = _vectorized_kernel(x, y, p=2)
+        self.assertEqual(res.shape, (10, 3))
+        self.assertTrue(np.allclose(res, x * y * 2))
+        self.assertRaises(ValueError, f, x, y[:5])
+
+    def test_vectorize_calls(self):
+        calls = []
+
+        def kernel(x):
+            calls.append(1)
+            return x * 2
+
+        x = np.random.rand(10, 3)
+        for executor in (None, "thread"):
+            calls.clear()
+            f = vectorize(executor=executor, workers=2)(kernel)
+            self.assertTrue(np.allclose(f(x), x * 2))
+            # the first element is evaluated once
+            self.assertEqual(len(calls), 10)
+        # the pool is reused by later calls
+        nthreads = threading.active_count()
+        f(x)
+        f(x)
+        self.assertEqual(threading.active_count(), nthreads)
+
+    def test_vectorize_batched(self):
+        def kernel(x, y):
+            return np.sum(x * y, axis=1)
+
+        x, y = np.random.rand(10, 3), np.random.rand(10, 3)
+        for chunksize in (None, 3):
+            f = vectorize(batch_axis=0, chunksize=chunksize)(kernel)
+            self.assertTrue(np.allclose(f(x, y), kernel(x, y)))
+        out = np.zeros(10)
+        self.assertIs(f(x, y, out=out), out)
+        f = vectorize(batch_axis=1, chunksize=3)(lambda x: x * 2)
+        self.assertTrue(np.allclose(f(x.T), x.T * 2))
+
+    def test_memoize(self):
+        calls = []
+
+        @memoize(maxbytes=100)
+        def foo(x, n=1):
+            calls.append(n)
+            return x * n
+
+        x = np.ones(5)
+        res = foo(x, n=2)
+        self.assertFalse(res.flags.writeable)
+        # equal content gives the same result, without calling the function
+        self.assertIs(foo(np.ones(5), n=2), res)
+        self.assertEqual(len(calls), 1)
+        self.assertIsNot(foo(x.astype(np.float32), n=2), res)
+        self.assertIsNot(foo(x, n=3), res)
+        self.assertEqual(foo.cache_info().hits, 1)
+        # unhashable arguments are not cached
+        calls.clear()
+        foo([1], n=2)
+        foo([1], n=2)
+        self.assertEqual(calls, [2, 2])
+        # the least recently used results are dropped
+        for n in range(10):
+            foo(x, n=n)
+        self.assertLessEqual(foo.cache_info().currbytes, 100)
+        calls.clear()
+        foo(x, n=2)
+        self.assertEqual(calls, [2])
+        foo.cache_clear()
+        self.assertEqual(foo.cache_info().currbytes, 0)
+
+    def test_memoize_arguments(self):
+        @memoize()
+        def ident(x, n):
+            return x, n
+
+        # the arguments of the caller stay writable
+        x = np.ones(3)
+        res = ident(x, 1)
+        self.assertTrue(x.flags.writeable)
+        self.assertFalse(res[0].flags.writeable)
+        # equal arguments of different types are cached separately
+        self.assertIs(type(ident(x, 1.0)[1]), float)
+        self.assertIs(type(ident(x, True)[1]), bool)
+        self.assertIs(type(ident(x, 1)[1]), int)
+        # changing the argument doesn't change the cached result
+        x[0] = 5
+        self.assertTrue(np.all(ident(np.ones(3), 1)[0] == 1))
+        self.assertEqual(ident.cache_info().hits, 2)
+
+    def test_memoize_uncached(self):
+        calls = []
+
+        @memoize(maxsize=2)
+        def foo(x):
+            calls.append(x)
+            return 1
+
+        # 0-d arrays are cached, arrays of objects and structured arrays are not
+        foo(np.array(1.0))
+        foo(np.array(1.0))
+        self.assertEqual(len(calls), 1)
+        foo(np.array([None, 1]))
+        foo(np.array([None, 1]))
+        foo(np.zeros(2, dtype=[("a", "i4"), ("b", "f8")]))
+        self.assertEqual(len(calls), 4)
+        # results without arrays are bound by the number of results
+        for i in range(5):
+            foo(i)
+        self.assertEqual(foo.cache_info().currsize, 2)
+
+    def test_memoize_disk(self):
+        calls = []
+
+        def foo(x):
+            calls.append(x)
+            return x * 2, {"y": x + 1}
+
+        with tempfile.TemporaryDirectory() as folder:
+            x = np.arange(4)
+            res = memoize(disk=True, path=folder)(foo)(x)
+            # a new cache in memory, results are read from the disk
+            cached = memoize(disk=True, path=folder)(foo)
+            res_ = cached(x)
+            self.assertEqual(len(calls), 1)
+            self.assertTrue(np.all(res_[0] == res[0]))
+            self.assertFalse(res_[1]["y"].flags.writeable)
+
+            # changing the function invalidates the results on disk
+            def foo(x):
+                calls.append(x)
+                return x * 3, {"y": x + 1}
+
+            self.assertTrue(np.all(memoize(disk=True, path=folder)(foo)(x)[0] == x * 3))
+            self.assertEqual(len(calls), 2)
+            cached.cache_clear(disk=True)
+            self.assertEqual(os.listdir(folder), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 import unittest
 
+import numpy as np
+
 from dewloosh.core import Infix
+from dewloosh.core.infix import Expression, __has_numexpr__
 
 
 class TestInfix(unittest.TestCase):
@@ -11,6 +14,89 @@ class TestInfix(unittest.TestCase):
         x = Infix(lambda x, y: x + y)
         self.assertEqual(2 << x >> 4, 6)
 
+    def test_infix_array(self):
+        add = Infix(lambda x, y: x + y, ufunc=np.add)
+        a, b = np.arange(3.0), np.ones(3)
+        self.assertTrue(np.all(a | add | b == a + b))
+        self.assertTrue(np.all(a << add >> b == a + b))
+        self.assertTrue(np.all(2 | add | b == 2 + b))
+        self.assertEqual(2 | add | 3, 5)
+        out = np.zeros(3)
+        self.assertIs(a | add.into(out) | b, out)
+        self.assertTrue(np.all(out == a + b))
+        out[:] = 0
+        self.assertIs(add(a, b, out=out), out)
+        self.assertTrue(np.all(out == a + b))
+        mul = Infix(np.multiply)
+        self.assertIs(mul.ufunc, np.multiply)
+        self.assertTrue(np.all(a | mul | b | add | b == a * b + b))
+        # without a ufunc the results are copied into the buffer
+        sub = Infix(lambda x, y: x - y)
+        self.assertIs(sub(a, b, out=out), out)
+        self.assertTrue(np.all(out == a - b))
+
+    def test_infix_lazy(self):
+        add = Infix(np.add, lazy=True)
+        mul = Infix(lambda x, y: x * y, lazy=True, elementwise=True)
+        a, b, c = np.random.rand(100, 7), np.random.rand(7), np.random.rand(100, 1)
+        expr = a | add | b | mul | c
+        self.assertIsInstance(expr, Expression)
+        res = (a + b) * c
+        self.assertTrue(np.allclose(expr.evaluate(chunksize=50, backend="numpy"), res))
+        self.assertTrue(np.allclose(np.asarray(expr), res))
+        out = np.zeros_like(a)
+        self.assertIs(expr.evaluate(out=out, chunksize=1, backend="numpy"), out)
+        self.assertTrue(np.allclose(out, res))
+        self.assertEqual((2 | add | 3 | mul | 4).evaluate(), 20)
+        x = np.arange(10)
+        res = (x | add | [1] * 10 | mul | 2).evaluate(chunksize=3, backend="numpy")
+        self.assertEqual(res.tolist(), ((x + 1) * 2).tolist())
+        self.assertRaises(ValueError, expr.evaluate, backend="cuda")
+
+    def test_infix_lazy_out(self):
+        add = Infix(np.add, lazy=True)
+        a, b, out = np.ones(5), np.arange(5.0), np.zeros(5)
+        self.assertIs((a | add.into(out) | b).evaluate(), out)
+        self.assertTrue(np.all(out == a + b))
+        out = np.zeros(5)
+        expr = add(a, b, out=out)
+        self.assertIsInstance(expr, Expression)
+        self.assertIs(expr.evaluate(), out)
+        # expressions are operands of eager operators
+        mul = Infix(np.multiply)
+        self.assertTrue(np.all(a | add | b | mul | 2 == (a + b) * 2))
+
+    def test_infix_lazy_elementwise(self):
+        add = Infix(np.add, lazy=True)
+        center = Infix(lambda x, y: x - x.mean(axis=0) + y, lazy=True)
+        self.assertTrue(add.elementwise)
+        self.assertFalse(center.elementwise)
+        a, b = np.random.rand(100, 3), np.random.rand(3)
+        expr = a | center | b | add | b
+        res = expr.evaluate(chunksize=10, backend="numpy")
+        self.assertTrue(np.allclose(res, a - a.mean(axis=0) + 2 * b))
+
+    @unittest.skipUnless(__has_numexpr__, "requires numexpr")
+    def test_infix_numexpr(self):
+        add = Infix(np.add, lazy=True)
+        mul = Infix(np.multiply, lazy=True)
+        a, b = np.random.rand(100, 3), np.random.rand(3)
+        expr = a | add | b | mul | 2
+        res = expr.evaluate(backend="numexpr")
+        self.assertTrue(np.allclose(res, (a + b) * 2))
+        out = np.zeros_like(a)
+        self.assertIs(expr.evaluate(out=out, backend="numexpr"), out)
+        self.assertTrue(np.allclose(out, (a + b) * 2))
+        sub = Infix(lambda x, y: x - y, lazy=True)
+        self.assertRaises(TypeError, (a | sub | b).evaluate, backend="numexpr")
+
+    @unittest.skipIf(__has_numexpr__, "numexpr is installed")
+    def test_infix_no_numexpr(self):
+        add = Infix(np.add, lazy=True)
+        expr = np.ones(3) | add | 1
+        self.assertRaises(ImportError, expr.evaluate, backend="numexpr")
+        self.assertTrue(np.all(expr.evaluate() == 2))
+
 
 if __name__ == "__main__":
     unittest.main()
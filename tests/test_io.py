@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+import unittest
+import os
+import gc
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from dewloosh.core.io import (
+    json2dict,
+    dict2json,
+    bin2dict,
+    dict2bin,
+    LazyJSON,
+    dict2jsonl,
+    jsonl2dicts,
+)
+from dewloosh.core import io
+
+
+class TestIO(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.data = {
+            "a": {"b": {"c": 1, "d": [1, 2.5, "x"]}, "e": None},
+            "f": np.arange(6).reshape(2, 3),
+            "g": np.float32(1.5),
+        }
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_json(self):
+        backends = ["json", "orjson"] if io.__has_orjson__ else ["json"]
+        for backend in backends:
+            fpath = self.path("data.json")
+            dict2json(fpath, self.data, backend=backend)
+            d = json2dict(fpath, backend=backend)
+            self.assertEqual(d["a"], self.data["a"])
+            self.assertEqual(d["f"], [[0, 1, 2], [3, 4, 5]])
+            self.assertEqual(d["g"], 1.5)
+
+    def test_json_default_backend(self):
+        fpath = self.path("data.json")
+        data = {"nan": float("nan"), "big": 2**70}
+        dict2json(fpath, data, indent=4)
+        d = json2dict(fpath)
+        self.assertTrue(np.isnan(d["nan"]))
+        self.assertEqual(d["big"], 2**70)
+        with open(fpath) as f:
+            self.assertIn('\n    "big"', f.read())
+        if io.__has_orjson__:
+            self.assertRaises(
+                ValueError, dict2json, fpath, {}, backend="orjson", indent=4
+            )
+
+    def test_bin(self):
+        fpath = self.path("data.bin")
+        data = dict(self.data)
+        data["h"] = np.asfortranarray(np.random.rand(4, 5))
+        data["i"] = np.zeros((0, 3), dtype=np.int8)
+        data["j"] = [np.ones(3), {"k": np.arange(3)[::2]}]
+        dict2bin(fpath, data)
+        for mmap in (False, True):
+            d = bin2dict(fpath, mmap=mmap)
+            self.assertEqual(d["a"], data["a"])
+            self.assertTrue(np.all(d["f"] == data["f"]))
+            self.assertTrue(np.all(d["h"] == data["h"]))
+            self.assertTrue(d["h"].flags.f_contiguous)
+            self.assertEqual(d["i"].shape, (0, 3))
+            self.assertEqual(d["i"].dtype, np.int8)
+            self.assertTrue(np.all(d["j"][0] == 1))
+            self.assertTrue(np.all(d["j"][1]["k"] == [0, 2]))
+            self.assertEqual(d["g"], 1.5)
+        self.assertIsInstance(bin2dict(fpath, mmap=True)["f"], np.memmap)
+        # keys colliding with the references to the arrays are kept
+        data = {"a": {"__ndarray__": 0}, "b": {"~__ndarray__": 1, "~": 2}}
+        dict2bin(fpath, data)
+        self.assertEqual(bin2dict(fpath), data)
+        dict2json(fpath, {})
+        self.assertRaises(ValueError, bin2dict, fpath)
+
+    def test_lazy_json(self):
+        fpath = self.path("data.json")
+        data = {
+            "a": {"b": {"c": 1, "d": [1, {"x~/y": "}"}, '\\"[']}, "e": None},
+            "f": [[0, 1], [2, 3]],
+            "g": 'text with { and ] and " inside',
+            "h": -1.5e-3,
+            "i": {},
+            "j": [],
+        }
+        dict2json(fpath, data, backend="json", indent=2)
+        for deep in (False, True):
+            with json2dict(fpath, lazy=True, deep=deep) as d:
+                self.assertEqual(len(d), len(data))
+                self.assertEqual(list(d), list(data))
+                self.assertEqual(d["g"], data["g"])
+                self.assertEqual(d["h"], data["h"])
+                self.assertEqual(d.get("/a/b/d/1/x~0~1y"), "}")
+                self.assertEqual(d.get("/a/b/d/2"), '\\"[')
+                self.assertEqual(d.get("/f/1/0"), 2)
+                self.assertIsNone(d.get("/a/b/d/5"))
+                self.assertIsNone(d.get("/h/0"))
+                self.assertEqual(d.get("/missing", 0), 0)
+                self.assertEqual(d.todict(), data)
+                if deep:
+                    self.assertIsInstance(d["a"], LazyJSON)
+                    self.assertEqual(d["a"]["b"]["c"], 1)
+                else:
+                    self.assertEqual(d["a"], data["a"])
+                self.assertEqual(d.get("/a/b/c"), 1)
+                self.assertEqual(d.get("/i"), {})
+                self.assertEqual(d.get("/j"), [])
+        # nested mappings keep the file open after the root is closed
+        d = json2dict(fpath, lazy=True, deep=True)
+        a = d["a"]
+        b = a["b"]
+        d.close()
+        self.assertEqual(b["c"], 1)
+        self.assertEqual(a.get("/b/c"), 1)
+        a.close()
+        buf = d._buf
+        self.assertFalse(buf.closed)
+        # the last one is released when it is garbage collected
+        del d, a, b
+        gc.collect()
+        self.assertTrue(buf.closed)
+        dict2json(fpath, [1, 2], backend="json")
+        self.assertRaises(ValueError, LazyJSON, fpath)
+
+    def test_atomic(self):
+        fpath = self.path("data.json")
+        dict2json(fpath, {"a": 1}, atomic=True, fsync=True, lock=True)
+        self.assertEqual(json2dict(fpath), {"a": 1})
+        # a failure during writing leaves the original file untouched
+        self.assertRaises(
+            TypeError,
+            dict2json,
+            fpath,
+            {"b": 2, "c": object()},
+            backend="json",
+            atomic=True,
+        )
+        self.assertEqual(json2dict(fpath), {"a": 1})
+        self.assertEqual(
+            sorted(os.listdir(self.tmpdir.name)), ["data.json", "data.json.lock"]
+        )
+        fpath = self.path("data.bin")
+        dict2bin(fpath, self.data, atomic=True, fsync=True, lock=True)
+        self.assertTrue(np.all(bin2dict(fpath)["f"] == self.data["f"]))
+
+    def test_jsonl(self):
+        fpath = self.path("data.jsonl")
+
+        def write(i):
+            dict2jsonl(fpath, *[{"i": i, "j": j, "a": np.arange(3)} for j in range(10)])
+
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(write, range(20)))
+        records = list(jsonl2dicts(fpath))
+        self.assertEqual(len(records), 200)
+        self.assertEqual(records[0]["a"], [0, 1, 2])
+        self.assertEqual(len({(r["i"], r["j"]) for r in records}), 200)
+        # a truncated last record is skipped
+        with open(fpath, "ab") as f:
+            f.write(b'{"i": 1, "j"')
+        self.assertEqual(len(list(jsonl2dicts(fpath, backend="json"))), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import unittest
+import os
+import inspect
+
+from dewloosh.core import Wrapper
+from dewloosh.core.infix import Infix
+from dewloosh.core.osutils import (
+    find_source_folder,
+    get_definition_file_path,
+    resolve_many,
+    clear_cache,
+)
+
+
+def foo():
+    pass
+
+
+def bar():
+    pass
+
+
+# like a function re-exported by a package
+bar.__module__ = "dewloosh.core"
+
+
+class TestOsUtils(unittest.TestCase):
+    def test_definition_file_path(self):
+        path = os.path.abspath(__file__)
+        self.assertEqual(get_definition_file_path(foo), path)
+        self.assertEqual(get_definition_file_path(TestOsUtils), path)
+        self.assertEqual(get_definition_file_path(self.test_definition_file_path), path)
+        self.assertEqual(
+            get_definition_file_path(Wrapper), os.path.abspath(inspect.getfile(Wrapper))
+        )
+        self.assertRaises(ValueError, get_definition_file_path, 1)
+        self.assertEqual(get_definition_file_path(bar), path)
+        self.assertEqual(resolve_many([bar, bar]), [path, path])
+        paths = resolve_many([foo, Infix, Wrapper, foo])
+        self.assertEqual(paths[0], paths[3])
+        self.assertTrue(paths[1].endswith("infix.py"))
+        self.assertRaises(ValueError, resolve_many, [foo, "foo"])
+        clear_cache()
+        self.assertEqual(resolve_many([foo]), [path])
+
+    def test_source_folder(self):
+        folder = find_source_folder()
+        self.assertEqual(os.path.basename(folder), "src")
+        self.assertIs(find_source_folder(), folder)
+        self.assertRaises(RuntimeError, find_source_folder, "/a/b/c.py", 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
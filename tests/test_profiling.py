@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import unittest
+import json
+import os
+import tempfile
+
+from dewloosh.core import profiling
+from dewloosh.core.profiling import profiled, section, Profiler
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.enabled = profiling.ENABLED
+        self.active = profiling.is_enabled()
+        profiling.PROFILER.reset()
+
+    def tearDown(self):
+        profiling.ENABLED = self.enabled
+        if self.active:
+            profiling.enable()
+        else:
+            profiling.disable()
+        profiling.PROFILER.reset()
+
+    def test_disabled(self):
+        profiling.ENABLED = False
+
+        def foo():
+            pass
+
+        self.assertIs(profiled()(foo), foo)
+        profiling.disable()
+        with section("foo"):
+            pass
+        self.assertEqual(profiling.PROFILER.stats(), {})
+
+    def test_enabled(self):
+        profiling.ENABLED = True
+        profiling.enable()
+
+        @profiled("inner")
+        def inner():
+            return 1
+
+        @profiled("outer")
+        def outer():
+            return inner() + inner()
+
+        self.assertEqual(outer.__name__, "outer")
+        self.assertEqual(outer(), 2)
+        with section("block"):
+            outer()
+        profiling.disable()
+        outer()
+        stats = profiling.PROFILER.stats()
+        self.assertEqual(stats["inner"]["count"], 4)
+        self.assertEqual(stats["outer"]["count"], 2)
+        self.assertEqual(stats["block"]["count"], 1)
+        self.assertEqual(sum(stats["inner"]["histogram"].values()), 4)
+        self.assertGreaterEqual(stats["outer"]["total_ns"], stats["outer"]["max_ns"])
+        stacks = dict(
+            line.rsplit(" ", 1)
+            for line in profiling.PROFILER.dump_collapsed().splitlines()
+        )
+        self.assertEqual(
+            set(stacks),
+            {"outer", "outer;inner", "block", "block;outer", "block;outer;inner"},
+        )
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "profile.json")
+            profiling.PROFILER.dump_json(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)["outer"]["count"], 2)
+            path = os.path.join(folder, "profile.folded")
+            profiling.PROFILER.dump_collapsed(path)
+            with open(path) as f:
+                self.assertEqual(len(f.readlines()), 5)
+
+    def test_profiler(self):
+        profiler = Profiler()
+        profiler.record("a", 1000)
+        profiler.record("a", 3000)
+        stats = profiler.stats()["a"]
+        self.assertEqual((stats["min_ns"], stats["max_ns"]), (1000, 3000))
+        self.assertEqual(stats["histogram"], {1024: 1, 4096: 1})
+        profiler.reset()
+        self.assertEqual(profiler.dump_collapsed(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 import unittest
+import gc
+import time
 
-from dewloosh.core.cp import classproperty
+from dewloosh.core.cp import classproperty, ClassPropertyMeta, get_classproperty
 
 
 class TestProperty(unittest.TestCase):
@@ -13,6 +15,190 @@ class TestProperty(unittest.TestCase):
 
         self.assertEqual(TestClasss.prop, 1)
 
+    def test_class_property_getter(self):
+        prop = classproperty(lambda cls: 1, doc="x").getter(lambda cls: 2)
+        self.assertEqual(prop.__doc__, "x")
+        prop = classproperty(lambda cls: 1, lazy=True, ttl=60)
+        prop = prop.setter(lambda cls, value: None).getter(lambda cls: 2)
+        self.assertTrue(prop._lazy)
+        self.assertEqual(prop._ttl, 60)
+        self.assertIsNotNone(prop._fset)
+
+        class Foo(metaclass=ClassPropertyMeta):
+            bar = prop
+
+        self.assertEqual(Foo.bar, 2)
+
+    def test_lazy_class_property(self):
+        calls = []
+
+        class Foo:
+            _bar_internal = 1
+
+            @classproperty(lazy=True)
+            def bar(cls):
+                calls.append(cls)
+                return cls._bar_internal
+
+        class FooSub(Foo):
+            pass
+
+        self.assertEqual(Foo.bar, 1)
+        self.assertEqual(Foo.bar, 1)
+        self.assertEqual(FooSub.bar, 1)
+        self.assertEqual(len(calls), 2)
+        prop = Foo.__dict__["bar"]
+        self.assertEqual(prop.cache_info(), (1, 2, 2))
+        Foo._bar_internal = 2
+        prop.invalidate(FooSub)
+        self.assertEqual(Foo.bar, 1)
+        self.assertEqual(FooSub.bar, 2)
+        prop.invalidate(Foo)
+        self.assertEqual(prop.cache_info().currsize, 0)
+        self.assertEqual(Foo.bar, 2)
+        prop.invalidate()
+        self.assertEqual(prop.cache_info().currsize, 0)
+
+        # dynamically created classes are not kept alive by the cache
+        Dynamic = type("Dynamic", (Foo,), {})
+        Dynamic.bar
+        self.assertEqual(prop.cache_info().currsize, 1)
+        del Dynamic, calls[:]
+        gc.collect()
+        self.assertEqual(prop.cache_info().currsize, 0)
+
+    def test_lazy_class_property_dependencies(self):
+        class Foo:
+            _bar_internal = 1
+
+            @classproperty(lazy=True, depends_on=["_bar_internal"])
+            def bar(cls):
+                return cls._bar_internal + 1
+
+            @classproperty(lazy=True, ttl=0.01)
+            def baz(cls):
+                return time.monotonic()
+
+        self.assertEqual(Foo.bar, 2)
+        Foo._bar_internal = 2
+        self.assertEqual(Foo.bar, 3)
+        self.assertEqual(Foo.__dict__["bar"].cache_info()[:2], (0, 2))
+        t = Foo.baz
+        self.assertEqual(Foo.baz, t)
+        time.sleep(0.02)
+        self.assertNotEqual(Foo.baz, t)
+        self.assertRaises(ValueError, classproperty, lambda cls: 1, ttl=1)
+
+    def test_installed_class_property(self):
+        calls = []
+
+        class Foo(metaclass=ClassPropertyMeta):
+            @classproperty(lazy=True)
+            def bar(cls):
+                calls.append(cls)
+                return cls.__name__
+
+        class FooSub(Foo):
+            pass
+
+        prop = Foo.__dict__["bar"]
+        self.assertEqual(Foo.bar, "Foo")
+        self.assertEqual(Foo.__dict__["bar"], "Foo")
+        self.assertEqual(Foo.bar, "Foo")
+        self.assertEqual(Foo().bar, "Foo")
+        self.assertEqual(len(calls), 1)
+
+        # subclasses, existing or new, still evaluate their own values
+        class FooSubSub(FooSub):
+            pass
+
+        self.assertEqual(FooSub.bar, "FooSub")
+        self.assertEqual(FooSubSub.bar, "FooSubSub")
+        self.assertEqual(len(calls), 3)
+
+        self.assertEqual(FooSub.__dict__["bar"], "FooSub")
+        prop.invalidate(FooSub)
+        self.assertIsInstance(FooSub.__dict__["bar"], classproperty)
+        self.assertEqual(FooSubSub.bar, "FooSubSub")
+        self.assertEqual(len(calls), 4)
+        prop.invalidate()
+        self.assertIsInstance(Foo.__dict__["bar"], classproperty)
+        self.assertEqual(Foo.bar, "Foo")
+        self.assertEqual(len(calls), 5)
+        # the descriptor is found after the value is installed
+        self.assertEqual(Foo.__dict__["bar"], "Foo")
+        self.assertIs(get_classproperty(Foo, "bar"), prop)
+        self.assertIs(get_classproperty(FooSubSub, "bar"), prop)
+        self.assertRaises(AttributeError, get_classproperty, Foo, "baz")
+
+    def test_writable_class_property(self):
+        calls = []
+
+        class Foo(metaclass=ClassPropertyMeta):
+            _bar_internal = 1
+
+            @classproperty
+            def bar(cls):
+                return cls._bar_internal
+
+            @bar.setter
+            def bar(cls, value):
+                cls._bar_internal = value
+
+            @bar.deleter
+            def bar(cls):
+                cls._bar_internal = 0
+
+            @classproperty(lazy=True, depends_on=["_bar_internal"])
+            def baz(cls):
+                calls.append(cls)
+                return cls._bar_internal + 1
+
+            @classproperty
+            def readonly(cls):
+                return 1
+
+        class FooSub(Foo):
+            pass
+
+        self.assertEqual(Foo.baz, 2)
+        self.assertEqual(FooSub.baz, 2)
+        self.assertEqual(Foo.__dict__["baz"], 2)
+        Foo.bar = 5
+        self.assertEqual(Foo.bar, 5)
+        self.assertEqual(Foo.baz, 6)
+        self.assertEqual(FooSub.baz, 6)
+        self.assertEqual(len(calls), 4)
+        # setting on a subclass leaves the base alone
+        FooSub.bar = 7
+        self.assertEqual(FooSub.baz, 8)
+        self.assertEqual(Foo.baz, 6)
+        self.assertEqual(len(calls), 5)
+        del Foo.bar
+        self.assertEqual(Foo.bar, 0)
+        self.assertEqual(Foo.baz, 1)
+        # plain attributes invalidate their dependents as well
+        Foo._bar_internal = 3
+        self.assertEqual(Foo.baz, 4)
+        with self.assertRaises(AttributeError):
+            Foo.readonly = 2
+        with self.assertRaises(AttributeError):
+            del Foo.readonly
+        Foo.other = 1
+        del Foo.other
+        self.assertFalse(hasattr(Foo, "other"))
+
+        with self.assertRaises((TypeError, RuntimeError)):
+
+            class Bar:
+                @classproperty
+                def bar(cls):
+                    return 1
+
+                @bar.setter
+                def bar(cls, value):
+                    pass
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import unittest
+import time
+
+import numpy as np
+
+from dewloosh.core.testing import TestCase
+
+
+class TestTestCase(TestCase):
+    perf_repeats = 3
+
+    def test_fails_properly(self):
+        def foo():
+            raise ValueError
+
+        self.assertFailsProperly(ValueError, foo)
+
+    def test_faster_than(self):
+        median = self.assertFasterThan(np.sum, 1.0, np.ones(100), axis=0)
+        self.assertLess(median, 1.0)
+        with self.assertRaises(AssertionError):
+            self.assertFasterThan(time.sleep, 1e-4, 1e-3, repeats=1)
+
+    def test_faster_than_tolerance(self):
+        class Tolerant(TestCase):
+            perf_tolerance = 100.0
+
+            def runTest(self):
+                pass
+
+        Tolerant().assertFasterThan(time.sleep, 1e-4, 1e-3, repeats=1)
+
+    def test_allocates_less_than(self):
+        peak = self.assertAllocatesLessThan(np.zeros, 10**6, 100)
+        self.assertLess(peak, 10**6)
+        with self.assertRaises(AssertionError):
+            self.assertAllocatesLessThan(np.ones, 10**6, 10**6)
+
+    def test_no_copies(self):
+        a = np.ones((10, 2))
+        self.assertNoCopies(np.transpose, a)
+        self.assertNoCopies(lambda x: (x[:5], {"b": x[5:]}), a)
+        with self.assertRaises(AssertionError):
+            self.assertNoCopies(np.copy, a)
+        with self.assertRaises(AssertionError):
+            self.assertNoCopies(len, a)
+
+    def test_scales_linearly(self):
+        sizes = [10**4, 10**5, 10**6]
+        slope = self.assertScalesLinearly(np.sum, sizes, setup=np.ones)
+        self.assertLess(slope, 1.3)
+
+        def quadratic(n):
+            x = np.ones(n)
+            return np.outer(x, x)
+
+        with self.assertRaises(AssertionError):
+            self.assertScalesLinearly(quadratic, [100, 400, 1600], repeats=3)
+        self.assertRaises(ValueError, self.assertScalesLinearly, np.sum, [10])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,10 @@ from dewloosh.core.tools.alphabet import (
     urange,
     greekrange,
     arabicrange,
+    LabelSequence,
+    label,
+    label_index,
+    labels,
 )
 from dewloosh.core.tools.kwargtools import (
     isinkwargs,
@@ -21,6 +25,8 @@ from dewloosh.core.tools.kwargtools import (
     getallfromkwargs,
     getasany,
     countkwargs,
+    Kwarg,
+    KwargSpec,
 )
 
 
@@ -50,6 +56,9 @@ class TestTools(unittest.TestCase):
         assert getfromkwargs(["b"], None, None, **kwargs) == [None]
         assert getallfromkwargs(["a", "c"], None, **kwargs) == [1, 2]
         assert getasany(["a", "b"], None, **kwargs) == 1
+        assert getasany(["b", "c"], None, **kwargs) == 2
+        assert getasany(["b", "d"], 0, **kwargs) == 0
+        self.assertRaises(RuntimeError, getallfromkwargs, ["a", "b", "d"], **kwargs)
 
         d = {"E1": 1, "E2": 2, "G12": 12, "NU23": 0}
         nE = countkwargs(lambda s: s[0] == "E", **d)
@@ -62,6 +71,33 @@ class TestTools(unittest.TestCase):
         assert isinstance(popfromkwargs(["E2"], d, astype=float)[0], float)
         assert "E1" not in d
 
+    def test_kwargspec(self):
+        spec = KwargSpec(
+            Kwarg("E", aliases=["young", "E1"], astype=float, required=True),
+            Kwarg("nu", aliases=["poisson"], default=0.3, astype=float),
+            "rho",
+        )
+        self.assertEqual(spec.names, ("E", "nu", "rho"))
+        self.assertEqual(spec.get({"E1": "1", "E": 2}), (2.0, 0.3, None))
+        self.assertEqual(spec(young=1, poisson="0.2", rho=3), (1.0, 0.2, 3))
+        self.assertEqual(spec.todict({"E": 1}), {"E": 1.0, "nu": 0.3, "rho": None})
+        d = {"young": 1, "E1": 2, "rho": 1, "G": 3}
+        spec.pop(d)
+        self.assertEqual(d, {"G": 3})
+        with self.assertRaisesRegex(RuntimeError, "E or young or E1"):
+            spec.get({"nu": 0.3})
+        with self.assertRaisesRegex(ValueError, "parameter nu"):
+            spec.get({"E": 1, "nu": "a"})
+        spec = KwargSpec(Kwarg("a", required=True), Kwarg("b", required=True))
+        with self.assertRaisesRegex(RuntimeError, "Parameters a, b"):
+            spec.get({})
+        self.assertRaises(ValueError, KwargSpec, "a", "a")
+        # values identical to the default are cast, the default is not
+        spec = KwargSpec(Kwarg("a", default=0, astype=float))
+        self.assertIs(type(spec.get({"a": 0})[0]), float)
+        self.assertIs(type(spec.pop({"a": 0})[0]), float)
+        self.assertIs(type(spec.get({})[0]), int)
+
     def test_alphabet(self):
         for abctype in ["ord", "latin", "u", "greek"]:
             g = alphabet(abctype)
@@ -90,6 +126,43 @@ class TestTools(unittest.TestCase):
         abc = alphabet("u", start="\x03")
         pokerstr = [next(abc) for _ in range(4)]
 
+        abc = alphabet("latin", start="y")
+        self.assertEqual([next(abc) for _ in range(3)], ["y", "z", "aa"])
+        # the first letters are the consecutive code points
+        abc = alphabet("greek")
+        self.assertEqual([next(abc) for _ in range(25)], greekrange(25))
+        abc = alphabet("latin", start="A")
+        self.assertEqual([next(abc) for _ in range(3)], ["A", "B", "C"])
+
+    def test_labels(self):
+        self.assertEqual(label(0), "a")
+        self.assertEqual(label(27), "ab")
+        self.assertEqual(label(18277), "zzz")
+        self.assertEqual(label(24, "greek"), "ω")
+        self.assertEqual(label(25, "greek"), "αα")
+        self.assertEqual(label(100, "arabic"), "100")
+        self.assertEqual(label_index("zzz"), 18277)
+        self.assertRaises(IndexError, label, -1)
+        for kind in ["latin", "greek", "arabic", "ord"]:
+            seq = LabelSequence(kind, start=5, N=1000)
+            expected = [label(i, kind) for i in range(5, 1005)]
+            self.assertEqual(list(seq), expected)
+            self.assertEqual(seq.toarray().tolist(), expected)
+            self.assertEqual(list(seq[10:100:3]), expected[10:100:3])
+            self.assertEqual(seq[10:100:3].toarray().tolist(), expected[10:100:3])
+            self.assertEqual(seq[-1], expected[-1])
+            data, offsets = seq.tobuffer()
+            decoded = [
+                bytes(data[i:j]).decode("utf-8")
+                for i, j in zip(offsets[:-1], offsets[1:])
+            ]
+            self.assertEqual(decoded, expected)
+        seq = LabelSequence(start="x", stop="ab")
+        self.assertEqual(list(seq), ["x", "y", "z", "aa"])
+        self.assertIn("z", seq)
+        self.assertNotIn("ab", seq)
+        self.assertEqual(labels(2, start=25).tolist(), ["z", "aa"])
+
     def test_misc(self):
         @timeit
         def foo():
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import numpy as np
+
+from dewloosh.core import issequence, ishashable
+from dewloosh.core.typing import issequence_many, ishashable_many
+
+
+class Sequence:
+    def __iter__(self):
+        return iter(())
+
+
+class Unhashable:
+    __hash__ = None
+
+
+class TestTyping(unittest.TestCase):
+    def test_issequence(self):
+        values = [[1], (1,), np.ones(2), {}, "a", b"a", 1, 1.0, None, Sequence()]
+        expected = [True, True, True, True, False, True, False, False, False, True]
+        self.assertEqual([issequence(v) for v in values], expected)
+        # the second time the answers come from the cache
+        self.assertEqual([issequence(v) for v in values], expected)
+        self.assertEqual(issequence_many(values), expected)
+
+        class Text(str):
+            pass
+
+        self.assertFalse(issequence(Text("a")))
+
+    def test_ishashable(self):
+        values = [[1], (1,), np.ones(2), {}, "a", 1, None, Sequence(), Unhashable()]
+        expected = [False, True, False, False, True, True, True, True, False]
+        self.assertEqual([ishashable(v) for v in values], expected)
+        self.assertEqual(ishashable_many(values), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
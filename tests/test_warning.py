@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import unittest
+import warnings
+import tracemalloc
+
+import numpy as np
+
+from dewloosh.core import meta
+from dewloosh.core.wrapping import Wrapper, wrap, customwrapper
+from dewloosh.core.abc import ABC_Safe
+from dewloosh.core.tools import tools
+from dewloosh.core.warning import (
+    PerformanceWarning,
+    warn_performance,
+    budget,
+    performance_counters,
+    reset_performance_counters,
+)
+
+
+class TestPerformanceWarning(unittest.TestCase):
+    def setUp(self):
+        reset_performance_counters()
+
+    def test_message(self):
+        w = PerformanceWarning("slow")
+        self.assertEqual(str(w), "DewLoosh Performance Warning: slow")
+
+    def test_rate_limiting(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self.assertTrue(warn_performance("a", "first"))
+            # duplicates are never emitted again
+            self.assertFalse(warn_performance("a", "first", interval=0))
+            # new messages are emitted at most once in an interval
+            self.assertFalse(warn_performance("a", "second", interval=60))
+            self.assertTrue(warn_performance("a", "second", interval=0))
+            self.assertTrue(warn_performance("b", "first"))
+        self.assertEqual(len(caught), 3)
+        self.assertTrue(all(w.category is PerformanceWarning for w in caught))
+        counters = performance_counters()
+        self.assertEqual(counters["a"], (4, 2))
+        self.assertEqual(counters["b"].emitted, 1)
+        reset_performance_counters("a")
+        self.assertEqual(list(performance_counters()), ["b"])
+
+    def test_budget(self):
+        with self.assertWarns(PerformanceWarning):
+            with budget("time", seconds=0):
+                pass
+        with self.assertWarns(PerformanceWarning) as cm:
+            with budget("memory", nbytes=10**6):
+                x = np.ones(10**6)
+        self.assertIn("allocated", str(cm.warning))
+
+        @budget("fast", seconds=60, nbytes=10**8)
+        def foo():
+            return 1
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            self.assertEqual(foo(), 1)
+        self.assertNotIn("fast", performance_counters())
+
+    def test_budget_keeps_traces(self):
+        # before Python 3.9, the traces of a running session are kept
+        reset_peak = getattr(tracemalloc, "reset_peak", None)
+        tracemalloc.start()
+        try:
+            if reset_peak is not None:
+                del tracemalloc.reset_peak
+            x = np.ones(10**5)
+            with self.assertWarns(PerformanceWarning):
+                with budget("traced", nbytes=10**6):
+                    y = np.ones(10**6)
+            self.assertIsNotNone(tracemalloc.get_object_traceback(x))
+        finally:
+            if reset_peak is not None:
+                tracemalloc.reset_peak = reset_peak
+            tracemalloc.stop()
+
+    def test_hot_spots(self):
+        class DictWrapper(Wrapper):
+            pass
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            wrap({"a": 1})["a"]
+            customwrapper(wraptype=dict)(type("Base", (), {}))(a=1)["a"]
+        obj = DictWrapper(wrap={"a": 1})
+        with self.assertWarns(PerformanceWarning):
+            obj["a"]
+        obj["a"]
+        self.assertEqual(performance_counters()["wrapping.fallback"].count, 1)
+
+        values = np.zeros(tools._LARGE_INPUT + 1)
+        with self.assertWarns(PerformanceWarning):
+            tools.float_to_str_sig(values[:2].tolist() * (tools._LARGE_INPUT // 2 + 1))
+        values[0] = 1e-10
+        self.assertEqual(tools.float_to_str_sig(values[:2], sig=2), ["0", "0"])
+        self.assertEqual(values[0], 1e-10)
+
+        default = meta.VALIDATION_BUDGET
+        meta.VALIDATION_BUDGET = -1
+        try:
+            with self.assertWarns(PerformanceWarning):
+
+                class Foo(ABC_Safe):
+                    pass
+
+        finally:
+            meta.VALIDATION_BUDGET = default
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,41 @@
 # -*- coding: utf-8 -*-
 import unittest
+import pickle
+import gc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
 from dewloosh.core.wrapping import Wrapper, customwrapper, wrap, wrapper
+from dewloosh.core.wrapping import __has_shared_memory__
+
+if __has_shared_memory__:
+    from multiprocessing import shared_memory
+
+
+class ArrayWrapper(Wrapper):
+    wraptype = np.ndarray
+
+    def __getitem__(self, index):
+        return self._wrapped[index]
+
+    def __setitem__(self, index, value):
+        self._wrapped[index] = value
+
+
+class ItemWrapper(ArrayWrapper):
+    def __setitem__(self, index, value):
+        self._wrapped[index] = value
+
+
+class SharedArrayWrapper(ArrayWrapper):
+    shared_transport = True
+
+
+def _increment(obj, value):
+    # runs in a worker process, on the memory of the parent
+    obj.wrapped[...] += value
+    return float(obj.wrapped.sum())
 
 
 class TestWrap(unittest.TestCase):
@@ -60,6 +94,144 @@ class TestWrap(unittest.TestCase):
         obj = CustomWrapper(a=2)
         assert obj["a"] == 2
 
+    @unittest.skipUnless(__has_shared_memory__, "requires Python 3.8")
+    def test_share(self):
+        arr = np.arange(1000, dtype=float)
+        obj = ArrayWrapper(wrap=arr.copy())
+        obj.tag = "tag"
+        self.assertIs(obj.share(), obj)
+        name = obj._shared
+        data = pickle.dumps(obj)
+        self.assertLess(len(data), arr.nbytes)
+        clone = pickle.loads(data)
+        self.assertIsInstance(clone, ArrayWrapper)
+        self.assertEqual(clone.tag, "tag")
+        clone.wrapped[0] = -1
+        self.assertEqual(obj.wrapped[0], -1)
+        self.assertRaises(TypeError, wrap({}).share)
+        # the memory is released with the last wrapper
+        del obj
+        gc.collect()
+        shared_memory.SharedMemory(name=name).close()
+        del clone
+        gc.collect()
+        self.assertRaises(FileNotFoundError, shared_memory.SharedMemory, name=name)
+
+    @unittest.skipUnless(__has_shared_memory__, "requires Python 3.8")
+    def test_share_processes(self):
+        obj = SharedArrayWrapper(wrap=np.zeros(100))
+        # plain wrappers are pickled as usual
+        self.assertIsNone(pickle.loads(pickle.dumps(wrap(np.zeros(2))))._shared)
+        with ProcessPoolExecutor(2) as pool:
+            futures = [pool.submit(_increment, obj, 1) for _ in range(4)]
+            [f.result() for f in futures]
+        self.assertIsNotNone(obj._shared)
+        self.assertTrue(np.all(obj.wrapped == 4))
+        obj.wrap(np.ones(2))
+        self.assertIsNone(obj._shared)
+
+    def test_snapshot_dict(self):
+        w = wrap(dict(a=1, b=2))
+        s1 = w.snapshot()
+        w["a"] = 10
+        w["c"] = 3
+        s2 = w.snapshot()
+        w["c"] = 4
+        self.assertEqual(s1.copy(), dict(a=1, b=2))
+        self.assertEqual(s2.copy(), dict(a=10, b=2, c=3))
+        self.assertEqual(len(s1), 2)
+        self.assertNotIn("c", s1)
+        self.assertEqual(sorted(s1), ["a", "b"])
+        self.assertRaises(KeyError, lambda: s1["c"])
+        # only the changed keys are stored
+        self.assertEqual(set(s1._saved), {"a", "c"})
+        with self.assertRaises(TypeError):
+            s1["a"] = 0
+        w.restore(s1)
+        self.assertEqual(w.wrapped, dict(a=1, b=2))
+        self.assertEqual(s2.copy(), dict(a=10, b=2, c=3))
+        self.assertRaises(ValueError, wrap({}).restore, s1)
+        self.assertRaises(TypeError, wrap([1, 2]).snapshot)
+
+    def test_snapshot_array(self):
+        arr = np.arange(100000, dtype=float)
+        w = ArrayWrapper(wrap=arr)
+        ref = arr.copy()
+        s = w.snapshot()
+        w[5] = -1
+        w[[-1, 10]] = -2
+        w[arr > 99990] = -3
+        self.assertTrue(np.array_equal(s.copy(), ref))
+        for index in [5, -1, slice(None, None, -3), [10, 0, 99999], (Ellipsis,)]:
+            self.assertTrue(np.array_equal(s[index], ref[index]))
+        # the changed chunks are copied only
+        nbytes = sum(chunk.nbytes for chunk in s._saved.values())
+        self.assertLess(nbytes, arr.nbytes // 4)
+        w.restore(s)
+        self.assertTrue(np.array_equal(arr, ref))
+        # snapshots are not pickled
+        self.assertIsNone(pickle.loads(pickle.dumps(w))._snapshots)
+        # wrapping another object detaches the snapshots
+        s = w.snapshot()
+        w.wrap(np.zeros(3))
+        w[0] = 1
+        self.assertTrue(np.array_equal(s.copy(), ref))
+
+    def test_snapshot_overridden_setitem(self):
+        w = ItemWrapper(wrap=np.zeros(10))
+        s = w.snapshot()
+        w[0] = 9
+        self.assertEqual(s[0], 0)
+        self.assertEqual(w.wrapped[0], 9)
+        w = w.track_changes()
+        s = w.snapshot()
+        w[1] = 9
+        self.assertEqual(s[1], 0)
+        self.assertEqual(w.dirty().rows, [(1, 2)])
+
+    def test_track_changes(self):
+        w = ArrayWrapper(wrap=np.zeros((100, 3)))
+        self.assertRaises(RuntimeError, w.dirty)
+        self.assertIs(w.track_changes(), w)
+        self.assertIsInstance(w, ArrayWrapper)
+        self.assertFalse(w.dirty())
+        w[10:20] = 1
+        w[20] = 2
+        w[[50, 52, 51, -1]] = 3
+        w[w.wrapped[:, 0] == 2, 1] = 4
+        w.name = "w"
+        w._private = 1
+        dirty = w.clear_dirty()
+        self.assertEqual(dirty.rows, [(10, 21), (50, 53), (99, 100)])
+        self.assertEqual(dirty.attrs, {"name"})
+        self.assertEqual(dirty.row_mask(100).sum(), 15)
+        self.assertFalse(w.dirty())
+        # copies do not track changes
+        clone = pickle.loads(pickle.dumps(w))
+        self.assertIs(type(clone), ArrayWrapper)
+        self.assertIsNone(clone._dirty)
+        # restoring a snapshot is a change
+        s = w.snapshot()
+        w[0] = 5
+        w.clear_dirty()
+        w.restore(s)
+        self.assertEqual(w.dirty().rows[0][0], 0)
+        w.wrap(np.zeros(3))
+        self.assertTrue(w.dirty().all)
+        # without tracking, the class is the original one
+        w.track_changes(False)
+        self.assertIs(type(w), ArrayWrapper)
+        self.assertIsNone(w._dirty)
+        w[0] = 1
+
+    def test_track_changes_dict(self):
+        w = wrap(dict(a=1)).track_changes()
+        w["a"] = 2
+        w["b"] = 3
+        self.assertRaises(TypeError, w.__setitem__, [], 0)
+        self.assertEqual(w.dirty().keys, {"a", "b"})
+        self.assertFalse(w.dirty().all)
+
 
 if __name__ == "__main__":
     unittest.main()